@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+geometry_parse.py
+
+Measure what WKB parsing costs the spatial stages. A sample of a
+`propsholds_final` file is written twice: once with `geom` as a bare WKB blob
+(the old encoding after the pandas round trips) and once as GeoParquet
+GEOMETRY (the canonical encoding). The same area/centroid/DWithin workloads
+are then timed against each copy.
+
+Usage:
+    REGION=northeast DATA_DIR=/path/to/regrid_2025 python benchmarks/geometry_parse.py [parquet_file] [rows]
+"""
+
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import duckdb
+
+region = os.getenv("REGION")
+data_dir = os.getenv("DATA_DIR")
+REPEATS = 3
+
+
+def timed(con, sql):
+    """Best-of-REPEATS wall time for a query, in seconds."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        con.execute(sql).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    if len(sys.argv) > 1:
+        source = sys.argv[1]
+    else:
+        files = sorted(glob.glob(f"{data_dir}/parquet/{region}/{region}_propsholds_final/propsholds_final_*.parquet"))
+        files = [f for f in files if not f.endswith("_urban.parquet")]
+        if not files:
+            raise ValueError(" No propsholds_final files found; pass a Parquet path explicitly")
+        source = files[0]
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    con = duckdb.connect(database=":memory:")
+    con.execute("INSTALL spatial;")
+    con.execute("LOAD spatial;")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wkb_path = os.path.join(tmp, "wkb.parquet")
+        native_path = os.path.join(tmp, "native.parquet")
+
+        print(f" Sampling {rows} rows from {source}")
+        con.execute(f"""
+            CREATE TABLE sample AS
+            SELECT fips_id, geom FROM read_parquet('{source}') LIMIT {rows};
+        """)
+        con.execute(f"COPY (SELECT fips_id, ST_AsWKB(geom) AS geom FROM sample) TO '{wkb_path}' (FORMAT 'parquet');")
+        con.execute(f"COPY sample TO '{native_path}' (FORMAT 'parquet');")
+
+        workloads = {
+            # addattributes.py used to parse every geometry four times per row
+            "area (x4 parse)": (
+                "SELECT SUM(ST_Area(ST_GeomFromWKB(geom)) + ST_Area(ST_GeomFromWKB(geom))"
+                " + ST_Area(ST_GeomFromWKB(geom)) + ST_Area(ST_GeomFromWKB(geom))) FROM read_parquet('{wkb}')",
+                "SELECT SUM(ST_Area(geom) + ST_Area(geom) + ST_Area(geom) + ST_Area(geom)) FROM read_parquet('{native}')",
+            ),
+            "centroid": (
+                "SELECT COUNT(ST_Centroid(ST_GeomFromWKB(geom))) FROM read_parquet('{wkb}')",
+                "SELECT COUNT(ST_Centroid(geom)) FROM read_parquet('{native}')",
+            ),
+            # prop_match2.py materializes geometry once, then evaluates ST_DWithin on pairs
+            "materialize": (
+                "CREATE OR REPLACE TEMP TABLE m AS SELECT fips_id, ST_GeomFromWKB(geom) AS geom FROM read_parquet('{wkb}')",
+                "CREATE OR REPLACE TEMP TABLE m AS SELECT fips_id, geom FROM read_parquet('{native}')",
+            ),
+        }
+
+        print(f"\n{'workload':<20}{'wkb (s)':>12}{'native (s)':>12}{'speedup':>10}")
+        for name, (wkb_sql, native_sql) in workloads.items():
+            wkb_time = timed(con, wkb_sql.format(wkb=wkb_path))
+            native_time = timed(con, native_sql.format(native=native_path))
+            print(f"{name:<20}{wkb_time:>12.3f}{native_time:>12.3f}{wkb_time / native_time:>9.2f}x")
+
+    con.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+pipeline_bench.py
+
+End-to-end benchmark on synthetic data. For each scale a fresh synthetic region
+is generated (benchmarks/synthetic.py) and every stage of the DAG runs on it
+with --force; the run report written by parcels/telemetry.py is then reduced
+to throughput (input rows/s), wall and CPU time, peak RSS and spill per stage.
+
+Results go to `{data_dir}/benchmarks/benchmark_{parcels}.json`; compare files
+across commits (or engines) to validate an optimization.
+
+Usage:
+    python benchmarks/pipeline_bench.py --data-dir /tmp/regrid_synth --scales 10000 1000000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Make the shared `parcels` helpers importable when run as `python3 benchmarks/<name>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parcels import dag, resources
+
+import synthetic
+
+
+def latest_report(data_dir):
+    root = os.path.join(data_dir, "telemetry")
+    runs = sorted(d for d in os.listdir(root) if os.path.exists(os.path.join(root, d, "report.json")))
+    with open(os.path.join(root, runs[-1], "report.json")) as f:
+        return json.load(f)
+
+
+def stage_summary(report):
+    """Per-stage totals over the stage's tasks, in DAG order."""
+    order = [s.name for s in dag.STAGES]
+    stages = {}
+    for t in report["tasks"]:
+        s = stages.setdefault(t["stage"], {"tasks": 0, "status": "ok", "wall_s": 0.0, "cpu_s": 0.0,
+                                           "peak_rss_bytes": 0, "spill_peak_bytes": 0,
+                                           "rows_in": 0, "rows_out": 0, "bytes_in": 0})
+        s["tasks"] += 1
+        s["status"] = s["status"] if t["status"] == "ok" else t["status"]
+        for key in ("wall_s", "cpu_s", "rows_in", "rows_out", "bytes_in"):
+            s[key] += t[key]
+        for key in ("peak_rss_bytes", "spill_peak_bytes"):
+            s[key] = max(s[key], t[key])
+    for s in stages.values():
+        s["rows_per_s"] = s["rows_in"] / s["wall_s"] if s["wall_s"] else None
+    return {name: stages[name] for name in order if name in stages}
+
+
+def run_scale(base_dir, region, parcels, states, seed, budget):
+    data_dir = os.path.join(base_dir, f"scale_{parcels}")
+    _, urban_path = synthetic.generate(data_dir, region, parcels, states, seed)
+    os.environ["URBAN_PARQUET"] = urban_path
+
+    start = time.perf_counter()
+    _, failed = dag.run(data_dir, [region], force=True, budget=budget)
+    total_s = time.perf_counter() - start
+
+    result = {
+        "parcels": parcels,
+        "states": states,
+        "seed": seed,
+        "budget": str(budget),
+        "total_wall_s": total_s,
+        "failed": sorted(f"{r}/{s}" for r, s in failed),
+        "stages": stage_summary(latest_report(data_dir)),
+    }
+    out_dir = os.path.join(base_dir, "benchmarks")
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, f"benchmark_{parcels}.json")
+    with open(out_path, "w") as f:
+        json.dump(result, f, indent=1)
+
+    print(f"\n {parcels} parcels: {total_s:.1f}s end to end → {out_path}")
+    print(f" {'stage':<18}{'wall s':>9}{'cpu s':>9}{'rows/s':>12}{'RSS MiB':>9}{'spill MiB':>10}")
+    for name, s in result["stages"].items():
+        rate = f"{s['rows_per_s']:.0f}" if s["rows_per_s"] else "-"
+        print(f" {name:<18}{s['wall_s']:>9.1f}{s['cpu_s']:>9.1f}{rate:>12}"
+              f"{s['peak_rss_bytes'] >> 20:>9}{s['spill_peak_bytes'] >> 20:>10}  {s['status']}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every pipeline stage on synthetic regions.")
+    parser.add_argument("--data-dir", required=True, help="scratch directory for the synthetic regions")
+    parser.add_argument("--region", default="northeast")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--states", default=synthetic.DEFAULT_STATES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cpus", type=int)
+    parser.add_argument("--memory", help="RAM budget, e.g. 8GB")
+    args = parser.parse_args()
+
+    budget = resources.Budget.detect(args.data_dir)
+    budget.cpus = args.cpus or budget.cpus
+    budget.memory = resources.parse_size(args.memory) if args.memory else budget.memory
+
+    results = [run_scale(args.data_dir, args.region, n, args.states.split(","), args.seed, budget)
+               for n in args.scales]
+    if any(r["failed"] for r in results):
+        raise SystemExit(" Some stages failed; see the run reports under each scale's telemetry/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+synthetic.py
+
+Generate a synthetic Regrid-like region that the whole pipeline can run on.
+
+Writes `{data_dir}/parquet/{region}/parquets_projected/{state}_{chunk}.parquet`
+(the raw Regrid columns `importparquet.py` reads, with `wkb_geometry` as
+EPSG:5070 parcel polygons) and `{data_dir}/census/urban_5070.parquet` (urban
+area polygons, the `census_parquet.py` output). Everything is generated inside
+DuckDB from hashes of the row number, so a given seed and scale always yields
+the same data and no chunk is ever held in Python.
+
+The data mimics what drives the pipeline's cost:
+  - parcels sit on a per-state grid, so ST_DWithin(100 m) finds real neighbours;
+  - owners follow a Zipf-like distribution and runs of adjacent parcels share an
+    owner, so prop_match2/holds_match build large components;
+  - mailing addresses come in messy variants (abbreviations, case, commas,
+    extra spaces, ZIP+4) that pstlclean2 has to normalise;
+  - a few NULL and 'CURRENT OWNER' owners, empty addresses and ZCTAs that match
+    the mailing ZIP of owner-occupied parcels.
+
+Usage:
+    python benchmarks/synthetic.py --data-dir /tmp/regrid_synth --region northeast --parcels 1000000
+"""
+
+import argparse
+import math
+import os
+import time
+
+import duckdb
+
+# Rows per generated file; each file is one COPY, so this bounds DuckDB's working set
+CHUNK_ROWS = 2_000_000
+CELL_M = 60            # grid spacing of parcel lots (metres, EPSG:5070)
+BLOCK = 6              # adjacent lots that share an owner when clustered
+CLUSTER_SHARE = 0.35   # share of parcels whose owner is their block's owner
+ZCTA_CELLS = 80        # lots per ZCTA side (~4.8 km)
+COUNTY_CELLS = 400     # lots per county side (~24 km)
+URBAN_SHARE = 0.1      # rough share of each state's area covered by urban polygons
+
+DEFAULT_STATES = "CT,MA,ME,NH,RI,VT"
+
+SURNAMES = ["SMITH", "JOHNSON", "WILLIAMS", "BROWN", "JONES", "MILLER", "DAVIS", "GARCIA", "RODRIGUEZ",
+            "WILSON", "MARTINEZ", "ANDERSON", "TAYLOR", "THOMAS", "HERNANDEZ", "MOORE", "MARTIN", "JACKSON",
+            "THOMPSON", "WHITE", "LOPEZ", "LEE", "GONZALEZ", "HARRIS", "CLARK", "LEWIS", "ROBINSON", "WALKER"]
+FIRST_NAMES = ["JAMES", "MARY", "ROBERT", "PATRICIA", "JOHN", "JENNIFER", "MICHAEL", "LINDA", "DAVID",
+               "ELIZABETH", "WILLIAM", "BARBARA", "RICHARD", "SUSAN", "JOSEPH", "JESSICA"]
+# (suffix, owntype); the blank suffixes make most owners individuals
+OWNER_SUFFIXES = [("", "individual"), ("", "individual"), ("", "individual"), (" LLC", "corporate"),
+                  (" TRUST", "trust"), (" INC", "corporate"), (" FARMS LLC", "corporate"), (" LIVING TRUST", "trust")]
+STREETS = ["MAIN", "OAK", "PINE", "MAPLE", "CEDAR", "ELM", "WASHINGTON", "LAKE", "HILL", "PARK", "RIVER",
+           "CHURCH", "MILL", "SCHOOL", "SPRING", "NORTH", "RIDGE", "MEADOW", "FOREST", "COUNTY LINE"]
+# Spelling variants of each street type as they appear in raw mailing addresses
+STREET_TYPES = [["ST", "St.", "STREET", "Street", "st"], ["RD", "Rd", "ROAD"], ["AVE", "Ave.", "AV", "AVENUE"],
+                ["DR", "Dr.", "DRIVE"], ["LN", "Lane", "LANE"], ["CT", "Ct", "COURT"], ["HWY", "HIGHWAY"],
+                ["BLVD", "Blvd.", "BOULEVARD"]]
+CITIES = ["SPRINGFIELD", "FRANKLIN", "GREENVILLE", "BRISTOL", "CLINTON", "FAIRVIEW", "SALEM", "MADISON",
+          "GEORGETOWN", "ARLINGTON", "ASHLAND", "DOVER", "OXFORD", "JACKSON", "BURLINGTON", "MANCHESTER"]
+
+
+def sql_list(values):
+    """Python list (of lists) of strings -> DuckDB list literal."""
+    if values and isinstance(values[0], list):
+        return "[" + ", ".join(sql_list(v) for v in values) + "]"
+    return "[" + ", ".join("'" + v.replace("'", "''") + "'" for v in values) + "]"
+
+
+def pick(values, index_expr):
+    """SQL picking `values[index_expr % len(values)]` from a list literal (DuckDB lists are 1-based)."""
+    return f"{sql_list(values)}[1 + CAST(({index_expr}) % {len(values)} AS BIGINT)]"
+
+
+def state_sizes(total, states):
+    """Split `total` parcels over the states with a skew (the first states are the largest)."""
+    weights = [1 / (k + 1) ** 0.7 for k in range(len(states))]
+    sizes = [int(total * w / sum(weights)) for w in weights]
+    sizes[0] += total - sum(sizes)
+    return dict(zip(states, sizes))
+
+
+def state_origin(idx):
+    """Lower-left corner of a state's lot grid; states are laid out 1000 km apart inside CONUS Albers."""
+    return -2_000_000 + (idx % 4) * 1_000_000, 300_000 + (idx // 4) * 1_000_000
+
+
+def parcels_sql(state, idx, states, start, end, side, n_owners, seed):
+    """SELECT producing raw Regrid-like rows `start`..`end` of one state."""
+    x0, y0 = state_origin(idx)
+    u = lambda k: f"(hash(i, {seed}, {idx}, {k}) % 1000000) / 1000000.0"
+    owner_name = (
+        f"{pick(SURNAMES, 'owner_rank')} || ' ' || "
+        f"{pick(FIRST_NAMES, f'owner_rank // {len(SURNAMES)}')} || ' ' || "
+        f"chr(65 + CAST((owner_rank // {len(SURNAMES) * len(FIRST_NAMES)}) % 26 AS INTEGER)) || "
+        f"{pick([s for s, _ in OWNER_SUFFIXES], 'hash(owner_rank, 3)')}"
+    )
+    owntype = pick([t for _, t in OWNER_SUFFIXES], "hash(owner_rank, 3)")
+    street_type = f"{sql_list(STREET_TYPES)}[1 + CAST(street_kind AS BIGINT)]"
+    return f"""
+        WITH base AS (
+            SELECT
+                i,
+                i % {side} AS col,
+                i // {side} AS row,
+                {u(1)} AS u1, {u(2)} AS u2, {u(3)} AS u3, {u(4)} AS u4, {u(5)} AS u5, {u(6)} AS u6
+            FROM range({start}, {end}) t(i)
+        ),
+        owned AS (
+            SELECT
+                *,
+                -- runs of adjacent lots share an owner; the rest are Zipf-like (log-uniform rank)
+                CASE WHEN u1 < {CLUSTER_SHARE}
+                     THEN hash(row, col // {BLOCK}, {seed}, {idx}) % {n_owners}
+                     ELSE LEAST(CAST(floor(exp(u2 * ln({n_owners}))) AS BIGINT) - 1, {n_owners - 1})
+                END AS owner_rank,
+                lpad(CAST(({(idx + 1) * 5000} + (col // {ZCTA_CELLS}) * 50 + row // {ZCTA_CELLS}) % 99999 AS VARCHAR), 5, '0')
+                    AS zcta,
+                (col // {COUNTY_CELLS}) * 10 + row // {COUNTY_CELLS} AS county_id
+            FROM base
+        ),
+        addressed AS (
+            SELECT
+                *,
+                -- individuals often live on the lot; everyone else mails to the owner's address
+                u5 < 0.5 AND hash(owner_rank, 3) % {len(OWNER_SUFFIXES)} < 3 AS occupied,
+                hash(owner_rank, 5) % {len(STREET_TYPES)} AS street_kind
+            FROM owned
+        )
+        SELECT
+            i - {start} + 1 AS ogc_fid,
+            lpad(CAST({idx + 1} AS VARCHAR), 2, '0') || lpad(CAST(county_id % 1000 AS VARCHAR), 3, '0') AS geoid,
+            {owntype} AS owntype,
+            CASE
+                WHEN u6 < 0.02 THEN NULL
+                WHEN u6 < 0.03 THEN 'CURRENT OWNER'
+                WHEN u3 < 0.3 THEN lower({owner_name})
+                ELSE {owner_name}
+            END AS owner,
+            CASE
+                WHEN u6 > 0.985 THEN ''
+                WHEN occupied THEN CAST(col * 2 + 1 AS VARCHAR) || ' ' || {pick(STREETS, 'row')} || ' ' ||
+                                   list_extract({street_type}, 1 + CAST(floor(u4 * len({street_type})) AS INTEGER))
+                ELSE CAST(1 + hash(owner_rank, 7) % 9999 AS VARCHAR) ||
+                     CASE WHEN u3 < 0.1 THEN ',  ' ELSE ' ' END ||
+                     CASE WHEN u2 < 0.2 THEN 'N ' ELSE '' END ||
+                     {pick(STREETS, 'hash(owner_rank, 11)')} || ' ' ||
+                     list_extract({street_type}, 1 + CAST(floor(u4 * len({street_type})) AS INTEGER))
+            END AS mailadd,
+            CASE WHEN u5 > 0.95 THEN 'APT ' || CAST(1 + owner_rank % 40 AS VARCHAR) END AS mail_unit,
+            CASE WHEN occupied THEN {pick(CITIES, 'county_id')} ELSE {pick(CITIES, 'hash(owner_rank, 13)')} END
+                AS mail_city,
+            CASE WHEN occupied OR u1 > 0.3 THEN '{state}' ELSE {pick(states, 'hash(owner_rank, 17)')} END
+                AS mail_state2,
+            CASE WHEN occupied THEN zcta
+                 ELSE lpad(CAST(hash(owner_rank, 19) % 99999 AS VARCHAR), 5, '0')
+            END || CASE WHEN u6 > 0.8 THEN '-' || lpad(CAST(hash(i, 23) % 9999 AS VARCHAR), 4, '0') ELSE '' END
+                AS mail_zip,
+            'USA' AS mail_country,
+            {pick(CITIES, 'county_id')} AS city,
+            'COUNTY ' || CAST(county_id AS VARCHAR) AS county,
+            '{state}' AS state2,
+            zcta AS census_zcta,
+            ST_MakeEnvelope(
+                {x0} + col * {CELL_M} + 2 + u3 * 5,
+                {y0} + row * {CELL_M} + 2 + u4 * 5,
+                {x0} + col * {CELL_M} + 35 + u5 * 20,
+                {y0} + row * {CELL_M} + 35 + u6 * 20
+            ) AS wkb_geometry
+        FROM addressed
+    """
+
+
+def urban_sql(states, sizes, seed):
+    """Circular urban areas scattered over each state's lot grid, about URBAN_SHARE of its area."""
+    parts = []
+    for idx, state in enumerate(states):
+        side = max(1, math.ceil(math.sqrt(sizes[state])))
+        extent = side * CELL_M
+        x0, y0 = state_origin(idx)
+        radius = max(500.0, extent / 20)
+        count = max(1, math.ceil(URBAN_SHARE * extent ** 2 / (math.pi * radius ** 2)))
+        parts.append(f"""
+            SELECT ST_Buffer(ST_Point(
+                {x0} + (hash(k, {seed}, {idx}, 1) % 1000000) / 1000000.0 * {extent},
+                {y0} + (hash(k, {seed}, {idx}, 2) % 1000000) / 1000000.0 * {extent}
+            ), {radius} * (0.5 + (hash(k, {seed}, {idx}, 3) % 1000) / 1000.0)) AS geom
+            FROM range({count}) t(k)
+        """)
+    return " UNION ALL ".join(parts)
+
+
+def generate(data_dir, region, parcels, states, seed=42, threads=None):
+    """Write the synthetic region and urban polygons; returns (projected dir, urban parquet path)."""
+    projected_dir = f"{data_dir}/parquet/{region}/parquets_projected"
+    urban_path = f"{data_dir}/census/urban_5070.parquet"
+    os.makedirs(projected_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(urban_path), exist_ok=True)
+
+    con = duckdb.connect(database=":memory:")
+    con.execute("INSTALL spatial;")
+    con.execute("LOAD spatial;")
+    if threads:
+        con.execute(f"PRAGMA threads = {threads};")
+
+    sizes = state_sizes(parcels, states)
+    n_owners = max(100, parcels // 3)
+    start_time = time.perf_counter()
+    for idx, state in enumerate(states):
+        side = max(1, math.ceil(math.sqrt(sizes[state])))
+        for chunk, start in enumerate(range(0, sizes[state], CHUNK_ROWS)):
+            end = min(start + CHUNK_ROWS, sizes[state])
+            out_path = os.path.join(projected_dir, f"{state}_{chunk:03d}.parquet")
+            con.execute(f"""
+                COPY ({parcels_sql(state, idx, states, start, end, side, n_owners, seed)})
+                TO '{out_path}' (FORMAT 'parquet', COMPRESSION 'zstd');
+            """)
+            print(f" {state}: wrote parcels {start}-{end} → {out_path}")
+
+    con.execute(f"COPY ({urban_sql(states, sizes, seed)}) TO '{urban_path}' (FORMAT 'parquet');")
+    print(f" Wrote urban polygons → {urban_path}")
+    con.close()
+    print(f" Generated {parcels} parcels in {time.perf_counter() - start_time:.1f}s")
+    return projected_dir, urban_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Regrid-like region.")
+    parser.add_argument("--data-dir", required=True)
+    parser.add_argument("--region", default="northeast")
+    parser.add_argument("--parcels", type=int, default=100_000, help="total parcels (10k to 100M)")
+    parser.add_argument("--states", default=DEFAULT_STATES, help="comma-separated state codes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--threads", type=int)
+    args = parser.parse_args()
+    generate(args.data_dir, args.region, args.parcels, args.states.split(","), args.seed, args.threads)
+
+
+if __name__ == "__main__":
+    main()
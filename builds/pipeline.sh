@@ -8,29 +8,23 @@ uv pip install -r requirements.txt
 DATA_DIR="/home/christina/Desktop/property-matching/regrid_2025"
 export DATA_DIR
 
+# Census urban areas (written by urban_rural/census_parquet.py) used by the urban/rural branch
+URBAN_PARQUET="/home/christina/Desktop/data/census/urban/urban_5070.parquet"
+export URBAN_PARQUET
+
 # List of regions
 REGIONS=("northeast" "midwest" "south" "west")
 
-for REGION in "${REGIONS[@]}"; do
-    export REGION
-    echo "🧭 Starting pipeline for REGION: $REGION"
-#    python3 "scripts/check_distinct.py"
-#    python3 "scripts/importparquet.py"
-#    python3 "scripts/concatpstl.py"
-#    python3 "scripts/pstlclean2.py"
-#    python3 "scripts/prop_match2.py"
-#    python3 "scripts/prop_groupmatch.py"
-#    python3 "scripts/prop_setnullgroupid.py"
-#    python3 "scripts/holds_match.py"
-#    python3 "scripts/jointables.py"
-#    python3 "scripts/getbatches.py"
-#    python3 "scripts/holds_union.py"
-#    python3 "scripts/dispersion.py"
-#    python3 "scripts/joinzipcode.py"
-#    python3 "scripts/localzip.py"
-#    python3 "scripts/addattributes.py"
-#    python3 "scripts/countchecks.py"
+# Optional sanity check of the raw input before a fresh import
+#for REGION in "${REGIONS[@]}"; do REGION=$REGION python3 "scripts/check_distinct.py"; done
+
+# The stage graph (inputs/outputs of every script) lives in parcels/dag.py. Only partitions whose
+# inputs or code changed since their last successful run are rerun; add --dry-run to preview,
+# --stages <name ...> to restrict, --force to rerun regardless. Tasks from all regions share one
+# CPU/RAM/spill budget (all cores, 75% of RAM, 80% of free temp space unless overridden).
+# Multi-host: add --distributed and start `python3 -m parcels.workqueue --data-dir "$DATA_DIR"` on every
+# node that mounts DATA_DIR (--temp-dir for node-local spill); tasks are leased from $DATA_DIR/workqueue.sqlite.
+python3 -m parcels.dag --regions "${REGIONS[@]}" # --cpus 64 --memory 200GB --spill 2TB
 
-  echo "✅ Finished REGION: $REGION"
-  echo "-------------------------------"
-done
+# GeoParquet (CRS + bbox covering metadata) and FlatGeobuf (packed Hilbert R-tree) copies for GIS users
+#python3 -m parcels.export --regions "${REGIONS[@]}" --out "$DATA_DIR/export"
@@ -4,10 +4,10 @@ uv venv .venv
 source .venv/bin/activate
 uv pip install -r requirements.txt
 
+DATA_DIR="/home/christina/Desktop/property-matching/regrid_2025"
+export DATA_DIR
+
 #python3 "urban_rural/census_parquet.py"
-#python3 "urban_rural/makecentroids.py"
-#python3 "urban_rural/selecturban.py"
-#python3 "urban_rural/joincolumn.py"
-#python3 "urban_rural/props_urban.py"
-#python3 "urban_rural/join_avgurban.py"
 
+# The urban/rural stages also run as part of builds/pipeline.sh; this reruns just that branch
+python3 -m parcels.dag --stages makecentroids selecturban joincolumn props_urban join_avgurban
@@ -4,9 +4,16 @@ uv venv .venv
 source .venv/bin/activate
 uv pip install -r requirements.txt
 
-#python3 "validation/sample_holds100.py"
-#python3 "validation/sample_holds2.py"
+DATA_DIR="/home/christina/Desktop/property-matching/regrid_2025"
+export DATA_DIR
+
+# Reproducible holding samples (bottom-k per stratum, one scan over all regions); strata are named
+# (size, state, urban, region) or SQL expressions over the holding attributes, see parcels/sampling.py.
+# The first two replace the former validation/sample_holds100.py and sample_holds2.py (25 holdings per region).
+python3 -m parcels.sampling --where "holds_numparcels = 100" --strata region --k 25 --out "$DATA_DIR/validation" --prefix 100parcel_
+python3 -m parcels.sampling --where "holds_numparcels = 2" --strata region --k 25 --out "$DATA_DIR/validation" --prefix 2parcel_
+python3 -m parcels.sampling --strata size state urban --k 25 --out "$DATA_DIR/validation" --prefix strata_
 #python3 "validation/select_props.py"
-#python3 "validation/prop_check.py"
+#python3 "validation/prop_check.py"    # or: python3 -m parcels.agreement --input <pairs.parquet> --out <dir>
 #python3 "validation/holds100summary.py"
 
@@ -0,0 +1 @@
+"""Shared helpers for the parcel/property pipeline scripts."""
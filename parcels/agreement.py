@@ -0,0 +1,141 @@
+"""
+Neighbour-agreement validation of the property grouping.
+
+Input: (focal_id, fips_id, propid, owner, pstlclean[, distance]) pairs, as
+written by `parcels.neighbors.within` for a focal sample. Each focal parcel's
+own row (fips_id = focal_id) supplies its attributes. Every other neighbour
+gets BOOLEAN flags:
+    propmatch        same `propid` (the pipeline grouped them)
+    owner_exact      identical `owner`
+    owner_norm       same owner after `owner_norm` (case, punctuation, entity suffixes)
+    pstlclean_match  same cleaned mailing address
+The flags are aggregated per focal parcel and overall. Precision/recall of
+the grouping treat "same normalized owner or same address" as the reference:
+  - precision is the share of grouped neighbours that share an owner or address;
+  - recall is the share of neighbours sharing one that were grouped.
+The pairs are processed in hash chunks of `focal_id` sized by parcels/spill.py,
+and DuckDB runs each chunk on all threads, so millions of pairs stay in memory.
+
+    python -m parcels.agreement --input validation/south_neighbors.parquet --out validation/property --name south
+"""
+
+import argparse
+import os
+
+import duckdb
+
+from parcels import catalog, checkpoint, spill
+
+# Legal-entity and filler words dropped by `owner_norm`
+OWNER_STOPWORDS = ("LLC", "INC", "CORP", "CORPORATION", "CO", "COMPANY", "LTD", "LP", "LLP",
+                   "TRUST", "TR", "TRUSTEE", "TRUSTEES", "ETAL", "ET", "AL", "THE", "OF")
+
+
+def owner_norm(expr):
+    """SQL normalizing an owner name: upper case, letters/digits only, no entity or filler words."""
+    stopwords = "|".join(OWNER_STOPWORDS)
+    return (
+        "NULLIF(TRIM(regexp_replace(regexp_replace(regexp_replace("
+        f"UPPER({expr}), '[^A-Z0-9\\s]', '', 'g'), '\\b({stopwords})\\b', ' ', 'g'), '\\s+', ' ', 'g')), '')"
+    )
+
+
+def flag_pairs(con, files, partitions=None):
+    """Create `agreement_pairs`: every non-self neighbour pair of `files` with its BOOLEAN flags."""
+    plan = spill.plan(con, "agreement.pairs", files, ["focal_id", "fips_id", "propid", "owner", "pstlclean"],
+                      spill.HASH_JOIN_FACTOR, partitions)
+    plan.materialize(con, "agreement_pairs", "focal_id", f"""
+        WITH pairs AS (
+            SELECT * FROM read_parquet({catalog.file_list(files)}) WHERE {{where}}
+        ),
+        focal AS (
+            SELECT focal_id, propid AS focal_propid, owner AS focal_owner, pstlclean AS focal_pstlclean
+            FROM pairs
+            WHERE CAST(fips_id AS VARCHAR) = CAST(focal_id AS VARCHAR)
+        )
+        SELECT
+            p.focal_id, p.fips_id, p.propid, p.owner, p.pstlclean,
+            COALESCE(p.propid = f.focal_propid, false) AS propmatch,
+            COALESCE(p.owner = f.focal_owner, false) AS owner_exact,
+            COALESCE({owner_norm("p.owner")} = {owner_norm("f.focal_owner")}, false) AS owner_norm,
+            COALESCE(p.pstlclean = f.focal_pstlclean AND TRIM(p.pstlclean) <> '', false) AS pstlclean_match
+        FROM pairs p
+        JOIN focal f USING (focal_id)
+        WHERE CAST(p.fips_id AS VARCHAR) <> CAST(p.focal_id AS VARCHAR);
+    """)
+    plan.report()
+    return con.execute("SELECT COUNT(*) FROM agreement_pairs;").fetchone()[0]
+
+
+def _rates(group_by=""):
+    return f"""
+        SELECT {group_by + "," if group_by else ""}
+            COUNT(*) AS neighbors,
+            AVG(propmatch::INT) AS propmatch_rate,
+            AVG(owner_exact::INT) AS owner_exact_rate,
+            AVG(owner_norm::INT) AS owner_norm_rate,
+            AVG(pstlclean_match::INT) AS pstlclean_match_rate,
+            COUNT(*) FILTER (propmatch AND (owner_norm OR pstlclean_match)) AS true_pos,
+            COUNT(*) FILTER (propmatch AND NOT (owner_norm OR pstlclean_match)) AS false_pos,
+            COUNT(*) FILTER (NOT propmatch AND (owner_norm OR pstlclean_match)) AS false_neg
+        FROM agreement_pairs
+        {"GROUP BY " + group_by if group_by else ""}
+    """
+
+
+def _with_scores(rates):
+    return f"""
+        SELECT *,
+            true_pos / NULLIF(true_pos + false_pos, 0) AS precision,
+            true_pos / NULLIF(true_pos + false_neg, 0) AS recall,
+            2 * true_pos / NULLIF(2 * true_pos + false_pos + false_neg, 0) AS f1
+        FROM ({rates})
+    """
+
+
+def summarize(con, name):
+    """Create `agreement_focal` (rates per focal parcel) and `agreement_summary` (one row for `name`)."""
+    con.execute(f"CREATE OR REPLACE TABLE agreement_focal AS {_with_scores(_rates('focal_id'))} ORDER BY focal_id;")
+    con.execute(f"""
+        CREATE OR REPLACE TABLE agreement_summary AS
+        SELECT '{name}' AS name, s.*, f.focals, f.mean_focal_propmatch_rate, f.mean_focal_owner_norm_rate
+        FROM ({_with_scores(_rates())}) s,
+             (SELECT COUNT(*) AS focals, AVG(propmatch_rate) AS mean_focal_propmatch_rate,
+                     AVG(owner_norm_rate) AS mean_focal_owner_norm_rate
+              FROM agreement_focal) f;
+    """)
+    return con.execute("SELECT * FROM agreement_summary;").fetchone()
+
+
+def run(con, files, out_dir, name, partitions=None):
+    """Flag the pairs of `files` and write `{name}_agreement_{pairs,focal,summary}` to `out_dir`."""
+    os.makedirs(out_dir, exist_ok=True)
+    pairs = flag_pairs(con, files, partitions)
+    summarize(con, name)
+    checkpoint.copy(con, "agreement_pairs", os.path.join(out_dir, f"{name}_agreement_pairs.parquet"))
+    con.execute(f"COPY agreement_focal TO '{os.path.join(out_dir, f'{name}_agreement_focal.csv')}' (HEADER);")
+    con.execute(f"COPY agreement_summary TO '{os.path.join(out_dir, f'{name}_agreement_summary.csv')}' (HEADER);")
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neighbour-agreement metrics of the property grouping.")
+    parser.add_argument("--input", nargs="+", required=True, help="neighbour pair Parquet file(s)")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--name", default="neighbors", help="prefix of the outputs and label of the summary")
+    parser.add_argument("--chunks", type=int, help="hash chunks of focal_id (default: sized to memory)")
+    args = parser.parse_args()
+
+    con = duckdb.connect()
+    pairs = run(con, args.input, args.out, args.name, args.chunks)
+    cur = con.execute("SELECT * FROM agreement_summary;")
+    s = dict(zip([c[0] for c in cur.description], cur.fetchone()))
+    print(f"✅ {args.name}: {s['focals']} focal parcels, {pairs} neighbour pairs")
+    for key in ("propmatch_rate", "owner_exact_rate", "owner_norm_rate", "pstlclean_match_rate",
+                "precision", "recall", "f1"):
+        value = s[key]
+        print(f"   {key:<22} {'n/a' if value is None else f'{value:.3f}'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Persistent per-region DuckDB catalog.
+
+`{data_dir}/duckdb_temp/region_{region}.duckdb` holds one view per stage output
+(over the exact list of Parquet files that exist) plus `catalog_files`, the
+footer statistics of every file behind those views. `connect()` refreshes only
+the views whose files changed (size or mtime) since the last refresh, then
+returns a connection with the spatial extension and shared PRAGMAs applied and
+the catalog's views recreated under the `catalog` schema; `attach()` does the
+same for a connection that already exists. `catalog_files` also stores each
+file's resolved schema, so views whose files all share one schema are bound
+without `union_by_name` (which would re-read every footer to merge schemas).
+
+Usage for ad-hoc analysis:
+    REGION=northeast DATA_DIR=/path/to/regrid_2025 python -m parcels.catalog
+"""
+
+import glob
+import multiprocessing
+import os
+import time
+
+import duckdb
+
+from parcels import resources
+
+# View name -> glob of the files behind it, relative to {data_dir}/parquet/{region}
+STAGE_OUTPUTS = {
+    "parquets_partitioned": "parquets_partitioned/parquets_*.parquet",
+    "parquets_concat": "parquets_concat/concatpstl_*.parquet",
+    "parquets_cleaned": "parquets_cleaned/cleanedpstl_*.parquet",
+    "parquets_encoded": "parquets_encoded/encodedpstl_*.parquet",
+    "fips_dict": "{region}_dictionary/fips_dict.parquet",
+    "owner_dict": "{region}_dictionary/owner_dict.parquet",
+    "pstl_dict": "{region}_dictionary/pstl_dict.parquet",
+    "match_pairs": "{region}_match_pairs/match_pairs_*.parquet",
+    "props_with_groupids": "{region}_props_with_groupids/props_with_groupids_*.parquet",
+    "linkage": "{region}_linkage/linkage_*.parquet",
+    "holdings": "{region}_holdings/holdings.parquet",
+    "propsholds": "{region}_propsholds/propsholds_*.parquet",
+    "prop_shapes": "{region}_prop_shapes/prop_shapes_{region}.parquet",
+    "holdings_info": "{region}_holdings/holdings_info.parquet",
+    "holds_dispersion": "{region}_holds_dispersion/holds_dispersion_bbox.parquet",
+    "propsholds_updated": "{region}_propsholds_updated/propsholds_*.parquet",
+    "propsholds_final": "{region}_propsholds_final/propsholds_final_*.parquet",
+    "propsholds_final_urban": "{region}_propsholds_final/propsholds_final_*_urban.parquet",
+    "propsholds_index": "{region}_propsholds_index/propsholds_index_*.parquet",
+    "propsholds_grid": "{region}_propsholds_grid/propsholds_grid_*.parquet",
+    "prop_shapes_aw": "{region}_prop_shapes/prop_shapes_{region}_aw.parquet",
+    "summary_cube": "{region}_summary/summary_cube.parquet",
+    "top_holders": "{region}_summary/top_holders.parquet",
+    "search_terms": "{region}_search/search_terms.parquet",
+    "search_postings": "{region}_search/search_postings.parquet",
+}
+
+DEFAULT_MEMORY_LIMIT = "100GB"
+DEFAULT_MAX_TEMP_SIZE = "500GB"
+
+
+def catalog_path(data_dir, region):
+    return f"{data_dir}/duckdb_temp/region_{region}.duckdb"
+
+
+def stage_files(data_dir, region, name):
+    """Sorted files behind a catalog view. `joincolumn.py` writes `*_urban.parquet` next to the
+    `propsholds_final` files, so only the `_urban` view picks those up."""
+    pattern = os.path.join(f"{data_dir}/parquet/{region}", STAGE_OUTPUTS[name].format(region=region))
+    files = sorted(glob.glob(pattern))
+    if not pattern.endswith("_urban.parquet"):
+        files = [f for f in files if not f.endswith("_urban.parquet")]
+    return files
+
+
+def file_list(files):
+    return "[" + ", ".join(f"'{f}'" for f in files) + "]"
+
+
+def view_sql(files, schemas):
+    """SELECT over `files`, merging schemas by name only when the files' `schemas` differ."""
+    union = ", union_by_name=True" if None in schemas or len(set(schemas)) > 1 else ""
+    return f"SELECT * FROM read_parquet({file_list(files)}{union})"
+
+
+def load_spatial(con):
+    """Load the spatial extension, installing it only the first time on this machine."""
+    installed = con.execute("""
+        SELECT installed FROM duckdb_extensions() WHERE extension_name = 'spatial'
+    """).fetchone()
+    if not installed or not installed[0]:
+        con.execute("INSTALL spatial;")
+    con.execute("LOAD spatial;")
+
+
+def configure(con, data_dir, threads=None, memory_limit=None, temp_dir=None, max_temp_size=None):
+    """Apply the PRAGMAs every stage used to set by hand. Unset values come from the
+    task's share set by the DAG runner (see parcels/resources.py), then the defaults."""
+    temp_dir = temp_dir or os.getenv("DUCKDB_TEMP_DIR") or f"{data_dir}/duckdb_temp"
+    threads = threads or os.getenv("DUCKDB_THREADS") or multiprocessing.cpu_count()
+    memory_limit = memory_limit or os.getenv("DUCKDB_MEMORY_LIMIT") or DEFAULT_MEMORY_LIMIT
+    max_temp_size = max_temp_size or os.getenv("DUCKDB_MAX_TEMP_SIZE") or DEFAULT_MAX_TEMP_SIZE
+    os.makedirs(temp_dir, exist_ok=True)
+    load_spatial(con)
+    con.execute(f"PRAGMA threads = {threads};")
+    con.execute(f"PRAGMA memory_limit='{memory_limit}';")
+    con.execute(f"PRAGMA temp_directory='{temp_dir}';")
+    con.execute(f"PRAGMA max_temp_directory_size='{max_temp_size}';")
+    # Cache Parquet footers so repeated scans of the same files skip re-reading metadata
+    con.execute("PRAGMA enable_object_cache;")
+    return con
+
+
+def worker_settings(workers, memory_limit=None, max_temp_size=None):
+    """`configure` settings for one of `workers` single-threaded pool processes, which
+    split the process's memory and spill limits instead of each taking all of them."""
+    memory = resources.parse_size(memory_limit or os.getenv("DUCKDB_MEMORY_LIMIT") or DEFAULT_MEMORY_LIMIT)
+    spill = resources.parse_size(max_temp_size or os.getenv("DUCKDB_MAX_TEMP_SIZE") or DEFAULT_MAX_TEMP_SIZE)
+    return {
+        "threads": 1,
+        "memory_limit": resources.format_size(memory // workers),
+        "max_temp_size": resources.format_size(spill // workers),
+    }
+
+
+def connect_memory(data_dir, **settings):
+    """In-memory connection with the shared settings and no catalog attached, for worker
+    processes that only read their own input files."""
+    return configure(duckdb.connect(database=":memory:"), data_dir, **settings)
+
+
+def refresh(con, data_dir, region):
+    """(Re)register the view of every stage output whose files changed since the last refresh."""
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_files (
+            view_name VARCHAR,
+            path VARCHAR,
+            size_bytes BIGINT,
+            mtime DOUBLE,
+            num_rows BIGINT,
+            num_row_groups BIGINT,
+            uncompressed_bytes BIGINT,
+            columns VARCHAR
+        );
+    """)
+    # Catalogs written before the schemas were stored get them at their next refresh
+    con.execute("ALTER TABLE catalog_files ADD COLUMN IF NOT EXISTS columns VARCHAR;")
+    refreshed = []
+    for name in STAGE_OUTPUTS:
+        files = stage_files(data_dir, region, name)
+        current = sorted((f, os.path.getsize(f), os.path.getmtime(f)) for f in files)
+        known = con.execute("""
+            SELECT path, size_bytes, mtime, columns FROM catalog_files WHERE view_name = ? ORDER BY path
+        """, [name]).fetchall()
+        if current == sorted(k[:3] for k in known) and all(k[3] is not None for k in known):
+            continue
+
+        con.execute("DELETE FROM catalog_files WHERE view_name = ?;", [name])
+        if not files:
+            con.execute(f"DROP VIEW IF EXISTS {name};")
+            continue
+
+        # Schema as DuckDB binds the file on its own (footer only), e.g. "propid BIGINT, geom GEOMETRY"
+        schemas = [", ".join(f"{col} {typ}" for col, typ, *_ in con.execute(
+            f"DESCRIBE SELECT * FROM read_parquet('{f}');").fetchall()) for f, _, _ in current]
+        con.executemany(
+            "INSERT INTO catalog_files (view_name, path, size_bytes, mtime, columns) VALUES (?, ?, ?, ?, ?);",
+            [[name, f, size, mtime, schema] for (f, size, mtime), schema in zip(current, schemas)],
+        )
+        con.execute(f"""
+            UPDATE catalog_files c
+            SET num_rows = m.num_rows, num_row_groups = m.num_row_groups, uncompressed_bytes = m.uncompressed_bytes
+            FROM (
+                SELECT f.file_name, f.num_rows, f.num_row_groups, u.uncompressed_bytes
+                FROM parquet_file_metadata({file_list(files)}) f
+                JOIN (
+                    SELECT file_name, SUM(total_uncompressed_size) AS uncompressed_bytes
+                    FROM parquet_metadata({file_list(files)})
+                    GROUP BY file_name
+                ) u ON f.file_name = u.file_name
+            ) m
+            WHERE c.view_name = ? AND c.path = m.file_name;
+        """, [name])
+        con.execute(f"CREATE OR REPLACE VIEW {name} AS {view_sql([f for f, _, _ in current], schemas)};")
+        refreshed.append(name)
+    return refreshed
+
+
+def _retry_locked(fn, attempts=120, delay=1.0):
+    """Run `fn`, retrying while another process briefly holds the catalog file lock."""
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except duckdb.IOException as e:
+            if "lock" not in str(e).lower() or attempt == attempts - 1:
+                raise
+            time.sleep(delay)
+
+
+def attach(con, data_dir, region, refresh_views=True):
+    """
+    Refresh the region catalog and (re)create its views under the `catalog` schema
+    of `con` (e.g. `catalog.prop_shapes`). The catalog file is only opened long
+    enough to refresh it and copy `catalog_files`, so stages running concurrently
+    never hold its lock for the length of a stage. Long-lived connections call
+    this again before each stage to pick up the files earlier stages wrote.
+    """
+    path = catalog_path(data_dir, region)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if refresh_views or not os.path.exists(path):
+        def refresh_catalog():
+            writer = duckdb.connect(database=path)
+            try:
+                load_spatial(writer)
+                return refresh(writer, data_dir, region)
+            finally:
+                writer.close()
+
+        refreshed = _retry_locked(refresh_catalog)
+        if refreshed:
+            print(f"🔹 Catalog views refreshed: {refreshed}")
+
+    _retry_locked(lambda: con.execute(f"ATTACH '{path}' AS region_catalog (READ_ONLY);"))
+    con.execute("DROP SCHEMA IF EXISTS catalog CASCADE;")
+    con.execute("CREATE SCHEMA catalog;")
+    con.execute("CREATE TABLE catalog.catalog_files AS SELECT * FROM region_catalog.catalog_files;")
+    con.execute("DETACH region_catalog;")
+
+    views = con.execute("""
+        SELECT view_name, list(path ORDER BY path), list(columns ORDER BY path)
+        FROM catalog.catalog_files GROUP BY view_name
+    """).fetchall()
+    for name, files, schemas in views:
+        con.execute(f"CREATE VIEW catalog.{name} AS {view_sql(files, schemas)};")
+    return con
+
+
+def connect(data_dir, region, refresh_views=True, **settings):
+    """In-memory connection with spatial loaded, the shared PRAGMAs applied and the
+    region catalog attached (see `attach`)."""
+    return attach(connect_memory(data_dir, **settings), data_dir, region, refresh_views)
+
+
+def reset(con):
+    """Drop the scratch tables and views a stage left in `con`, keeping the `catalog` schema,
+    so a long-lived connection does not carry one stage's tables into the next."""
+    for schema, name, kind in con.execute("""
+        SELECT schema_name, table_name, 'TABLE' FROM duckdb_tables()
+        WHERE database_name IN ('memory', 'temp') AND schema_name <> 'catalog'
+        UNION ALL
+        SELECT schema_name, view_name, 'VIEW' FROM duckdb_views()
+        WHERE database_name IN ('memory', 'temp') AND schema_name <> 'catalog' AND NOT internal
+    """).fetchall():
+        con.execute(f'DROP {kind} IF EXISTS "{schema}"."{name}";')
+
+
+def view_files(con, name):
+    """Files behind a catalog view, as recorded at the last refresh."""
+    return [r[0] for r in con.execute(
+        "SELECT path FROM catalog.catalog_files WHERE view_name = ? ORDER BY path;", [name]).fetchall()]
+
+
+def view_rows(con, name):
+    """Row count of a catalog view from the stored footer statistics (no scan)."""
+    return con.execute("SELECT SUM(num_rows) FROM catalog.catalog_files WHERE view_name = ?;", [name]).fetchone()[0]
+
+
+if __name__ == "__main__":
+    con = connect(os.getenv("DATA_DIR"), os.getenv("REGION"))
+    print(con.execute("""
+        SELECT view_name, COUNT(*) AS files, SUM(num_rows) AS num_rows,
+               SUM(num_row_groups) AS row_groups, SUM(size_bytes) AS size_bytes
+        FROM catalog.catalog_files
+        GROUP BY view_name
+        ORDER BY view_name
+    """).fetchdf().to_string(index=False))
+    con.close()
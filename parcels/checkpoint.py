@@ -0,0 +1,142 @@
+"""
+Crash-safe stage outputs and per-partition completion markers.
+
+Every stage output is written through `atomic`: DuckDB writes a hidden
+`.{name}.{pid}.{random}.tmp` next to the target, unique to the writer, which is
+fsynced and renamed over the target only once the write finished. Two writers
+of one target (e.g. a work-queue task taken over after its lease expired)
+never share or delete each other's temporary file; the last rename wins. A kill mid-write therefore leaves the
+previous file (or none) in place, never a truncated one, and a stage that
+rewrites its own input (prop_setnullgroupid) cannot destroy it. After the
+rename, `mark` writes `{name}.done` with the row count, size and checksum of
+the file; `complete` checks it. Runners started with RESUME=1 (`parcels.run
+--resume`) skip the state partitions whose outputs are all complete, and the
+DAG reruns a partition whose output no longer matches its marker.
+"""
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+from parcels import telemetry
+
+MARKER_SUFFIX = ".done"
+TMP_SUFFIX = ".tmp"
+
+
+def file_digest(path):
+    """
+    Content digest of a file. For Parquet the footer (schema, row-group offsets
+    and column statistics) plus the file size identifies the content without
+    reading the data pages; anything else is hashed in full.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    size = os.path.getsize(path)
+    h.update(str(size).encode())
+    with open(path, "rb") as f:
+        if path.endswith(".parquet") and size >= 12:
+            f.seek(size - 8)
+            footer_len = int.from_bytes(f.read(4), "little")
+            f.seek(max(0, size - 8 - footer_len))
+            h.update(f.read(footer_len + 8))
+        else:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def marker_path(path):
+    return f"{path}{MARKER_SUFFIX}"
+
+
+def _fsync(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic(path):
+    """
+    Yield a temporary path next to `path`, unique to this call, to write to; when
+    the block succeeds it is fsynced and renamed over `path`, otherwise removed.
+    The old marker is dropped first so it never vouches for a file that is being
+    replaced (another writer of the same target may have dropped it already).
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = os.path.join(directory, f".{name}.{os.getpid()}.{uuid.uuid4().hex}{TMP_SUFFIX}")
+    try:
+        os.remove(marker_path(path))
+    except FileNotFoundError:
+        pass
+    try:
+        yield tmp
+        _fsync(tmp)
+        os.replace(tmp, path)
+        _fsync(directory)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def mark(con, path, **extra):
+    """Record `path` as complete: rows (from the Parquet footer), bytes and checksum."""
+    rows = None
+    if path.endswith(".parquet"):
+        rows = con.execute("SELECT SUM(num_rows) FROM parquet_file_metadata(?);", [path]).fetchone()[0]
+    marker = {
+        "rows": None if rows is None else int(rows),
+        "bytes": os.path.getsize(path),
+        "checksum": file_digest(path),
+        "written": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **extra,
+    }
+    with atomic(marker_path(path)) as tmp:
+        with open(tmp, "w") as f:
+            json.dump(marker, f)
+    return marker
+
+
+def copy(con, source, path, options="FORMAT 'parquet'"):
+    """Crash-safe `COPY {source} TO path`; `source` is a table name or a parenthesised query."""
+    with atomic(path) as tmp:
+        telemetry.execute(con, f"COPY {source} TO '{tmp}' ({options});")
+    return mark(con, path)
+
+
+def read_marker(path):
+    try:
+        with open(marker_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def complete(path):
+    """True when `path` exists and still matches the marker written after it."""
+    marker = read_marker(path)
+    return (marker is not None and os.path.exists(path)
+            and marker["bytes"] == os.path.getsize(path) and marker["checksum"] == file_digest(path))
+
+
+def intact(path):
+    """False only for a file whose marker no longer matches it; outputs written
+    before markers existed are trusted as they are."""
+    return not os.path.exists(marker_path(path)) or complete(path)
+
+
+def pending(states, *patterns, resume=True):
+    """The states whose outputs (`patterns` with a `{state}` placeholder) are not all complete."""
+    if not resume:
+        return list(states)
+    done = [s for s in states if all(complete(p.format(state=s)) for p in patterns)]
+    if done:
+        print(f"⏭ Resuming: skipping complete states {done}")
+    return [s for s in states if s not in done]
@@ -0,0 +1,89 @@
+"""Explicit configuration handed to every stage in `parcels.stages`."""
+
+import os
+from dataclasses import dataclass
+
+from parcels import catalog, checkpoint, resources
+
+REGIONS = ["northeast", "midwest", "south", "west"]
+DEFAULT_DATA_DIR = "/home/christina/Desktop/property-matching/regrid_2025"
+DEFAULT_URBAN_PARQUET = "/home/christina/Desktop/data/census/urban/urban_5070.parquet"
+
+
+@dataclass
+class Config:
+    region: str
+    data_dir: str = DEFAULT_DATA_DIR
+    states: list = None            # None: every state present in the stage's input
+    urban_parquet: str = DEFAULT_URBAN_PARQUET
+    threads: int = None            # DuckDB settings; None falls back to catalog.configure defaults
+    memory_limit: str = None
+    temp_dir: str = None
+    max_temp_size: str = None
+    workers: int = None            # process-pool size in pstlclean2/prop_match2; 1 runs states inline
+    count_mode: str = "approx"     # countchecks: "approx" (HyperLogLog) or "exact" distinct counts
+    count_tolerance: float = 0.02  # countchecks: relative error allowed against HyperLogLog estimates
+    resume: bool = False           # skip state partitions whose outputs are complete (parcels/checkpoint.py)
+    overlap: bool = True           # prefetch/async-write in per-state loops (parcels/overlap.py)
+    match_radius: float = None     # prop_match2: largest distance (m) at which candidate pairs are kept;
+                                   # None: match_threshold (wider only to compare thresholds, parcels/linkage.py)
+    match_threshold: float = 100.0 # prop_groupmatch: distance (m) up to which pairs join a property
+    owner_similarity: float = None # prop_match2: token similarity for fuzzy owner pairs; None: exact owners only
+    top_k: int = 10                # topholders: largest holdings kept per county, state and region
+
+    @classmethod
+    def from_env(cls, region=None):
+        """The configuration the `scripts/*.py` shims and the DAG runner pass through the environment."""
+        states = os.getenv("STATES")
+        return cls(
+            region=region or os.getenv("REGION"),
+            data_dir=os.getenv("DATA_DIR", DEFAULT_DATA_DIR),
+            states=[s.strip() for s in states.split(",") if s.strip()] if states else None,
+            urban_parquet=os.getenv("URBAN_PARQUET", DEFAULT_URBAN_PARQUET),
+            threads=int(os.environ["DUCKDB_THREADS"]) if os.getenv("DUCKDB_THREADS") else None,
+            memory_limit=os.getenv("DUCKDB_MEMORY_LIMIT"),
+            temp_dir=os.getenv("DUCKDB_TEMP_DIR"),
+            max_temp_size=os.getenv("DUCKDB_MAX_TEMP_SIZE"),
+            workers=int(os.environ["MAX_WORKERS"]) if os.getenv("MAX_WORKERS") else None,
+            count_mode=os.getenv("COUNT_MODE", "approx").lower(),
+            count_tolerance=float(os.getenv("COUNT_TOLERANCE", "0.02")),
+            resume=os.getenv("RESUME", "") not in ("", "0"),
+            overlap=os.getenv("OVERLAP_IO", "1") != "0",
+            match_radius=float(os.environ["MATCH_RADIUS"]) if os.getenv("MATCH_RADIUS") else None,
+            match_threshold=float(os.getenv("MATCH_THRESHOLD", "100")),
+            owner_similarity=float(os.environ["OWNER_SIMILARITY"]) if os.getenv("OWNER_SIMILARITY") else None,
+            top_k=int(os.getenv("TOP_K", "10")),
+        )
+
+    def __post_init__(self):
+        # Pairs beyond MATCH_THRESHOLD never join a property, so by default they are not searched for
+        if self.match_radius is None:
+            self.match_radius = self.match_threshold
+
+    @property
+    def region_dir(self):
+        return f"{self.data_dir}/parquet/{self.region}"
+
+    def path(self, *parts):
+        """Path under the region directory; `{region}` in a part is filled in (`{state}` is left as is)."""
+        return os.path.join(self.region_dir, *(p.replace("{region}", self.region) for p in parts))
+
+    def select(self, states):
+        """The given states restricted to `self.states` (all of them when unset)."""
+        return [s for s in states if self.states is None or s in self.states]
+
+    def pending(self, states, *paths):
+        """`states` minus those whose outputs (paths with a `{state}` placeholder) are complete, when resuming."""
+        return checkpoint.pending(states, *paths, resume=self.resume)
+
+    def pool_size(self, tasks):
+        """Process-pool size for `tasks` independent states: `workers` if set, the runner's share otherwise."""
+        return max(1, min(self.workers, tasks)) if self.workers else resources.max_workers(tasks)
+
+    def settings(self):
+        return {"threads": self.threads, "memory_limit": self.memory_limit,
+                "temp_dir": self.temp_dir, "max_temp_size": self.max_temp_size}
+
+    def connect(self):
+        """In-memory connection with the shared settings; stages attach the region catalog themselves."""
+        return catalog.connect_memory(self.data_dir, **self.settings())
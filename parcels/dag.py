@@ -0,0 +1,544 @@
+"""
+Content-hashed DAG runner for the regional pipeline.
+
+Each stage declares the files it reads and writes relative to
+`{data_dir}/parquet/{region}`; per-state stages use a `{state}` placeholder.
+A partition (one state, or the whole region for regional stages) reruns only
+when the fingerprint of its inputs plus the stage's code differs from the one
+recorded after its last successful run, or when one of its outputs is missing.
+Each stale partition is one task; per-state tasks name their state through
+the `STATES` environment variable. Tasks from all regions and stages whose
+dependencies are done share one CPU/RAM/spill budget (parcels/resources.py)
+and start largest-first, each with its own thread count and memory limit.
+Every task's wall/CPU time, peak RSS, rows/bytes, spill and query profiles
+go into a run report under `{data_dir}/telemetry/` (parcels/telemetry.py).
+
+Usage:
+    DATA_DIR=/path/to/regrid_2025 python -m parcels.dag --regions northeast midwest
+    DATA_DIR=... python -m parcels.dag --regions south --stages prop_match2 --force --dry-run
+    DATA_DIR=... python -m parcels.dag --regions south --distributed   # with parcels.workqueue workers
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from parcels import checkpoint, resources, telemetry, workqueue
+from parcels.config import DEFAULT_URBAN_PARQUET, REGIONS, Config
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# State codes never contain "_": importparquet.py writes spaces as "-" and rejects state2
+# values with "_", which keeps `propsholds_final_{state}.parquet` from matching the `_urban` variants
+STATE_RE = "([^_/]+)"
+REGION_PARTITION = "*"
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    scripts: tuple
+    inputs: tuple
+    outputs: tuple
+    after: tuple = ()
+    per_state: bool = False
+    params: tuple = ()  # `Config` fields that change the outputs, fingerprinted with the inputs
+
+
+STAGES = [
+    Stage("importparquet", ("scripts/importparquet.py",),
+          inputs=("parquets_projected/*.parquet",),
+          outputs=("parquets_partitioned/parquets_*.parquet",)),
+    Stage("concatpstl", ("scripts/concatpstl.py",),
+          inputs=("parquets_partitioned/parquets_{state}.parquet",),
+          outputs=("parquets_concat/concatpstl_{state}.parquet",),
+          after=("importparquet",), per_state=True),
+    Stage("pstlclean2", ("scripts/pstlclean2.py",),
+          inputs=("parquets_concat/concatpstl_{state}.parquet",),
+          outputs=("parquets_cleaned/cleanedpstl_{state}.parquet",),
+          after=("concatpstl",), per_state=True),
+    # One regional task builds the shared dictionaries; it removes every encoded file when the `fips_id` set
+    # changed, because `fips_code`s are then renumbered (and owner/address codes restarted)
+    Stage("dictionaries", ("scripts/dictionaries.py",),
+          inputs=("parquets_cleaned/cleanedpstl_*.parquet",),
+          outputs=("{region}_dictionary/fips_dict.parquet", "{region}_dictionary/owner_dict.parquet",
+                   "{region}_dictionary/pstl_dict.parquet"),
+          after=("pstlclean2",)),
+    # Owner/address codes are append-only between renumbers, so only `fips_dict` (rewritten only on a
+    # renumber) is an input: new owners of one state do not make the other states stale
+    Stage("dictencode", ("scripts/dictencode.py",),
+          inputs=("parquets_cleaned/cleanedpstl_{state}.parquet", "{region}_dictionary/fips_dict.parquet"),
+          outputs=("parquets_encoded/encodedpstl_{state}.parquet",),
+          after=("dictionaries",), per_state=True),
+    Stage("prop_match2", ("scripts/prop_match2.py",),
+          inputs=("parquets_encoded/encodedpstl_{state}.parquet",),
+          outputs=("{region}_match_pairs/match_pairs_{state}.parquet",),
+          after=("dictencode",), per_state=True, params=("match_radius", "owner_similarity")),
+    # prop_setnullgroupid.py rewrites the prop_groupmatch.py output in place, so both form one stage
+    Stage("prop_groupmatch", ("scripts/prop_groupmatch.py", "scripts/prop_setnullgroupid.py"),
+          inputs=("{region}_match_pairs/match_pairs_{state}.parquet", "parquets_encoded/encodedpstl_{state}.parquet"),
+          outputs=("{region}_props_with_groupids/props_with_groupids_{state}.parquet",
+                   "{region}_linkage/linkage_{state}.parquet"),
+          after=("prop_match2",), per_state=True, params=("match_threshold",)),
+    Stage("holds_match", ("scripts/holds_match.py",),
+          inputs=("{region}_props_with_groupids/props_with_groupids_*.parquet", "{region}_dictionary/fips_dict.parquet"),
+          outputs=("{region}_holdings/holdings.parquet",),
+          after=("prop_groupmatch",)),
+    Stage("jointables", ("scripts/jointables.py",),
+          inputs=("{region}_props_with_groupids/props_with_groupids_{state}.parquet", "{region}_holdings/holdings.parquet"),
+          outputs=("{region}_propsholds/propsholds_{state}.parquet",),
+          after=("holds_match",), per_state=True),
+    Stage("getbatches", ("scripts/getbatches.py",),
+          inputs=("{region}_propsholds/propsholds_*.parquet",),
+          outputs=("{region}_prop_shapes/prop_shapes_{region}.parquet",),
+          after=("jointables",)),
+    Stage("holds_union", ("scripts/holds_union.py",),
+          inputs=("{region}_prop_shapes/prop_shapes_{region}.parquet",),
+          outputs=("{region}_holdings/holdings_info.parquet",),
+          after=("getbatches",)),
+    Stage("dispersion", ("scripts/dispersion.py",),
+          inputs=("{region}_prop_shapes/prop_shapes_{region}.parquet",),
+          outputs=("{region}_holds_dispersion/holds_dispersion_bbox.parquet",),
+          after=("getbatches",)),
+    Stage("joinzipcode", ("scripts/joinzipcode.py",),
+          inputs=("{region}_propsholds/propsholds_{state}.parquet", "parquets_partitioned/parquets_{state}.parquet"),
+          outputs=("{region}_propsholds_updated/propsholds_{state}.parquet",),
+          after=("jointables",), per_state=True),
+    Stage("localzip", ("scripts/localzip.py",),
+          inputs=("{region}_propsholds_updated/propsholds_{state}.parquet",),
+          outputs=("{region}_propsholds_final/propsholds_final_{state}.parquet",
+                   "{region}_propsholds_index/propsholds_index_{state}.parquet",
+                   "{region}_propsholds_grid/propsholds_grid_{state}.parquet"),
+          after=("joinzipcode",), per_state=True),
+    Stage("searchindex", ("scripts/searchindex.py",),
+          inputs=("{region}_dictionary/owner_dict.parquet", "{region}_dictionary/pstl_dict.parquet",
+                  "{region}_propsholds_final/propsholds_final_*.parquet"),
+          outputs=("{region}_search/search_terms.parquet", "{region}_search/search_grams.parquet",
+                   "{region}_search/search_postings.parquet"),
+          after=("localzip",)),
+    # urban/rural branch (runs next to getbatches/dispersion)
+    Stage("makecentroids", ("urban_rural/makecentroids.py",),
+          inputs=("{region}_propsholds_final/propsholds_final_{state}.parquet",),
+          outputs=("{region}_centroids/{region}_{state}_centroids.parquet",),
+          after=("localzip",), per_state=True),
+    Stage("selecturban", ("urban_rural/selecturban.py",),
+          inputs=("{region}_centroids/{region}_{state}_centroids.parquet", "{urban_parquet}"),
+          outputs=("{region}_census/{region}_{state}_urban_flag.parquet",),
+          after=("makecentroids",), per_state=True),
+    Stage("joincolumn", ("urban_rural/joincolumn.py",),
+          inputs=("{region}_propsholds_final/propsholds_final_{state}.parquet",
+                  "{region}_census/{region}_{state}_urban_flag.parquet"),
+          outputs=("{region}_propsholds_final/propsholds_final_{state}_urban.parquet",),
+          after=("selecturban",), per_state=True),
+    Stage("props_urban", ("urban_rural/props_urban.py",),
+          inputs=("{region}_propsholds_final/propsholds_final_*_urban.parquet",),
+          outputs=("{region}_prop_shapes/props_urban.parquet",),
+          after=("joincolumn",)),
+    Stage("join_avgurban", ("urban_rural/join_avgurban.py",),
+          inputs=("{region}_prop_shapes/prop_shapes_{region}.parquet", "{region}_prop_shapes/props_urban.parquet"),
+          outputs=("{region}_prop_shapes/prop_shapes_{region}_with_urban.parquet",),
+          after=("props_urban", "getbatches")),
+    Stage("addattributes", ("scripts/addattributes.py",),
+          inputs=("{region}_prop_shapes/prop_shapes_{region}_with_urban.parquet",
+                  "{region}_propsholds_final/propsholds_final_*_urban.parquet"),
+          outputs=("{region}_prop_shapes/prop_shapes_{region}_aw.parquet",),
+          after=("join_avgurban",)),
+    # Rescans every state when run from the DAG; `STATES=TX python3 scripts/summarycube.py` updates one state's rows
+    Stage("summarycube", ("scripts/summarycube.py",),
+          inputs=("{region}_propsholds_final/propsholds_final_*.parquet",
+                  "{region}_propsholds_final/propsholds_final_*_urban.parquet",
+                  "{region}_prop_shapes/prop_shapes_{region}_aw.parquet",
+                  "{region}_holds_dispersion/holds_dispersion_bbox.parquet"),
+          outputs=("{region}_summary/summary_cube.parquet", "{region}_summary/summary_holdings.parquet",
+                   "{region}_summary/summary_props_*.parquet"),
+          after=("addattributes", "dispersion")),
+    Stage("topholders", ("scripts/topholders.py",),
+          inputs=("{region}_summary/summary_props_*.parquet",
+                  "{region}_propsholds_index/propsholds_index_*.parquet"),
+          outputs=("{region}_summary/top_holders.parquet",),
+          after=("summarycube",), params=("top_k",)),
+    Stage("exporttiles", ("scripts/exporttiles.py",),
+          inputs=("{region}_prop_shapes/prop_shapes_{region}.parquet",
+                  "{region}_prop_shapes/prop_shapes_{region}_aw.parquet",
+                  "{region}_propsholds_final/propsholds_final_*_urban.parquet"),
+          outputs=("{region}_tiles/{region}.pmtiles",),
+          after=("addattributes",)),
+    Stage("countchecks", ("scripts/countchecks.py",),
+          inputs=("parquets_partitioned/parquets_*.parquet",
+                  "{region}_propsholds_final/propsholds_final_*.parquet",
+                  "{region}_prop_shapes/prop_shapes_{region}.parquet",
+                  "{region}_holdings/holdings_info.parquet"),
+          outputs=(),
+          after=("localzip", "holds_union")),
+]
+STAGES_BY_NAME = {stage.name: stage for stage in STAGES}
+
+
+def region_dir(data_dir, region):
+    return f"{data_dir}/parquet/{region}"
+
+
+def expand(pattern, data_dir, region, state=None):
+    """Files matching a declared input/output pattern (absolute patterns are used as-is). As in
+    `catalog.stage_files`, `*_urban.parquet` files only match patterns ending in `_urban.parquet`."""
+    pattern = pattern.format(
+        region=region,
+        state=state if state is not None else "{state}",
+        urban_parquet=os.getenv("URBAN_PARQUET", DEFAULT_URBAN_PARQUET),
+    )
+    files = sorted(glob.glob(os.path.join(region_dir(data_dir, region), pattern)))
+    if not pattern.endswith("_urban.parquet"):
+        files = [f for f in files if not f.endswith("_urban.parquet")]
+    return files
+
+
+def stage_states(stage, data_dir, region):
+    """States present for a per-state stage, read off its first `{state}` input."""
+    pattern = next(p for p in stage.inputs if "{state}" in p)
+    pattern = pattern.format(region=region, state="{state}", urban_parquet="")
+    full = os.path.join(region_dir(data_dir, region), pattern)
+    regex = re.compile("^" + re.escape(full).replace(re.escape("{state}"), STATE_RE) + "$")
+    files = glob.glob(full.replace("{state}", "*"))
+    return sorted({m.group(1) for m in map(regex.match, files) if m})
+
+
+def _module_path(dotted):
+    """Source file of a module under the repo, or None (e.g. for a function name)."""
+    base = os.path.join(REPO_DIR, *dotted.split("."))
+    for path in (f"{base}.py", os.path.join(base, "__init__.py")):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def code_digest(stage):
+    """Digest of the stage scripts and the `parcels` modules they import, transitively
+    (the scripts are shims around `parcels.stages`, which import the shared helpers)."""
+    h = hashlib.blake2b(digest_size=16)
+    seen = set()
+    pending = [os.path.join(REPO_DIR, script) for script in stage.scripts]
+    while pending:
+        path = pending.pop(0)
+        if path in seen:
+            continue
+        seen.add(path)
+        with open(path, "rb") as f:
+            source = f.read()
+        h.update(source)
+        for package, names in re.findall(rb"from (parcels(?:\.\w+)*) import ([\w, ]+)", source):
+            package = package.decode()
+            imported = [_module_path(f"{package}.{n.strip()}") for n in names.decode().split(",")]
+            pending.extend(sorted({m for m in imported if m} | {_module_path(package)} - {None}))
+    return h.hexdigest()
+
+
+class Ledger:
+    """Per-region record of partition fingerprints and cached file digests."""
+
+    def __init__(self, data_dir, region):
+        self.path = os.path.join(region_dir(data_dir, region), ".pipeline_state.json")
+        self.lock = threading.Lock()
+        self.data = {"stages": {}, "files": {}}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.data = json.load(f)
+
+    def digest(self, path):
+        stat = os.stat(path)
+        key = [stat.st_size, stat.st_mtime_ns]
+        with self.lock:
+            cached = self.data["files"].get(path)
+        if cached and cached[:2] == key:
+            return cached[2]
+        digest = checkpoint.file_digest(path)
+        with self.lock:
+            self.data["files"][path] = key + [digest]
+        return digest
+
+    def fingerprint(self, stage, partition):
+        with self.lock:
+            return self.data["stages"].get(stage, {}).get(partition)
+
+    def record(self, stage, fingerprints):
+        with self.lock:
+            self.data["stages"].setdefault(stage, {}).update(fingerprints)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.data, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+
+
+def partition_fingerprint(stage, data_dir, region, state, ledger):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(code_digest(stage).encode())
+    if stage.params:
+        cfg = Config.from_env(region)
+        for name in stage.params:
+            h.update(f"{name}={getattr(cfg, name)!r}".encode())
+    for pattern in stage.inputs:
+        h.update(pattern.encode())
+        for path in expand(pattern, data_dir, region, state):
+            h.update(os.path.relpath(path, data_dir).encode())
+            h.update(ledger.digest(path).encode())
+    return h.hexdigest()
+
+
+def outputs_present(stage, data_dir, region, state):
+    """Every declared output exists and none was changed or cut short since its completion marker."""
+    for pattern in stage.outputs:
+        files = expand(pattern, data_dir, region, state)
+        if not files or not all(checkpoint.intact(path) for path in files):
+            return False
+    return True
+
+
+def stale_partitions(stage, data_dir, region, ledger, force=False):
+    """Partition -> fingerprint for every partition of a stage that needs to run."""
+    partitions = stage_states(stage, data_dir, region) if stage.per_state else [REGION_PARTITION]
+    stale = {}
+    for partition in partitions:
+        state = None if partition == REGION_PARTITION else partition
+        fingerprint = partition_fingerprint(stage, data_dir, region, state, ledger)
+        if (force or ledger.fingerprint(stage.name, partition) != fingerprint
+                or not outputs_present(stage, data_dir, region, state)):
+            stale[partition] = fingerprint
+    return stale
+
+
+def input_bytes(stage, data_dir, region, state):
+    return sum(
+        os.path.getsize(path)
+        for pattern in stage.inputs
+        for path in expand(pattern, data_dir, region, state)
+    )
+
+
+@dataclass
+class Task:
+    """One partition of one stage for one region, with its resource request."""
+    region: str
+    stage: Stage
+    partition: str
+    fingerprint: str
+    request: resources.Request
+
+    @property
+    def state(self):
+        return None if self.partition == REGION_PARTITION else self.partition
+
+    @property
+    def key(self):
+        return f"{self.region}.{self.stage.name}.{self.state or 'region'}"
+
+    def files(self, data_dir, patterns):
+        return [path for pattern in patterns for path in expand(pattern, data_dir, self.region, self.state)]
+
+    def __str__(self):
+        where = self.region if self.partition == REGION_PARTITION else f"{self.region}/{self.partition}"
+        return f"[{where}] {self.stage.name}"
+
+
+def run_task(task, data_dir, ledger, run_dir, temp_root=None):
+    """
+    Run the stage scripts for one partition with its share of the budget, record
+    its fingerprint if they succeed (unless `ledger` is None, as on work-queue
+    workers) and return the task's telemetry record.
+    """
+    task_dir = os.path.join(run_dir, "tasks", task.key)
+    temp_dir = os.path.join(temp_root or os.path.join(data_dir, "duckdb_temp"), task.key)
+    env = dict(os.environ, REGION=task.region, DATA_DIR=data_dir, TELEMETRY_DIR=task_dir,
+               DUCKDB_TEMP_DIR=temp_dir, **task.request.env())
+    if task.stage.per_state:
+        env["STATES"] = task.partition
+
+    record = {
+        "region": task.region, "stage": task.stage.name, "partition": task.partition, "status": "ok",
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"), "threads": task.request.threads,
+        "memory_limit_bytes": task.request.memory, "wall_s": 0.0, "cpu_s": 0.0, "peak_rss_bytes": 0,
+    }
+    record.update(telemetry.file_stats(task.files(data_dir, task.stage.inputs), "in"))
+    with telemetry.SpillMonitor(temp_dir) as spill:
+        for script in task.stage.scripts:
+            usage = telemetry.run_measured([sys.executable, script], cwd=REPO_DIR, env=env)
+            record["wall_s"] += usage["wall_s"]
+            record["cpu_s"] += usage["cpu_s"]
+            record["peak_rss_bytes"] = max(record["peak_rss_bytes"], usage["peak_rss_bytes"])
+            if usage["returncode"]:
+                record["status"] = f"failed ({script} exited {usage['returncode']})"
+                break
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    record["spill_peak_bytes"] = spill.peak
+    record.update(telemetry.file_stats(task.files(data_dir, task.stage.outputs), "out"))
+    record.update(telemetry.collect(task_dir))
+
+    if record["status"] == "ok" and ledger is not None:
+        ledger.record(task.stage.name, {task.partition: task.fingerprint})
+    return record
+
+
+def run(data_dir, regions, stage_names=None, force=False, dry_run=False, budget=None, distributed=False):
+    """
+    Run the selected stages for every region. A stage's stale partitions become
+    tasks as soon as its dependencies are done; tasks from all regions and stages
+    share one resource budget and start largest-first whenever they fit. A task
+    that does not fit even an idle budget still starts once nothing else runs.
+    With `distributed`, ready tasks go to the shared work queue instead and
+    workers on any host run them within their own budgets (parcels/workqueue.py).
+    """
+    budget = budget or resources.Budget.detect(f"{data_dir}/duckdb_temp")
+    pool = resources.Pool(budget)
+    print(f"🔹 Resource budget: {budget}")
+
+    started = time.strftime("%Y-%m-%dT%H:%M:%S")
+    run_id = time.strftime("%Y%m%d-%H%M%S")
+    run_dir = os.path.join(data_dir, "telemetry", run_id)
+    records = []
+
+    selected = [s for s in STAGES if not stage_names or s.name in stage_names]
+    selected_names = {s.name for s in selected}
+    ledgers = {region: Ledger(data_dir, region) for region in regions}
+
+    pending = {(region, stage.name) for region in regions for stage in selected}
+    done, failed = set(), set()
+    open_tasks = {}   # (region, stage) -> number of its tasks not finished yet
+    stage_failed = set()
+    queue = []
+    running = {}
+
+    def finish(node, ok):
+        (done if ok else failed).add(node)
+        print(f"{'✅' if ok else '❌'} [{node[0]}] {node[1]}: {'done' if ok else 'failed'}")
+
+    executor = workqueue.RemoteExecutor(data_dir) if distributed else ThreadPoolExecutor(max_workers=budget.cpus)
+    with executor:
+        while pending or queue or running:
+            # Turn every stage whose dependencies are done into tasks
+            for node in sorted(pending):
+                region, name = node
+                deps = [d for d in STAGES_BY_NAME[name].after if d in selected_names]
+                if any((region, d) in failed for d in deps):
+                    pending.discard(node)
+                    failed.add(node)
+                    print(f"⏭ [{region}] {name}: skipped (upstream failed)")
+                    continue
+                if not all((region, d) in done for d in deps):
+                    continue
+                pending.discard(node)
+                stage = STAGES_BY_NAME[name]
+                stale = stale_partitions(stage, data_dir, region, ledgers[region], force)
+                if not stale:
+                    print(f"✔ [{region}] {name}: up to date")
+                    done.add(node)
+                    continue
+                for partition, fingerprint in stale.items():
+                    state = None if partition == REGION_PARTITION else partition
+                    request = budget.estimate(input_bytes(stage, data_dir, region, state))
+                    queue.append(Task(region, stage, partition, fingerprint, request))
+                open_tasks[node] = len(stale)
+                print(f"🔹 [{region}] {name}: {len(stale)} task(s) queued")
+
+            if dry_run:
+                # Report instead of running; downstream stages are judged on the files as they are now
+                for task in sorted(queue, key=lambda t: -t.request.memory):
+                    print(f"   would run {task} ({task.request})")
+                    node = (task.region, task.stage.name)
+                    open_tasks[node] -= 1
+                    if not open_tasks[node]:
+                        done.add(node)
+                if not queue:
+                    break
+                queue.clear()
+                continue
+
+            # Largest first, packing whatever still fits next to the running tasks
+            queue.sort(key=lambda t: -t.request.memory)
+            if distributed:
+                for task in queue:
+                    print(f"🔹 {task}: queued for workers")
+                    running[executor.submit(task, input_bytes(task.stage, data_dir, task.region, task.state),
+                                            run_dir)] = task
+                queue.clear()
+            for task in list(queue):
+                if pool.fits(task.request) or not pool.running:
+                    queue.remove(task)
+                    pool.acquire(task.request)
+                    print(f"🔹 {task}: starting ({task.request})")
+                    running[executor.submit(run_task, task, data_dir, ledgers[task.region], run_dir)] = task
+
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                task = running.pop(future)
+                if not distributed:
+                    pool.release(task.request)
+                node = (task.region, task.stage.name)
+                try:
+                    record = future.result()
+                    records.append(record)
+                    if record["status"] != "ok":
+                        stage_failed.add(node)
+                        print(f"❌ {task} {record['status']}")
+                    else:
+                        if distributed:
+                            # workers leave the ledger to the coordinator
+                            ledgers[task.region].record(task.stage.name, {task.partition: task.fingerprint})
+                        print(f"✔ {task}: {record['wall_s']:.1f}s, {record['peak_rss_bytes'] >> 20} MiB peak RSS")
+                except Exception as e:
+                    stage_failed.add(node)
+                    print(f"❌ {task} failed: {e}")
+                open_tasks[node] -= 1
+                if not open_tasks[node]:
+                    finish(node, node not in stage_failed)
+
+    if records:
+        report = telemetry.write_report(run_dir, run_id, records, started)
+        telemetry.print_summary(report)
+        print(f"🔹 Run report: {run_dir}/report.json")
+
+    return done, failed | (pending - done)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the parcel pipeline, rerunning only stale partitions.")
+    parser.add_argument("--data-dir", default=os.getenv("DATA_DIR"))
+    parser.add_argument("--regions", nargs="+", default=REGIONS)
+    parser.add_argument("--stages", nargs="+", help="only these stages (default: all)")
+    parser.add_argument("--force", action="store_true", help="rerun every partition of the selected stages")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would run")
+    parser.add_argument("--cpus", type=int, help="CPU budget (default: PIPELINE_CPUS or all cores)")
+    parser.add_argument("--memory", help="RAM budget, e.g. 200GB (default: PIPELINE_MEMORY or 75%% of RAM)")
+    parser.add_argument("--spill", help="spill-disk budget, e.g. 1TB (default: PIPELINE_SPILL or 80%% of free space)")
+    parser.add_argument("--distributed", action="store_true",
+                        help="queue tasks for `python -m parcels.workqueue` workers instead of running them here")
+    args = parser.parse_args()
+
+    if not args.data_dir:
+        raise ValueError(" DATA_DIR is not set")
+    unknown = set(args.stages or []) - set(STAGES_BY_NAME)
+    if unknown:
+        raise ValueError(f" Unknown stages: {sorted(unknown)}")
+
+    budget = resources.Budget.detect(f"{args.data_dir}/duckdb_temp")
+    budget.cpus = args.cpus or budget.cpus
+    budget.memory = resources.parse_size(args.memory) if args.memory else budget.memory
+    budget.spill = resources.parse_size(args.spill) if args.spill else budget.spill
+
+    _, failed = run(args.data_dir, args.regions, args.stages, args.force, args.dry_run, budget, args.distributed)
+    if failed:
+        raise SystemExit(f" {len(failed)} stage(s) failed or were skipped: {sorted(failed)}")
+    print("🎉 Pipeline complete!")
+
+
+if __name__ == "__main__":
+    main()
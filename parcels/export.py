@@ -0,0 +1,121 @@
+"""
+GeoParquet and FlatGeobuf exports of the property and parcel layers for GIS users.
+
+The pipeline's own `prop_shapes_{region}.parquet` and `propsholds_final_{state}.parquet`
+are already Hilbert-sorted with a `bbox` column (parcels/geoparquet.py). Their
+`geom` column, however, carries no CRS and no GeoParquet metadata. For each
+file this command writes:
+  - geoparquet: the same rows and order, `geom` as WKB, and a GeoParquet 1.1
+    `geo` footer entry (EPSG:5070 PROJJSON, geometry types, extent and the
+    `bbox` covering). GeoPandas, GDAL, DuckDB and others then read row-group
+    statistics for bbox filters;
+  - flatgeobuf: through GDAL's FlatGeobuf driver, with its packed Hilbert
+    R-tree (SPATIAL_INDEX=YES), so a bbox query reads only the matching
+    features, even over HTTP range requests.
+Every (file, format) pair is an independent job. Jobs run in a process pool
+with the DuckDB memory/spill limits split between the workers, so states
+export in parallel. Each output is crash-safe and gets a completion marker.
+
+    python -m parcels.export --data-dir /path/to/regrid_2025 --regions south --out /path/to/export
+    python -m parcels.export ... --formats flatgeobuf --layers prop_shapes
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from parcels import catalog, checkpoint, resources
+from parcels.config import REGIONS
+from parcels.geoparquet import PARQUET_OPTIONS, geo_metadata
+
+FORMATS = {"geoparquet": ".parquet", "flatgeobuf": ".fgb"}
+LAYERS = ("prop_shapes", "propsholds_final")  # catalog views
+
+
+def export_geoparquet(con, src, out):
+    """Copy `src` to `out` with `geom` as WKB and GeoParquet 1.1 metadata."""
+    types, xmin, ymin, xmax, ymax = con.execute(f"""
+        SELECT list(DISTINCT ST_GeometryType(geom)::VARCHAR) FILTER (geom IS NOT NULL),
+               MIN(bbox.xmin), MIN(bbox.ymin), MAX(bbox.xmax), MAX(bbox.ymax)
+        FROM read_parquet('{src}');
+    """).fetchone()
+    geo = json.dumps(geo_metadata(types or [], (xmin, ymin, xmax, ymax))).replace("'", "''")
+    return checkpoint.copy(con, f"""(
+        SELECT * EXCLUDE (geom), ST_AsWKB(geom)::BLOB AS geom FROM read_parquet('{src}')
+    )""", out, f"{PARQUET_OPTIONS}, KV_METADATA {{geo: '{geo}'}}")
+
+
+def export_flatgeobuf(con, src, out):
+    """Write `src` to `out` as FlatGeobuf with a packed Hilbert R-tree (the `bbox` column is dropped)."""
+    with checkpoint.atomic(out) as tmp:
+        con.execute(f"""
+            COPY (SELECT * EXCLUDE (bbox) FROM read_parquet('{src}'))
+            TO '{tmp}' (FORMAT GDAL, DRIVER 'FlatGeobuf', SRS 'EPSG:5070',
+                        LAYER_CREATION_OPTIONS 'SPATIAL_INDEX=YES');
+        """)
+    return checkpoint.mark(con, out)
+
+
+WRITERS = {"geoparquet": export_geoparquet, "flatgeobuf": export_flatgeobuf}
+
+
+def jobs(data_dir, regions, out_dir, layers=LAYERS, formats=tuple(FORMATS)):
+    """(format, source, output) for every file of `layers` in `regions`, largest first."""
+    todo = []
+    for region in regions:
+        for layer in layers:
+            for src in catalog.stage_files(data_dir, region, layer):
+                name = os.path.basename(src).replace(".parquet", "")
+                for fmt in formats:
+                    todo.append((fmt, src, os.path.join(out_dir, region, f"{name}{FORMATS[fmt]}")))
+    return sorted(todo, key=lambda job: os.path.getsize(job[1]), reverse=True)
+
+
+def export(job, data_dir, settings):
+    fmt, src, out = job
+    temp_dir = os.path.join(data_dir, "duckdb_temp", f"export_{os.getpid()}")
+    con = catalog.connect_memory(data_dir, temp_dir=temp_dir, **settings)
+    try:
+        marker = WRITERS[fmt](con, src, out)
+    finally:
+        con.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    print(f" ✔ {out} ({marker['bytes'] / 1e6:.1f} MB)")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GeoParquet/FlatGeobuf exports of prop_shapes and propsholds_final.")
+    parser.add_argument("--data-dir", default=os.getenv("DATA_DIR"))
+    parser.add_argument("--regions", nargs="+", default=REGIONS)
+    parser.add_argument("--out", required=True, help="output directory (one subdirectory per region)")
+    parser.add_argument("--formats", nargs="+", choices=sorted(FORMATS), default=sorted(FORMATS))
+    parser.add_argument("--layers", nargs="+", choices=LAYERS, default=list(LAYERS))
+    parser.add_argument("--workers", type=int, help="parallel exports (default: MAX_WORKERS or all cores)")
+    parser.add_argument("--resume", action="store_true", help="skip outputs that are already complete")
+    args = parser.parse_args()
+
+    if not args.data_dir:
+        raise ValueError(" DATA_DIR is not set")
+    todo = jobs(args.data_dir, args.regions, args.out, args.layers, args.formats)
+    if args.resume:
+        todo = [job for job in todo if not checkpoint.complete(job[2])]
+    if not todo:
+        print("⏭ Nothing to export")
+        return
+    workers = max(1, min(args.workers, len(todo))) if args.workers else resources.max_workers(len(todo))
+    print(f"🔹 Exporting {len(todo)} file(s) on {workers} worker(s) to {args.out}")
+    # Few large files: the workers share the cores instead of running single-threaded
+    settings = dict(catalog.worker_settings(workers), threads=max(1, multiprocessing.cpu_count() // workers))
+    worker = partial(export, data_dir=args.data_dir, settings=settings)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        done = list(executor.map(worker, todo))
+    print(f"✅ Exported {len(done)} file(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Shared Parquet writer for parcel and property outputs.
+
+`write_spatial_parquet` orders rows along a Hilbert curve over the data extent
+and adds a GeoParquet-style `bbox` covering struct (xmin, ymin, xmax, ymax).
+DuckDB writes min/max statistics for each struct field per row group, so a
+reader filtering on `bbox_predicate(...)` skips row groups that cannot
+intersect its window without decoding any WKB. Both writers are crash-safe
+and leave a completion marker (parcels/checkpoint.py).
+"""
+
+from parcels import checkpoint
+
+# Row groups of 64Ki rows keep pruning fine-grained for spatially sorted parcels
+ROW_GROUP_SIZE = 65_536
+
+PARQUET_OPTIONS = f"FORMAT 'parquet', COMPRESSION 'zstd', ROW_GROUP_SIZE {ROW_GROUP_SIZE}"
+
+
+def write_parquet(con, source, out_path):
+    """COPY a table name or parenthesised query to Parquet with the shared options."""
+    return checkpoint.copy(con, source, out_path, PARQUET_OPTIONS)
+
+
+def bbox_struct(geom_expr):
+    return (
+        f"{{'xmin': ST_XMin({geom_expr}), 'ymin': ST_YMin({geom_expr}), "
+        f"'xmax': ST_XMax({geom_expr}), 'ymax': ST_YMax({geom_expr})}}"
+    )
+
+
+def write_spatial_parquet(con, source, out_path, geom_expr="geom"):
+    """
+    Write `source` sorted by the Hilbert index of each geometry's bbox centre,
+    with a `bbox` covering column, ZSTD compression and `ROW_GROUP_SIZE` rows
+    per row group. `geom_expr` must evaluate to GEOMETRY for a row of `source`.
+    Any existing `bbox` column in `source` is replaced.
+    """
+    extent = con.execute(f"""
+        SELECT
+            MIN(ST_XMin({geom_expr})), MIN(ST_YMin({geom_expr})),
+            MAX(ST_XMax({geom_expr})), MAX(ST_YMax({geom_expr}))
+        FROM {source} s;
+    """).fetchone()
+
+    if extent[0] is None:
+        # No geometry to sort on; keep the schema identical to sorted outputs
+        order_by = ""
+    else:
+        xmin, ymin, xmax, ymax = extent
+        order_by = (
+            f"ORDER BY ST_Hilbert({geom_expr}, "
+            f"ST_MakeBox2D(ST_Point({xmin}, {ymin}), ST_Point({xmax}, {ymax})))"
+        )
+
+    return checkpoint.copy(con, f"""(
+            SELECT
+                COLUMNS(c -> c <> 'bbox'),
+                {bbox_struct(geom_expr)} AS bbox
+            FROM {source} s
+            {order_by}
+        )""", out_path, PARQUET_OPTIONS)
+
+
+def bbox_predicate(xmin, ymin, xmax, ymax, column="bbox"):
+    """SQL predicate on the covering column that row-group statistics can prune on."""
+    return (
+        f"{column}.xmax >= {xmin} AND {column}.xmin <= {xmax} "
+        f"AND {column}.ymax >= {ymin} AND {column}.ymin <= {ymax}"
+    )
+
+
+# PROJJSON of EPSG:5070 (NAD83 / Conus Albers), the CRS of every `geom` column in the pipeline
+CRS_5070 = {
+    "$schema": "https://proj.org/schemas/v0.7/projjson.schema.json",
+    "type": "ProjectedCRS",
+    "name": "NAD83 / Conus Albers",
+    "base_crs": {
+        "name": "NAD83",
+        "datum": {
+            "type": "GeodeticReferenceFrame",
+            "name": "North American Datum 1983",
+            "ellipsoid": {"name": "GRS 1980", "semi_major_axis": 6378137, "inverse_flattening": 298.257222101},
+        },
+        "coordinate_system": {
+            "subtype": "ellipsoidal",
+            "axis": [
+                {"name": "Geodetic latitude", "abbreviation": "Lat", "direction": "north", "unit": "degree"},
+                {"name": "Geodetic longitude", "abbreviation": "Lon", "direction": "east", "unit": "degree"},
+            ],
+        },
+        "id": {"authority": "EPSG", "code": 4269},
+    },
+    "conversion": {
+        "name": "Conus Albers",
+        "method": {"name": "Albers Equal Area", "id": {"authority": "EPSG", "code": 9822}},
+        "parameters": [
+            {"name": "Latitude of false origin", "value": 23, "unit": "degree",
+             "id": {"authority": "EPSG", "code": 8821}},
+            {"name": "Longitude of false origin", "value": -96, "unit": "degree",
+             "id": {"authority": "EPSG", "code": 8822}},
+            {"name": "Latitude of 1st standard parallel", "value": 29.5, "unit": "degree",
+             "id": {"authority": "EPSG", "code": 8823}},
+            {"name": "Latitude of 2nd standard parallel", "value": 45.5, "unit": "degree",
+             "id": {"authority": "EPSG", "code": 8824}},
+            {"name": "Easting at false origin", "value": 0, "unit": "metre",
+             "id": {"authority": "EPSG", "code": 8826}},
+            {"name": "Northing at false origin", "value": 0, "unit": "metre",
+             "id": {"authority": "EPSG", "code": 8827}},
+        ],
+    },
+    "coordinate_system": {
+        "subtype": "Cartesian",
+        "axis": [
+            {"name": "Easting", "abbreviation": "X", "direction": "east", "unit": "metre"},
+            {"name": "Northing", "abbreviation": "Y", "direction": "north", "unit": "metre"},
+        ],
+    },
+    "id": {"authority": "EPSG", "code": 5070},
+}
+
+# ST_GeometryType names -> GeoParquet `geometry_types` names
+GEOMETRY_TYPES = {
+    "POINT": "Point", "LINESTRING": "LineString", "POLYGON": "Polygon", "MULTIPOINT": "MultiPoint",
+    "MULTILINESTRING": "MultiLineString", "MULTIPOLYGON": "MultiPolygon",
+    "GEOMETRYCOLLECTION": "GeometryCollection",
+}
+
+
+def geo_metadata(geometry_types, bbox, column="geom", covering="bbox", crs=CRS_5070):
+    """GeoParquet 1.1 `geo` file metadata of a WKB `column` with a `covering` bbox struct column."""
+    return {
+        "version": "1.1.0",
+        "primary_column": column,
+        "columns": {
+            column: {
+                "encoding": "WKB",
+                "geometry_types": sorted(GEOMETRY_TYPES.get(t, t) for t in geometry_types),
+                "crs": crs,
+                "bbox": list(bbox),
+                "covering": {"bbox": {k: [covering, k] for k in ("xmin", "ymin", "xmax", "ymax")}},
+            }
+        },
+    }
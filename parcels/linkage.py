@@ -0,0 +1,108 @@
+"""
+Single-linkage property hierarchy over distance-weighted match pairs.
+
+`prop_match2` emits every owner/address pair within MATCH_RADIUS together with
+its distance. `spanning_forest` runs Kruskal over those pairs sorted by
+distance and keeps only the pairs that merge two groups. The result is at
+most one edge per parcel: a minimum spanning forest, which is the
+single-linkage dendrogram of the parcels. Properties at any threshold up to
+the radius are then the components of the forest edges no longer than the
+threshold, found in one sweep (`components`). `prop_groupmatch` uses this with
+MATCH_THRESHOLD and stores the forest in `{region}_linkage/`, so other
+thresholds can be compared without matching again. MATCH_RADIUS defaults to
+MATCH_THRESHOLD; comparing larger thresholds needs pairs matched with a wider
+radius (e.g. MATCH_RADIUS=250), at a larger self-join cost:
+    REGION=south DATA_DIR=/path/to/regrid_2025 python -m parcels.linkage --thresholds 50 100 250
+"""
+
+import argparse
+import os
+
+from parcels import catalog
+
+
+class DisjointSet:
+    """Union-find over integer codes; the root of a set is its smallest member."""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, x):
+        parent = self.parent
+        if x not in parent:
+            parent[x] = x
+            self.size[x] = 1
+            return x
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # path halving
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        """Merge the sets of `a` and `b`; False when they already were one."""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if rb < ra:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size.pop(rb)
+        return True
+
+
+def spanning_forest(edges):
+    """The (id1, id2, distance) edges, sorted by distance, that merge two groups (Kruskal)."""
+    sets = DisjointSet()
+    return [(a, b, d) for a, b, d in edges if sets.union(a, b)]
+
+
+def components(forest, threshold):
+    """Map every parcel joined by a forest edge no longer than `threshold` to the smallest
+    code of its group. `forest` is sorted by distance, so the sweep stops at the first longer edge."""
+    sets = DisjointSet()
+    for a, b, d in forest:
+        if d > threshold:
+            break
+        sets.union(a, b)
+    return {node: sets.find(node) for node in sets.parent}
+
+
+def profile(forest, thresholds):
+    """Merges and largest group size at each threshold, in one sweep over the sorted forest."""
+    sets = DisjointSet()
+    rows, i, merges, largest = [], 0, 0, 1
+    for threshold in sorted(thresholds):
+        while i < len(forest) and forest[i][2] <= threshold:
+            a, b, _ = forest[i]
+            sets.union(a, b)
+            merges += 1
+            largest = max(largest, sets.size[sets.find(a)])
+            i += 1
+        rows.append((threshold, merges, largest))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Property counts of a region at several match thresholds.")
+    parser.add_argument("--data-dir", default=os.getenv("DATA_DIR"))
+    parser.add_argument("--region", default=os.getenv("REGION"))
+    parser.add_argument("--thresholds", nargs="+", type=float, required=True, help="distances in metres")
+    args = parser.parse_args()
+
+    if not args.data_dir or not args.region:
+        raise ValueError(" DATA_DIR and REGION must be set")
+    con = catalog.connect(args.data_dir, args.region)
+    parcels = catalog.view_rows(con, "parquets_encoded")
+    # the per-state forests are disjoint, so together they form the region's forest
+    forest = con.execute("SELECT id1, id2, distance FROM catalog.linkage ORDER BY distance, id1, id2;").fetchall()
+    con.close()
+
+    print(f" {args.region}: {parcels} parcels, {len(forest)} linkage edges")
+    print(f" {'threshold_m':>11} {'properties':>12} {'largest':>8}")
+    for threshold, merges, largest in profile(forest, args.thresholds):
+        print(f" {threshold:>11g} {parcels - merges:>12} {largest:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Point lookups of holdings and properties in `propsholds_final`.
+
+`propsholds_final_{state}.parquet` is sorted along a Hilbert curve, so the
+parcels of one `holdid` or `propid` are spread over a few row groups that the
+min/max statistics cannot single out. When localzip writes a state file,
+`build` writes `{region}_propsholds_index/propsholds_index_{state}.parquet`
+next to it. The index has one row per key and row group: (key_column, key, file,
+row_group, first_row, last_row, rows), sorted by key and with bloom filters,
+so a probe reads one or two of its row groups. `query` turns a set of keys into
+a scan of only the files and row ranges the index lists; DuckDB prunes row
+groups on `file_row_number`, so looking up a holding reads its row groups
+instead of the region.
+
+    con.execute(f"COPY ({lookup.query(con, final_dir, 'holdid', holdids)}) TO 'out.csv';")
+"""
+
+import glob
+import os
+
+from parcels import catalog, checkpoint
+from parcels.geoparquet import PARQUET_OPTIONS, ROW_GROUP_SIZE
+
+KEY_COLUMNS = ("holdid", "propid")
+# Bloom filters are written for dictionary-encoded columns only; the index is small enough
+# to dictionary-encode every column of a row group
+INDEX_OPTIONS = f"{PARQUET_OPTIONS}, DICTIONARY_SIZE_LIMIT {ROW_GROUP_SIZE}, BLOOM_FILTER_FALSE_POSITIVE_RATIO 0.01"
+
+
+def index_dir(final_dir):
+    """`{region}_propsholds_index` next to `{region}_propsholds_final`."""
+    return final_dir.rstrip("/").replace("_propsholds_final", "_propsholds_index")
+
+
+def index_path(data_file):
+    state = os.path.basename(data_file).replace("propsholds_final_", "").replace(".parquet", "")
+    return os.path.join(index_dir(os.path.dirname(data_file)), f"propsholds_index_{state}.parquet")
+
+
+def row_groups_sql(data_file):
+    """(row_group, row_start, num_rows) of every row group of a Parquet file, from its footer."""
+    return f"""
+        SELECT row_group_id AS row_group, SUM(num_rows) OVER (ORDER BY row_group_id) - num_rows AS row_start,
+               num_rows
+        FROM (SELECT row_group_id, ANY_VALUE(row_group_num_rows) AS num_rows
+              FROM parquet_metadata('{data_file}') GROUP BY row_group_id)
+    """
+
+
+def build(con, data_file):
+    """Write the key -> (row group, row range) index of one `propsholds_final` file."""
+    keyed = " UNION ALL ".join(
+        f"SELECT '{c}' AS key_column, {c} AS key, file_row_number FROM read_parquet('{data_file}', "
+        f"file_row_number = true) WHERE {c} IS NOT NULL"
+        for c in KEY_COLUMNS
+    )
+    out_path = index_path(data_file)
+    return checkpoint.copy(con, f"""(
+        WITH row_groups AS ({row_groups_sql(data_file)}),
+        keyed AS ({keyed})
+        SELECT k.key_column, k.key, '{os.path.basename(data_file)}' AS file, g.row_group,
+               MIN(k.file_row_number) AS first_row, MAX(k.file_row_number) AS last_row, COUNT(*) AS rows
+        FROM keyed k
+        JOIN row_groups g
+          ON k.file_row_number >= g.row_start AND k.file_row_number < g.row_start + g.num_rows
+        GROUP BY ALL
+        ORDER BY k.key_column, k.key, g.row_group
+    )""", out_path, INDEX_OPTIONS)
+
+
+def query(con, final_dir, column, keys, columns="*"):
+    """
+    SQL selecting `columns` of the `propsholds_final` rows whose `column` (holdid or propid) is
+    in `keys`, restricted to the files and row ranges listed in the index. The keys are kept in
+    the temp table `lookup_keys`, so the query stays valid until the next call.
+    """
+    if column not in KEY_COLUMNS:
+        raise ValueError(f" No index on {column}; indexed columns are {KEY_COLUMNS}")
+    index_files = sorted(glob.glob(os.path.join(index_dir(final_dir), "propsholds_index_*.parquet")))
+    if not index_files:
+        raise ValueError(f" No propsholds index found for {final_dir}; rerun localzip")
+    con.execute("CREATE OR REPLACE TEMP TABLE lookup_keys AS SELECT UNNEST(?::VARCHAR[]) AS key;", [list(keys)])
+    ranges = con.execute(f"""
+        SELECT i.file, i.first_row, i.last_row
+        FROM read_parquet({catalog.file_list(index_files)}) i
+        SEMI JOIN lookup_keys k ON i.key = k.key
+        WHERE i.key_column = ?
+        ORDER BY i.file, i.first_row;
+    """, [column]).fetchall()
+
+    select = "* EXCLUDE (file_row_number)" if columns == "*" else columns
+    by_file = {}
+    for file, first_row, last_row in ranges:
+        by_file.setdefault(file, []).append(f"file_row_number BETWEEN {first_row} AND {last_row}")
+    scans = [
+        f"SELECT {select} FROM read_parquet('{os.path.join(final_dir, file)}', file_row_number = true) "
+        f"WHERE ({' OR '.join(predicates)}) AND {column} IN (SELECT key FROM lookup_keys)"
+        for file, predicates in by_file.items()
+    ]
+    if not scans:
+        # No key is indexed: an empty result with the file's columns
+        any_file = os.path.join(final_dir, os.path.basename(index_files[0]).replace("propsholds_index_",
+                                                                                   "propsholds_final_"))
+        return f"SELECT {columns} FROM read_parquet('{any_file}') LIMIT 0"
+    return " UNION ALL BY NAME ".join(scans)
+
@@ -0,0 +1,122 @@
+"""
+Fuzzy owner pairs for prop_match2: MinHash LSH blocking within spatial neighbourhoods.
+
+Exact matching joins parcels on `owner_code`, so "SMITH JOHN A" / "JOHN A SMITH"
+or "ACME TIMBER LLC" / "ACME TIMBER L L C" never link. Comparing every pair of
+owner names inside the radius self-join would be far too slow. Instead, in
+`fuzzy_owner_pairs`:
+  1. each distinct owner of the state (dictionary level, not per parcel) is
+     normalized into a sorted token set. Punctuation is dropped, and runs of
+     single letters are joined, so "L L C" and "L.L.C." both become "LLC";
+  2. its MinHash signature of BANDS x ROWS token hashes is cut into BANDS band
+     keys;
+  3. a block is one (band, key, grid cell). Cells are CELL_RADII x radius wide
+     and hold parcel centroids. Owners sharing a block with a neighbouring cell
+     (3 x 3) become candidates. Blocks of more than MAX_BUCKET owners, which
+     come from common tokens, are skipped, so the candidate count per block is
+     bounded;
+  4. only candidate owners are scored by the Jaccard similarity of their token
+     sets. Owner pairs at or above the threshold join their parcels within the
+     radius, the same way exact owner pairs do.
+The chance that a pair with similarity s becomes a candidate is 1 - (1 - s^ROWS)^BANDS:
+about 0.997 at s = 0.8, 0.66 at 0.5 and 0.24 at 0.33. Parcels whose centroids lie
+more than one cell apart are not compared, so very large parcels can miss fuzzy
+(never exact) pairs.
+"""
+
+from parcels import telemetry
+
+BANDS = 8
+ROWS = 3
+CELL_RADII = 4
+MAX_BUCKET = 200
+
+
+def tokens_sql(expr):
+    """SQL for the sorted, distinct token set of an owner name."""
+    words = (f"list_filter(string_split(TRIM(regexp_replace(regexp_replace(UPPER({expr}), "
+             f"'[.,'']', '', 'g'), '[^A-Z0-9]+', ' ', 'g')), ' '), w -> w <> '')")
+    joined = ("array_to_string(list_transform(words, (w, i) -> "
+              "CASE WHEN i > 1 AND length(w) = 1 AND length(words[i - 1]) = 1 THEN w ELSE ' ' || w END), '')")
+    return (f"(SELECT list_sort(list_distinct(list_filter(string_split({joined}, ' '), w -> w <> ''))) "
+            f"FROM (SELECT {words} AS words))")
+
+
+def fuzzy_owner_pairs(con, table, state, owner_dict_path, radius, threshold, exclude_code=None):
+    """
+    Create `match_pairs_owner_fuzzy` (id1, id2, distance, similarity) from the parcels of `state` in
+    `table` (fips_code, owner_code, state2, geom). Parcel pairs are within `radius` and have different
+    owners whose token similarity is at least `threshold`. Returns the row counts of each step.
+    """
+    cell = CELL_RADII * radius
+    telemetry.execute(con, f"""
+        CREATE OR REPLACE TABLE fuzzy_parcels AS
+        SELECT fips_code, owner_code, geom,
+               FLOOR(ST_X(ST_Centroid(geom)) / {cell})::BIGINT AS cx,
+               FLOOR(ST_Y(ST_Centroid(geom)) / {cell})::BIGINT AS cy
+          FROM {table}
+         WHERE state2 = ? AND owner_code IS NOT NULL AND owner_code IS DISTINCT FROM ?;
+    """, [state, exclude_code])
+    telemetry.execute(con, f"""
+        CREATE OR REPLACE TABLE fuzzy_tokens AS
+        SELECT owner_code AS code, {tokens_sql("owner")} AS tokens
+          FROM read_parquet('{owner_dict_path}') d
+          SEMI JOIN (SELECT DISTINCT owner_code FROM fuzzy_parcels) p USING (owner_code);
+    """)
+    # One row per (band, band key, owner, cell); `bucket` is the number of owners in the block
+    telemetry.execute(con, f"""
+        CREATE OR REPLACE TABLE fuzzy_blocks AS
+        WITH signatures AS (
+            SELECT code, band,
+                   hash(band, list_transform(range({ROWS}),
+                                             r -> list_min(list_transform(tokens, t -> hash(band * {ROWS} + r, t)))))
+                       AS key
+              FROM fuzzy_tokens, range({BANDS}) b(band)
+             WHERE len(tokens) > 0
+        )
+        SELECT band, key, code, cx, cy, COUNT(*) OVER (PARTITION BY band, key, cx, cy) AS bucket
+          FROM signatures s
+          JOIN (SELECT DISTINCT owner_code, cx, cy FROM fuzzy_parcels) p ON p.owner_code = s.code;
+    """)
+    telemetry.execute(con, f"""
+        CREATE OR REPLACE TABLE fuzzy_candidates AS
+        SELECT DISTINCT a.code AS code1, b.code AS code2
+          FROM (SELECT * FROM fuzzy_blocks WHERE bucket <= {MAX_BUCKET}) a
+          JOIN (
+              SELECT band, key, code, cx + dx AS cx, cy + dy AS cy
+                FROM fuzzy_blocks, range(-1, 2) x(dx), range(-1, 2) y(dy)
+               WHERE bucket <= {MAX_BUCKET}
+          ) b
+            ON a.band = b.band AND a.key = b.key AND a.cx = b.cx AND a.cy = b.cy AND a.code < b.code;
+    """)
+    telemetry.execute(con, f"""
+        CREATE OR REPLACE TABLE fuzzy_codes AS
+        SELECT c.code1, c.code2,
+               len(list_intersect(t1.tokens, t2.tokens)) / len(list_distinct(list_concat(t1.tokens, t2.tokens)))
+                   AS similarity
+          FROM fuzzy_candidates c
+          JOIN fuzzy_tokens t1 ON t1.code = c.code1
+          JOIN fuzzy_tokens t2 ON t2.code = c.code2
+         WHERE similarity >= {threshold};
+    """)
+    telemetry.execute(con, """
+        CREATE OR REPLACE TABLE match_pairs_owner_fuzzy AS
+        SELECT LEAST(a.fips_code, b.fips_code) AS id1, GREATEST(a.fips_code, b.fips_code) AS id2,
+               ST_Distance(a.geom, b.geom) AS distance, f.similarity
+          FROM fuzzy_codes f
+          JOIN fuzzy_parcels a ON a.owner_code = f.code1
+          JOIN fuzzy_parcels b ON b.owner_code = f.code2
+           AND ABS(a.cx - b.cx) <= 1 AND ABS(a.cy - b.cy) <= 1
+         WHERE ST_DWithin(a.geom, b.geom, ?);
+    """, [radius])
+
+    stats = dict(zip(("owners", "oversized_blocks", "candidates", "owner_pairs", "pairs"), con.execute(f"""
+        SELECT (SELECT COUNT(*) FROM fuzzy_tokens),
+               (SELECT COUNT(DISTINCT (band, key, cx, cy)) FROM fuzzy_blocks WHERE bucket > {MAX_BUCKET}),
+               (SELECT COUNT(*) FROM fuzzy_candidates),
+               (SELECT COUNT(*) FROM fuzzy_codes),
+               (SELECT COUNT(*) FROM match_pairs_owner_fuzzy);
+    """).fetchone()))
+    for name in ("fuzzy_parcels", "fuzzy_tokens", "fuzzy_blocks", "fuzzy_candidates", "fuzzy_codes"):
+        con.execute(f"DROP TABLE {name};")
+    return stats
@@ -0,0 +1,204 @@
+"""
+Radius-neighbour queries over `propsholds_final` through a persisted grid index.
+
+When localzip writes a state file, `build` also writes
+`{region}_propsholds_grid/propsholds_grid_{state}.parquet`. It has one row per
+parcel and GRID_CELL x GRID_CELL metre cell (EPSG:5070) that the parcel's
+`bbox` touches: (cell_x, cell_y, fips_id, file, row_group, file_row_number,
+xmin, ymin, xmax, ymax). The index is built from the covering `bbox` column,
+so no WKB is parsed. It is sorted by cell, so row-group statistics prune it
+by cell.
+
+A query works on the table `focal_parcels`, which `sample_focal` (a
+deterministic block sample) or `set_focal` (given fips_ids) creates. `within`
+finds all parcels within `radius` metres of every focal parcel:
+  1. each focal bbox, grown by the radius, is expanded to its cells;
+  2. an equi-join on (cell_x, cell_y) with the grid index keeps the candidates
+     whose bbox lies within the radius;
+  3. only the row groups that hold focal or candidate rows are read for their
+     geometries;
+  4. ST_DWithin on those geometries gives the exact answer.
+Thousands of focal parcels cost one pass over their cells of the index, not a
+scan and spatial join of the region.
+"""
+
+import glob
+import math
+import os
+
+from parcels import catalog, checkpoint
+from parcels.geoparquet import PARQUET_OPTIONS
+from parcels.lookup import row_groups_sql
+
+GRID_CELL = 1000.0  # metres
+
+
+def grid_dir(final_dir):
+    """`{region}_propsholds_grid` next to `{region}_propsholds_final`."""
+    return final_dir.rstrip("/").replace("_propsholds_final", "_propsholds_grid")
+
+
+def grid_path(data_file):
+    state = os.path.basename(data_file).replace("propsholds_final_", "").replace(".parquet", "")
+    return os.path.join(grid_dir(os.path.dirname(data_file)), f"propsholds_grid_{state}.parquet")
+
+
+def _cells(alias, grow="0"):
+    """FROM-clause ranges of the cells covering `alias`'s bbox grown by `grow` metres."""
+    return (
+        f"range(floor(({alias}.xmin - {grow}) / {GRID_CELL})::BIGINT, "
+        f"floor(({alias}.xmax + {grow}) / {GRID_CELL})::BIGINT + 1) x(cell_x), "
+        f"range(floor(({alias}.ymin - {grow}) / {GRID_CELL})::BIGINT, "
+        f"floor(({alias}.ymax + {grow}) / {GRID_CELL})::BIGINT + 1) y(cell_y)"
+    )
+
+
+def build(con, data_file):
+    """Write the cell -> parcel grid index of one `propsholds_final` file (read from its `bbox` column)."""
+    return checkpoint.copy(con, f"""(
+        WITH row_groups AS ({row_groups_sql(data_file)}),
+        parcels AS (
+            SELECT fips_id, file_row_number,
+                   bbox.xmin AS xmin, bbox.ymin AS ymin, bbox.xmax AS xmax, bbox.ymax AS ymax
+            FROM read_parquet('{data_file}', file_row_number = true)
+            WHERE bbox.xmin IS NOT NULL
+        )
+        SELECT x.cell_x, y.cell_y, p.fips_id, '{os.path.basename(data_file)}' AS file, g.row_group,
+               p.file_row_number, p.xmin, p.ymin, p.xmax, p.ymax
+        FROM parcels p
+        JOIN row_groups g
+          ON p.file_row_number >= g.row_start AND p.file_row_number < g.row_start + g.num_rows,
+             {_cells("p")}
+        ORDER BY x.cell_x, y.cell_y, p.file_row_number
+    )""", grid_path(data_file), PARQUET_OPTIONS)
+
+
+def _grid_files(final_dir):
+    files = sorted(glob.glob(os.path.join(grid_dir(final_dir), "propsholds_grid_*.parquet")))
+    if not files:
+        raise ValueError(f" No parcel grid index found for {final_dir}; rerun localzip")
+    return files
+
+
+def sample_focal(con, final_dir, n, seed=42, per_block=10):
+    """
+    Create `focal_parcels` from a deterministic block sample: the ceil(n / per_block) row groups
+    ranked lowest by md5(seed:file:row_group), and in each the `per_block` parcels ranked lowest
+    by md5(seed:fips_id). The row groups are listed from the Parquet footers of the indexed files,
+    so only the chosen row groups are read.
+    """
+    data_files = [os.path.join(final_dir, os.path.basename(f).replace("propsholds_grid_", "propsholds_final_"))
+                  for f in _grid_files(final_dir)]
+    blocks = con.execute(f"""
+        SELECT file, row_group
+        FROM (
+            SELECT parse_filename(file_name) AS file, UNNEST(range(num_row_groups)) AS row_group
+            FROM parquet_file_metadata({catalog.file_list(data_files)})
+        )
+        ORDER BY md5_number(concat({seed}, ':', file, ':', row_group))
+        LIMIT {math.ceil(n / per_block)};
+    """).fetchall()
+    con.execute("""
+        CREATE OR REPLACE TABLE focal_parcels (
+            focal_id VARCHAR, file VARCHAR, row_group BIGINT, file_row_number BIGINT,
+            xmin DOUBLE, ymin DOUBLE, xmax DOUBLE, ymax DOUBLE
+        );
+    """)
+    for file, row_group in blocks:
+        path = os.path.join(final_dir, file)
+        con.execute(f"""
+            INSERT INTO focal_parcels
+            WITH block AS (SELECT * FROM ({row_groups_sql(path)}) WHERE row_group = {row_group})
+            SELECT CAST(fips_id AS VARCHAR), '{file}', {row_group}, file_row_number,
+                   bbox.xmin, bbox.ymin, bbox.xmax, bbox.ymax
+            FROM read_parquet('{path}', file_row_number = true)
+            WHERE file_row_number >= (SELECT row_start FROM block)
+              AND file_row_number < (SELECT row_start + num_rows FROM block)
+              AND bbox.xmin IS NOT NULL
+            ORDER BY md5_number(concat({seed}, ':', fips_id))
+            LIMIT {per_block};
+        """)
+    # Trim to n, still by priority, so the sample does not depend on the block order
+    con.execute(f"""
+        DELETE FROM focal_parcels WHERE focal_id NOT IN (
+            SELECT focal_id FROM focal_parcels ORDER BY md5_number(concat({seed}, ':', focal_id)) LIMIT {n}
+        );
+    """)
+    return con.execute("SELECT COUNT(*) FROM focal_parcels;").fetchone()[0]
+
+
+def set_focal(con, final_dir, fips_ids):
+    """Create `focal_parcels` for the given `fips_id`s (looked up in the grid index)."""
+    con.execute("CREATE OR REPLACE TEMP TABLE focal_ids AS SELECT UNNEST(?::VARCHAR[]) AS focal_id;", [list(fips_ids)])
+    con.execute(f"""
+        CREATE OR REPLACE TABLE focal_parcels AS
+        SELECT DISTINCT CAST(g.fips_id AS VARCHAR) AS focal_id, g.file, g.row_group, g.file_row_number,
+               g.xmin, g.ymin, g.xmax, g.ymax
+        FROM read_parquet({catalog.file_list(_grid_files(final_dir))}) g
+        SEMI JOIN focal_ids f ON CAST(g.fips_id AS VARCHAR) = f.focal_id;
+    """)
+    return con.execute("SELECT COUNT(*) FROM focal_parcels;").fetchone()[0]
+
+
+def _read_rows(con, final_dir, rows, columns):
+    """Create `neighbor_rows` with `columns` and `geom` of the (file, row_group, file_row_number)
+    rows of the table `rows`, reading only the row groups that hold them."""
+    con.execute("DROP TABLE IF EXISTS neighbor_rows;")
+    created = False
+    for (file,) in con.execute(f"SELECT DISTINCT file FROM {rows} ORDER BY file;").fetchall():
+        path = os.path.join(final_dir, file)
+        ranges = con.execute(f"""
+            SELECT g.row_start, g.row_start + g.num_rows - 1
+            FROM ({row_groups_sql(path)}) g
+            SEMI JOIN (SELECT row_group FROM {rows} WHERE file = ?) r ON g.row_group = r.row_group
+            ORDER BY g.row_start;
+        """, [file]).fetchall()
+        predicate = " OR ".join(f"file_row_number BETWEEN {lo} AND {hi}" for lo, hi in ranges)
+        verb = "INSERT INTO neighbor_rows" if created else "CREATE TABLE neighbor_rows AS"
+        con.execute(f"""
+            {verb}
+            SELECT '{file}' AS file, file_row_number, {columns}, geom
+            FROM read_parquet('{path}', file_row_number = true)
+            WHERE ({predicate})
+              AND file_row_number IN (SELECT file_row_number FROM {rows} WHERE file = '{file}');
+        """)
+        created = True
+
+
+def within(con, final_dir, radius, columns="fips_id, propid, owner, pstlclean"):
+    """
+    Create `neighbors`: for every row of `focal_parcels`, the parcels (with `columns`) whose
+    geometry lies within `radius` metres of the focal parcel's, and their distance.
+    Needs the spatial extension. Returns the number of (focal, neighbour) pairs.
+    """
+    con.execute(f"""
+        CREATE OR REPLACE TABLE neighbor_candidates AS
+        WITH focal_cells AS (
+            SELECT f.*, x.cell_x, y.cell_y
+            FROM focal_parcels f, {_cells("f", radius)}
+        )
+        SELECT DISTINCT f.focal_id, f.file AS focal_file, f.file_row_number AS focal_row,
+               g.file, g.row_group, g.file_row_number
+        FROM focal_cells f
+        JOIN read_parquet({catalog.file_list(_grid_files(final_dir))}) g
+          ON g.cell_x = f.cell_x AND g.cell_y = f.cell_y
+        WHERE g.xmin <= f.xmax + {radius} AND g.xmax >= f.xmin - {radius}
+          AND g.ymin <= f.ymax + {radius} AND g.ymax >= f.ymin - {radius};
+    """)
+    con.execute("""
+        CREATE OR REPLACE TEMP TABLE neighbor_needed AS
+        SELECT file, row_group, file_row_number FROM neighbor_candidates
+        UNION
+        SELECT file, row_group, file_row_number FROM focal_parcels;
+    """)
+    _read_rows(con, final_dir, "neighbor_needed", columns)
+    con.execute(f"""
+        CREATE OR REPLACE TABLE neighbors AS
+        SELECT c.focal_id, n.* EXCLUDE (file, file_row_number, geom), ST_Distance(f.geom, n.geom) AS distance
+        FROM neighbor_candidates c
+        JOIN neighbor_rows f ON f.file = c.focal_file AND f.file_row_number = c.focal_row
+        JOIN neighbor_rows n ON n.file = c.file AND n.file_row_number = c.file_row_number
+        WHERE ST_DWithin(f.geom, n.geom, {radius})
+        ORDER BY c.focal_id, distance;
+    """)
+    return con.execute("SELECT COUNT(*) FROM neighbors;").fetchone()[0]
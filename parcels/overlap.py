@@ -0,0 +1,57 @@
+"""
+Overlapped I/O for per-state stage loops.
+
+`run_states` runs a state loop as a three-step pipeline on one in-memory
+database: while the main thread computes state i, a reader thread decodes the
+Parquet input of state i+1 into a table and a writer thread COPYs the output
+of state i-1. Each thread works on its own cursor of the caller's connection,
+so all three share the database, its tables and its memory limit. At most one
+state is read ahead and one write is in flight, which bounds memory to about
+three states. Wall time then approaches max(I/O, compute) instead of their
+sum. With `overlap=False` (OVERLAP_IO=0) the same steps run one after another.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+def table(name, state):
+    """Quoted per-state table name, so a prefetched state never clobbers the current one."""
+    return f'"{name}_{state}"'
+
+
+def _on_cursor(con, step, state):
+    cur = con.cursor()
+    try:
+        return step(cur, state)
+    finally:
+        cur.close()
+
+
+def run_states(con, states, read, compute, write, overlap=True):
+    """
+    For each state: `read(con, state)` loads its input into per-state tables,
+    `compute(con, state)` builds the output table from them and `write(con, state)`
+    writes the output and drops the state's tables. `read` and `write` run on
+    background cursors, `compute` on `con`.
+    """
+    states = list(states)
+    if not overlap:
+        for state in states:
+            read(con, state)
+            compute(con, state)
+            write(con, state)
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as reader, ThreadPoolExecutor(max_workers=1) as writer:
+        loading = reader.submit(_on_cursor, con, read, states[0]) if states else None
+        writing = None
+        for i, state in enumerate(states):
+            loading.result()
+            if i + 1 < len(states):
+                loading = reader.submit(_on_cursor, con, read, states[i + 1])
+            compute(con, state)
+            if writing is not None:
+                writing.result()
+            writing = writer.submit(_on_cursor, con, write, state)
+        if writing is not None:
+            writing.result()
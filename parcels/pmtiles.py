@@ -0,0 +1,139 @@
+"""
+Minimal PMTiles v3 archive writer (https://github.com/protomaps/PMTiles/blob/main/spec/v3/spec.md).
+
+Tiles are addressed by their Hilbert tile id (`tile_id`). `write` takes the
+entries of all tiles and writes the header, the gzip-compressed root directory
+(and leaf directories when the root would not fit in the first 16 KiB), the
+JSON metadata and the tile data in tile-id order. Identical tiles are stored
+once, and runs of them become one directory entry, so the archive is
+"clustered" and any PMTiles reader can serve it.
+"""
+
+import gzip
+import json
+import os
+import struct
+
+HEADER_SIZE = 127
+ROOT_MAX_BYTES = 16_384 - HEADER_SIZE
+LEAF_SIZE = 4_096
+
+# Header enums
+COMPRESSION_NONE, COMPRESSION_GZIP = 1, 2
+TILE_TYPE_MVT = 1
+
+
+def tile_id(z, x, y):
+    """Hilbert tile id of (z, x, y): the tiles of lower zooms first, then the Hilbert index within z."""
+    acc = ((1 << (2 * z)) - 1) // 3
+    s = 1 << (z - 1) if z else 0
+    while s:
+        rx, ry = (x & s) > 0, (y & s) > 0
+        acc += s * s * ((3 * rx) ^ ry)
+        x, y = x & (s - 1), y & (s - 1)
+        if not ry:
+            if rx:
+                x, y = s - 1 - x, s - 1 - y
+            x, y = y, x
+        s >>= 1
+    return acc
+
+
+def _varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _directory(entries):
+    """Serialized, gzip-compressed directory of (tile_id, offset, length, run_length) entries."""
+    out = bytearray()
+    _varint(len(entries), out)
+    last = 0
+    for tid, _, _, _ in entries:
+        _varint(tid - last, out)
+        last = tid
+    for _, _, _, run in entries:
+        _varint(run, out)
+    for _, _, length, _ in entries:
+        _varint(length, out)
+    for i, (_, offset, _, _) in enumerate(entries):
+        previous = entries[i - 1] if i else None
+        _varint(0 if previous and offset == previous[1] + previous[2] else offset + 1, out)
+    return gzip.compress(bytes(out), mtime=0)
+
+
+def _directories(entries):
+    """(root, leaves) bytes; the root holds every entry if it fits, else one entry per leaf."""
+    root = _directory(entries)
+    if len(root) <= ROOT_MAX_BYTES:
+        return root, b""
+    leaf_size = LEAF_SIZE
+    while True:
+        leaves, pointers = bytearray(), []
+        for i in range(0, len(entries), leaf_size):
+            leaf = _directory(entries[i:i + leaf_size])
+            pointers.append((entries[i][0], len(leaves), len(leaf), 0))
+            leaves += leaf
+        root = _directory(pointers)
+        if len(root) <= ROOT_MAX_BYTES:
+            return root, bytes(leaves)
+        leaf_size *= 2
+
+
+def _e7(degrees):
+    return int(round(degrees * 10_000_000))
+
+
+def write(path, tiles, read_tile, metadata, min_zoom, max_zoom, bounds, tile_compression=COMPRESSION_GZIP):
+    """
+    Write a PMTiles archive to `path`. `tiles` is an iterable of (tile_id, key, digest) in tile-id
+    order (it is consumed once, so it may be streamed) and `read_tile(key)` returns the stored bytes
+    of a tile. Tiles with the same digest are stored once.
+    `bounds` is (min_lon, min_lat, max_lon, max_lat). Returns (addressed tiles, tile contents).
+    """
+    entries, offsets = [], {}
+    data_length = 0
+    data_path = f"{path}.data"  # tile data in tile-id order, appended after the directories
+    with open(data_path, "wb") as data:
+        for tid, key, digest in tiles:
+            if entries and tid < entries[-1][0] + entries[-1][3]:
+                raise ValueError(f" Tile {tid} is out of tile-id order")
+            if digest in offsets:
+                offset, length = offsets[digest]
+            else:
+                blob = read_tile(key)
+                offset, length = data_length, len(blob)
+                data.write(blob)
+                data_length += length
+                offsets[digest] = (offset, length)
+            last = entries[-1] if entries else None
+            if last and last[1] == offset and last[0] + last[3] == tid:
+                entries[-1] = (last[0], last[1], last[2], last[3] + 1)
+            else:
+                entries.append((tid, offset, length, 1))
+
+    root, leaves = _directories(entries)
+    meta = gzip.compress(json.dumps(metadata).encode(), mtime=0)
+    root_offset = HEADER_SIZE
+    meta_offset = root_offset + len(root)
+    leaves_offset = meta_offset + len(meta)
+    data_offset = leaves_offset + len(leaves)
+    min_lon, min_lat, max_lon, max_lat = bounds
+    header = struct.pack(
+        "<7sB11QBBBBBBiiiiBii",
+        b"PMTiles", 3,
+        root_offset, len(root), meta_offset, len(meta), leaves_offset, len(leaves), data_offset, data_length,
+        sum(e[3] for e in entries), len(entries), len(offsets),
+        1, COMPRESSION_GZIP, tile_compression, TILE_TYPE_MVT, min_zoom, max_zoom,
+        _e7(min_lon), _e7(min_lat), _e7(max_lon), _e7(max_lat),
+        min_zoom, _e7((min_lon + max_lon) / 2), _e7((min_lat + max_lat) / 2),
+    )
+    assert len(header) == HEADER_SIZE
+    with open(path, "wb") as out, open(data_path, "rb") as data:
+        out.write(header + root + meta + leaves)
+        while chunk := data.read(1 << 24):
+            out.write(chunk)
+    os.remove(data_path)
+    return sum(e[3] for e in entries), len(offsets)
@@ -0,0 +1,132 @@
+"""
+Machine-wide resource budget for the pipeline.
+
+The DAG runner (parcels/dag.py) estimates each task's footprint from the size
+of its inputs, packs tasks under a global CPU, RAM and spill-disk budget and
+hands every task its share through the environment:
+
+    DUCKDB_THREADS, DUCKDB_MEMORY_LIMIT, DUCKDB_MAX_TEMP_SIZE, MAX_WORKERS
+
+`catalog.configure` and the process pools in pstlclean2.py / prop_match2.py
+read these back, so a script started by hand still falls back to the old
+defaults. The global budget comes from PIPELINE_CPUS, PIPELINE_MEMORY and
+PIPELINE_SPILL, or from the machine itself.
+"""
+
+import math
+import multiprocessing
+import os
+import re
+import shutil
+from dataclasses import dataclass
+
+# DuckDB's memory_limit caps its buffer manager, not the whole process, so leave headroom
+MEMORY_HEADROOM = 0.75
+SPILL_HEADROOM = 0.8
+
+# Zstd Parquet grows roughly 3-5x once decoded into DuckDB vectors and hash tables; spills
+# (sorts, self-joins in prop_match2.py) can write a few times the decoded size
+MEMORY_PER_INPUT_BYTE = 4
+SPILL_PER_INPUT_BYTE = 8
+MIN_TASK_MEMORY = 1 << 30
+MIN_TASK_SPILL = 4 << 30
+
+UNITS = {"": 1, "B": 1, "KB": 10**3, "MB": 10**6, "GB": 10**9, "TB": 10**12,
+         "KIB": 1 << 10, "MIB": 1 << 20, "GIB": 1 << 30, "TIB": 1 << 40}
+
+
+def parse_size(text):
+    """'100GB' / '512MiB' / '1.5TB' / plain bytes -> bytes."""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([A-Za-z]*)\s*", str(text))
+    if not match or match.group(2).upper() not in UNITS:
+        raise ValueError(f" Cannot parse size {text!r}")
+    return int(float(match.group(1)) * UNITS[match.group(2).upper()])
+
+
+def format_size(num_bytes):
+    """Bytes -> a size string DuckDB accepts for memory_limit / max_temp_directory_size."""
+    return f"{max(1, num_bytes >> 20)}MiB"
+
+
+def physical_memory():
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+@dataclass
+class Request:
+    threads: int
+    memory: int
+    spill: int
+
+    def env(self):
+        return {
+            "DUCKDB_THREADS": str(self.threads),
+            "DUCKDB_MEMORY_LIMIT": format_size(self.memory),
+            "DUCKDB_MAX_TEMP_SIZE": format_size(self.spill),
+            "MAX_WORKERS": str(self.threads),
+        }
+
+    def __str__(self):
+        return f"{self.threads} threads, {format_size(self.memory)} RAM, {format_size(self.spill)} spill"
+
+
+@dataclass
+class Budget:
+    cpus: int
+    memory: int
+    spill: int
+
+    @classmethod
+    def detect(cls, spill_dir):
+        os.makedirs(spill_dir, exist_ok=True)
+        cpus = int(os.getenv("PIPELINE_CPUS") or multiprocessing.cpu_count())
+        memory = os.getenv("PIPELINE_MEMORY")
+        memory = parse_size(memory) if memory else int(physical_memory() * MEMORY_HEADROOM)
+        spill = os.getenv("PIPELINE_SPILL")
+        spill = parse_size(spill) if spill else int(shutil.disk_usage(spill_dir).free * SPILL_HEADROOM)
+        return cls(cpus, memory, spill)
+
+    def estimate(self, input_bytes):
+        """
+        Footprint of a task reading `input_bytes` of Parquet. Threads scale with the
+        memory share, so one large state gets most of the machine while small states
+        run many at a time on one or two threads each.
+        """
+        memory = min(max(input_bytes * MEMORY_PER_INPUT_BYTE, MIN_TASK_MEMORY), self.memory)
+        spill = min(max(input_bytes * SPILL_PER_INPUT_BYTE, MIN_TASK_SPILL), self.spill)
+        threads = min(max(math.ceil(self.cpus * memory / self.memory), 1), self.cpus)
+        return Request(threads, memory, spill)
+
+    def __str__(self):
+        return f"{self.cpus} CPUs, {format_size(self.memory)} RAM, {format_size(self.spill)} spill"
+
+
+class Pool:
+    """What is left of a Budget while tasks run."""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.cpus, self.memory, self.spill = budget.cpus, budget.memory, budget.spill
+        self.running = 0
+
+    def fits(self, request):
+        return (request.threads <= self.cpus and request.memory <= self.memory
+                and request.spill <= self.spill)
+
+    def acquire(self, request):
+        self.cpus -= request.threads
+        self.memory -= request.memory
+        self.spill -= request.spill
+        self.running += 1
+
+    def release(self, request):
+        self.cpus += request.threads
+        self.memory += request.memory
+        self.spill += request.spill
+        self.running -= 1
+
+
+def max_workers(tasks=None):
+    """Process-pool size: the task's thread share under the runner, all cores otherwise."""
+    workers = int(os.getenv("MAX_WORKERS") or multiprocessing.cpu_count())
+    return max(1, min(workers, tasks)) if tasks else workers
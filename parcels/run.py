@@ -0,0 +1,76 @@
+"""
+Run a whole region, or a single state, in one long-lived process.
+
+Every stage in `parcels.stages.PIPELINE` runs in order on one DuckDB
+connection: spatial is loaded, the PRAGMAs applied and the stage modules
+imported once, and `catalog.attach` re-reads only the catalog entries of the
+files that earlier stages wrote. Intermediates still go through Parquet, so
+a run can stop after any stage and `parcels.dag` picks up from there; the
+scratch tables a stage leaves behind are dropped before the next one.
+With `--workers 1` the per-state stages (pstlclean2, prop_match2) also run
+inline on the shared connection instead of in a process pool. After a crash,
+`--resume` restarts from the last completed state partition of each stage
+(parcels/checkpoint.py).
+
+Usage:
+    python -m parcels.run --data-dir /path/to/regrid_2025 --region northeast
+    python -m parcels.run --region northeast --states VT --stages makecentroids selecturban --workers 1
+    python -m parcels.run --region northeast --resume
+"""
+
+import argparse
+import dataclasses
+import time
+
+from parcels import catalog, stages
+from parcels.config import Config
+
+
+def run(cfg, stage_names=None, con=None):
+    """Run `stage_names` (default: the whole pipeline) for `cfg` on `con`, or on a connection
+    opened and closed here; returns the seconds each stage took."""
+    names = [s for s in stages.PIPELINE if stage_names is None or s in stage_names]
+    modules = [stages.load(name) for name in names]
+    own_con = con is None
+    con = cfg.connect() if own_con else con
+    timings = {}
+    try:
+        for name, module in zip(names, modules):
+            print(f"\n▶ {cfg.region} {name}" + (f" [{', '.join(cfg.states)}]" if cfg.states else ""))
+            start = time.perf_counter()
+            try:
+                module.run(cfg, con)
+            finally:
+                catalog.reset(con)
+            timings[name] = time.perf_counter() - start
+            print(f"✔ {name} in {timings[name]:.1f}s")
+    finally:
+        if own_con:
+            con.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run pipeline stages for one region in this process.")
+    parser.add_argument("--data-dir", help="default: DATA_DIR")
+    parser.add_argument("--region", help="default: REGION")
+    parser.add_argument("--states", nargs="+", help="only these states in per-state stages (default: STATES or all)")
+    parser.add_argument("--stages", nargs="+", choices=stages.PIPELINE, metavar="STAGE",
+                        help="only these stages (default: all)")
+    parser.add_argument("--workers", type=int, help="process-pool size of per-state stages; 1 runs them inline")
+    parser.add_argument("--resume", action="store_true", default=None,
+                        help="skip state partitions whose outputs are complete (default: RESUME)")
+    args = parser.parse_args()
+
+    cfg = Config.from_env(args.region)
+    if not cfg.region:
+        parser.error("--region or REGION is required")
+    overrides = {"data_dir": args.data_dir, "states": args.states, "workers": args.workers, "resume": args.resume}
+    cfg = dataclasses.replace(cfg, **{k: v for k, v in overrides.items() if v is not None})
+
+    timings = run(cfg, args.stages)
+    print(f"\n {cfg.region}: {len(timings)} stage(s) in {sum(timings.values()):.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Reproducible stratified samples of holdings for validation, in one pass.
+
+One scan over the parcels of every requested region (`propsholds_final`, with
+the urban flag when the urban/rural branch ran) gives each holding its
+attributes: region, main state, urban share, parcel/property counts and area
+(from `holdings_info`). Each holding gets the priority
+md5(seed:region:holdid). In the same query, each stratum keeps its k holdings
+with the smallest priorities (bottom-k, `min_by(..., k)`). This is a uniform
+sample without replacement that depends only on the seed. It does not depend
+on scan order, thread count or which other strata are requested, and growing k
+only adds holdings. Any number of strata costs the same single scan. The parcel
+rows of the sampled holdings then come from the holdid index (parcels/lookup.py).
+
+    python -m parcels.sampling --data-dir /path/to/regrid_2025 --strata size state urban --k 25 --out validation/
+    python -m parcels.sampling ... --where "holds_numparcels = 100" --strata region
+"""
+
+import argparse
+import os
+
+import duckdb
+
+from parcels import catalog, lookup
+from parcels.config import REGIONS
+
+# Holding-size buckets (upper bounds of `holds_numparcels`); the last bucket is open-ended
+SIZE_BUCKETS = (1, 2, 5, 10, 50, 100, 1000)
+
+# Named strata; anything else passed as a stratum is used as a SQL expression over the holding attributes
+STRATA = {
+    "region": "region",
+    "state": "state2",
+    # Holdings without a `holdings_info` row have no size: NULL, not the open-ended '>1000' bucket
+    "size": "CASE WHEN holds_numparcels IS NULL THEN NULL " + " ".join(
+        f"WHEN holds_numparcels <= {hi} THEN '{lo + 1}-{hi}'"
+        for lo, hi in zip((0,) + SIZE_BUCKETS, SIZE_BUCKETS)
+    ) + f" ELSE '>{SIZE_BUCKETS[-1]}' END",
+    "urban": "CASE WHEN urban_share IS NULL THEN NULL WHEN urban_share >= 0.5 THEN 'urban' ELSE 'rural' END",
+}
+
+PARCEL_COLUMNS = "holdid, propid, fips_id, owner, mailadd, pstlclean, state2, county, city"
+
+
+def holdings_sql(data_dir, regions):
+    """Holding attributes of every region, aggregated from the parcels in one scan."""
+    parts = []
+    for region in regions:
+        files = catalog.stage_files(data_dir, region, "propsholds_final_urban")
+        in_urban = "p.in_urban"
+        if not files:
+            files = catalog.stage_files(data_dir, region, "propsholds_final")
+            in_urban = "NULL::DOUBLE"
+        if not files:
+            raise ValueError(f" No propsholds_final files for {region}")
+        info = catalog.stage_files(data_dir, region, "holdings_info")
+        parts.append(f"""
+            SELECT '{region}' AS region, p.holdid,
+                   mode(p.state2) AS state2,
+                   AVG({in_urban}) AS urban_share,
+                   COUNT(*) AS parcels,
+                   ANY_VALUE(h.holds_numparcels) AS holds_numparcels,
+                   ANY_VALUE(h.numprops) AS numprops,
+                   ANY_VALUE(h.hold_area_acres) AS hold_area_acres
+            FROM read_parquet({catalog.file_list(files)}) p
+            LEFT JOIN read_parquet({catalog.file_list(info)}) h USING (holdid)
+            WHERE p.holdid IS NOT NULL
+            GROUP BY p.holdid
+        """)
+    return " UNION ALL ".join(parts)
+
+
+def stratum_label(strata):
+    """SQL of the stratum label: the stratum values joined by ' / ' (NULL values shown as 'NULL')."""
+    if not strata:
+        return "'all'"
+    return "concat_ws(' / ', " + ", ".join(
+        f"COALESCE(CAST(({STRATA.get(s, s)}) AS VARCHAR), 'NULL')" for s in strata) + ")"
+
+
+def sample(con, data_dir, regions, strata, k, seed=42, where=None):
+    """
+    Create `sampled_holdings` with the k lowest-priority holdings of each stratum: one row per
+    sampled holding with its `stratum` label, attributes and priority.
+    """
+    con.execute(f"""
+        CREATE OR REPLACE TABLE sampled_holdings AS
+        WITH holdings AS ({holdings_sql(data_dir, regions)}),
+        prioritized AS (
+            SELECT *, md5_number(concat({seed}, ':', region, ':', holdid)) AS priority
+            FROM holdings
+            {f"WHERE {where}" if where else ""}
+        ),
+        picked AS (
+            SELECT {stratum_label(strata)} AS stratum, min_by(prioritized, priority, {k}) AS holdings
+            FROM prioritized
+            GROUP BY stratum
+        )
+        SELECT * FROM (
+            SELECT stratum, holding.*
+            FROM (SELECT stratum, UNNEST(holdings) AS holding FROM picked)
+        )
+        ORDER BY stratum, priority;
+    """)
+    return con.execute("SELECT COUNT(*), COUNT(DISTINCT stratum) FROM sampled_holdings;").fetchone()
+
+
+def sample_parcels(con, data_dir, regions, columns=PARCEL_COLUMNS):
+    """Create `sampled_parcels`: the parcels of every holding in `sampled_holdings`, via the holdid index."""
+    con.execute("DROP TABLE IF EXISTS sampled_parcels;")
+    created = False
+    for region in regions:
+        holdids = [row[0] for row in con.execute(
+            "SELECT DISTINCT holdid FROM sampled_holdings WHERE region = ?;", [region]).fetchall()]
+        if not holdids:
+            continue
+        final_dir = f"{data_dir}/parquet/{region}/{region}_propsholds_final"
+        parcels = lookup.query(con, final_dir, "holdid", holdids, columns)
+        verb = "INSERT INTO sampled_parcels BY NAME" if created else "CREATE TABLE sampled_parcels AS"
+        con.execute(f"{verb} SELECT '{region}' AS region, * FROM ({parcels});")
+        created = True
+    if not created:
+        con.execute("CREATE TABLE sampled_parcels (region VARCHAR, holdid VARCHAR);")
+    return con.execute("SELECT COUNT(*) FROM sampled_parcels;").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stratified, reproducible holding samples with their parcels.")
+    parser.add_argument("--data-dir", default=os.getenv("DATA_DIR"))
+    parser.add_argument("--regions", nargs="+", default=REGIONS)
+    parser.add_argument("--strata", nargs="*", default=["size"],
+                        help=f"named strata {sorted(STRATA)} or SQL expressions over the holding attributes")
+    parser.add_argument("--where", help="SQL filter on the holding attributes, e.g. 'holds_numparcels = 100'")
+    parser.add_argument("--k", type=int, default=25, help="holdings per stratum")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--columns", default=PARCEL_COLUMNS, help="parcel columns to emit")
+    parser.add_argument("--out", default=".", help="directory for sampled_holdings.csv and sampled_parcels.csv")
+    parser.add_argument("--prefix", default="", help="prefix of the output file names")
+    args = parser.parse_args()
+
+    if not args.data_dir:
+        raise ValueError(" DATA_DIR is not set")
+    os.makedirs(args.out, exist_ok=True)
+    con = duckdb.connect()
+    holdings, strata = sample(con, args.data_dir, args.regions, args.strata, args.k, args.seed, args.where)
+    print(f"✅ Sampled {holdings} holdings in {strata} strata of {args.regions}")
+    parcels = sample_parcels(con, args.data_dir, args.regions, args.columns)
+
+    holdings_csv = os.path.join(args.out, f"{args.prefix}sampled_holdings.csv")
+    parcels_csv = os.path.join(args.out, f"{args.prefix}sampled_parcels.csv")
+    con.execute(f"COPY (SELECT * EXCLUDE (priority) FROM sampled_holdings) TO '{holdings_csv}' (HEADER, DELIMITER ',');")
+    con.execute(f"COPY sampled_parcels TO '{parcels_csv}' (HEADER, DELIMITER ',');")
+    print(f"✅ Done. Wrote {holdings} holdings to {holdings_csv} and {parcels} parcels to {parcels_csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Fuzzy owner/address search over a persisted trigram index.
+
+`build` indexes the vocabularies of dictencode (`owner_dict`, `pstl_dict`),
+not the parcels: each distinct value is normalized and split into padded
+trigrams (as in PostgreSQL's pg_trgm). The index is written to
+`{region}_search/`:
+    search_terms.parquet     (field, code, value, grams)    one row per distinct value
+    search_grams.parquet     (gram, field, code)            postings, sorted by gram, with bloom filters
+    search_postings.parquet  (field, code, holdid, propid, parcels)  sorted by (field, code)
+Only values that still occur in `propsholds_final` are kept. `query`
+trigrams the search text and reads the postings of those grams only, through
+an IN-list that row-group statistics and bloom filters prune. It ranks
+candidates by trigram similarity, shared / (query grams + value grams -
+shared), and joins the holdings of the best matches. A lookup reads a few
+row groups, not the region.
+
+    REGION=south DATA_DIR=/path/to/regrid_2025 python -m parcels.search "SMITH FAMILY FARMS"
+    ... python -m parcels.search --field pstlclean "123 MAIN ST AUSTIN TX"
+"""
+
+import argparse
+import math
+import os
+
+from parcels import catalog, checkpoint, telemetry
+from parcels.lookup import INDEX_OPTIONS
+
+# field -> (dictionary view, value column, code column)
+FIELDS = {
+    "owner": ("owner_dict", "owner", "owner_code"),
+    "pstlclean": ("pstl_dict", "pstlclean", "pstl_code"),
+}
+
+
+def normalize(field, expr):
+    """SQL normalizing a value of `field` the way the index does: upper case, letters/digits only.
+    `pstlclean` has no spaces (pstlclean2.py), so its words are not split."""
+    if field == "pstlclean":
+        return f"regexp_replace(UPPER({expr}), '[^A-Z0-9]', '', 'g')"
+    return f"TRIM(regexp_replace(UPPER({expr}), '[^A-Z0-9]+', ' ', 'g'))"
+
+
+def grams_sql(source):
+    """Distinct (field, code, gram) of a relation with (field, code, norm): every word is
+    padded with two leading blanks and one trailing blank, then cut into trigrams."""
+    return f"""
+        SELECT DISTINCT field, code, substring(padded, i + 1, 3) AS gram
+        FROM (
+            SELECT field, code, '  ' || word || ' ' AS padded
+            FROM (SELECT field, code, UNNEST(string_split(norm, ' ')) AS word FROM ({source}))
+            WHERE word <> ''
+        ), range(length(padded) - 2) r(i)
+    """
+
+
+def search_dir(data_dir, region):
+    return f"{data_dir}/parquet/{region}/{region}_search"
+
+
+def build(con, data_dir, region):
+    """Write the trigram index of `region` (needs the catalog attached to `con`)."""
+    out_dir = search_dir(data_dir, region)
+    os.makedirs(out_dir, exist_ok=True)
+
+    # One scan of the parcels maps both vocabularies to holdings and properties
+    telemetry.execute(con, """
+        CREATE OR REPLACE TABLE search_postings AS
+        SELECT t.field, t.code, holdid, propid, COUNT(*) AS parcels
+        FROM (
+            SELECT UNNEST([{'field': 'owner', 'code': owner_code}, {'field': 'pstlclean', 'code': pstl_code}]) AS t,
+                   holdid, propid
+            FROM catalog.propsholds_final
+        )
+        WHERE t.code IS NOT NULL
+        GROUP BY ALL;
+    """)
+    con.execute("CREATE OR REPLACE TABLE search_terms (field VARCHAR, code INTEGER, value VARCHAR, norm VARCHAR);")
+    for field, (view, column, code) in FIELDS.items():
+        telemetry.execute(con, f"""
+            INSERT INTO search_terms
+            SELECT '{field}', d.{code}, d.{column}, {normalize(field, f"d.{column}")}
+            FROM catalog.{view} d
+            SEMI JOIN (SELECT code FROM search_postings WHERE field = '{field}') p ON d.{code} = p.code;
+        """)
+    telemetry.execute(con, f"CREATE OR REPLACE TABLE search_grams AS {grams_sql('SELECT field, code, norm FROM search_terms')};")
+
+    checkpoint.copy(con, """(
+        SELECT t.field, t.code, t.value, COUNT(g.gram) AS grams
+        FROM search_terms t LEFT JOIN search_grams g USING (field, code)
+        GROUP BY ALL ORDER BY t.field, t.code
+    )""", os.path.join(out_dir, "search_terms.parquet"), INDEX_OPTIONS)
+    checkpoint.copy(con, "(SELECT gram, field, code FROM search_grams ORDER BY gram, field, code)",
+                    os.path.join(out_dir, "search_grams.parquet"), INDEX_OPTIONS)
+    checkpoint.copy(con, "(SELECT * FROM search_postings ORDER BY field, code, holdid, propid)",
+                    os.path.join(out_dir, "search_postings.parquet"), INDEX_OPTIONS)
+    return con.execute("SELECT field, COUNT(*) FROM search_terms GROUP BY field ORDER BY field;").fetchall()
+
+
+def _in_list(values):
+    return "(" + ", ".join("'" + str(v).replace("'", "''") + "'" for v in values) + ")"
+
+
+def query(con, data_dir, region, text, field="owner", limit=20, min_similarity=0.3):
+    """
+    Create `search_matches` (value, similarity) with the `limit` values of `field` most similar to
+    `text`, and `search_results` with their holdings (value, similarity, holdid, properties, parcels).
+    Returns the number of matched values.
+    """
+    if field not in FIELDS:
+        raise ValueError(f" No search index on {field}; indexed fields are {sorted(FIELDS)}")
+    index = search_dir(data_dir, region)
+    query_grams = [row[0] for row in con.execute(f"""
+        SELECT gram FROM ({grams_sql(f"SELECT '{field}' AS field, 0 AS code, {normalize(field, '?')} AS norm")})
+    """, [text]).fetchall()]
+    if not query_grams:
+        raise ValueError(f" Nothing to search for in {text!r}")
+    # A value sharing s grams has similarity <= s / len(query_grams), so rarer candidates can be cut early
+    min_shared = max(1, math.ceil(min_similarity * len(query_grams)))
+    con.execute(f"""
+        CREATE OR REPLACE TABLE search_matches AS
+        WITH candidates AS (
+            SELECT code, COUNT(*) AS shared
+            FROM read_parquet('{index}/search_grams.parquet')
+            WHERE gram IN {_in_list(query_grams)} AND field = '{field}'
+            GROUP BY code
+            HAVING COUNT(*) >= {min_shared}
+        )
+        SELECT t.code, t.value, c.shared / (t.grams + {len(query_grams)} - c.shared) AS similarity
+        FROM candidates c
+        JOIN read_parquet('{index}/search_terms.parquet') t ON t.field = '{field}' AND t.code = c.code
+        WHERE c.shared / (t.grams + {len(query_grams)} - c.shared) >= {min_similarity}
+        ORDER BY similarity DESC, t.value
+        LIMIT {limit};
+    """)
+    codes = [row[0] for row in con.execute("SELECT code FROM search_matches;").fetchall()]
+    con.execute(f"""
+        CREATE OR REPLACE TABLE search_results AS
+        SELECT m.value, m.similarity, p.holdid, COUNT(DISTINCT p.propid) AS properties, SUM(p.parcels) AS parcels
+        FROM search_matches m
+        JOIN (
+            SELECT * FROM read_parquet('{index}/search_postings.parquet')
+            WHERE field = '{field}' AND code IN {_in_list(codes) if codes else "(NULL)"}
+        ) p ON p.code = m.code
+        GROUP BY ALL
+        ORDER BY m.similarity DESC, m.value, parcels DESC;
+    """)
+    return len(codes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy search of owners or mailing addresses and their holdings.")
+    parser.add_argument("text", help="owner name or mailing address to look for")
+    parser.add_argument("--data-dir", default=os.getenv("DATA_DIR"))
+    parser.add_argument("--region", default=os.getenv("REGION"))
+    parser.add_argument("--field", choices=sorted(FIELDS), default="owner")
+    parser.add_argument("--limit", type=int, default=20, help="matched values to return")
+    parser.add_argument("--min-similarity", type=float, default=0.3)
+    args = parser.parse_args()
+
+    if not args.data_dir or not args.region:
+        raise ValueError(" DATA_DIR and REGION must be set")
+    con = catalog.connect_memory(args.data_dir)
+    matches = query(con, args.data_dir, args.region, args.text, args.field, args.limit, args.min_similarity)
+    print(f" {matches} {args.field} value(s) similar to {args.text!r} in {args.region}")
+    for value, similarity, holdid, properties, parcels in con.execute("SELECT * FROM search_results;").fetchall():
+        print(f" {similarity:5.2f}  {value:<48} holdid {holdid}: {properties} properties, {parcels} parcels")
+    con.close()
+
+
+if __name__ == "__main__":
+    main()
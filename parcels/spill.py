@@ -0,0 +1,91 @@
+"""
+Memory estimates for the large joins and windows, with hash-partitioned fallbacks.
+
+Before a heavy operator runs, `plan` estimates its working set from Parquet
+footer statistics: the rows and decoded bytes of the columns it touches
+(`parquet_metadata`, nothing is scanned) times a per-operator factor. It then
+compares that estimate with the connection's memory_limit. If it does not fit
+in FIT_FRACTION of the limit, the operation is split into hash partitions on
+its join or PARTITION BY key and the partitions run one after another. Each
+partition is exact, because rows with equal keys hash to the same partition.
+After every partition the spill DuckDB still holds (`duckdb_temporary_files()`)
+is sampled. `Plan.report` prints the decision and the spill peak and records
+both in the task's telemetry.
+"""
+
+import math
+from dataclasses import dataclass
+
+from parcels import resources, telemetry
+
+# Leave room for everything else the query and the connection hold
+FIT_FRACTION = 0.5
+# Working set over the decoded bytes of the touched columns
+HASH_JOIN_FACTOR = 2.5   # build side, hash table and probe buffers
+WINDOW_FACTOR = 3.0      # PARTITION BY sorts the rows and keeps them for the frame
+AGGREGATE_FACTOR = 2.0
+MAX_PARTITIONS = 256
+
+
+def column_bytes(con, files, columns):
+    """Rows and decoded (uncompressed) bytes of `columns` in `files`, from the footers only."""
+    if not files:
+        return 0, 0
+    file_list = "[" + ", ".join(f"'{f}'" for f in files) + "]"
+    rows = con.execute(f"SELECT SUM(num_rows) FROM parquet_file_metadata({file_list});").fetchone()[0]
+    nbytes = con.execute(f"""
+        SELECT SUM(total_uncompressed_size) FROM parquet_metadata({file_list})
+        WHERE split_part(path_in_schema, ', ', 1) IN ({", ".join("?" * len(columns))});
+    """, list(columns)).fetchone()[0]
+    return int(rows or 0), int(nbytes or 0)
+
+
+def memory_limit(con):
+    return resources.parse_size(con.execute("SELECT current_setting('memory_limit');").fetchone()[0])
+
+
+def spilled_bytes(con):
+    return con.execute("SELECT COALESCE(SUM(size), 0) FROM duckdb_temporary_files();").fetchone()[0]
+
+
+@dataclass
+class Plan:
+    name: str
+    rows: int
+    input_bytes: int
+    estimate: int
+    limit: int
+    partitions: int
+    spill_peak: int = 0
+
+    def where(self, con, key):
+        """Yield one SQL predicate per partition on the `key` expression, sampling `con`'s spill after each."""
+        for p in range(self.partitions):
+            yield "TRUE" if self.partitions == 1 else f"hash({key}) % {self.partitions} = {p}"
+            self.spill_peak = max(self.spill_peak, spilled_bytes(con))
+
+    def materialize(self, con, table, key, query, params=None):
+        """CREATE `table` from `query` run once per partition on `key`; each `{where}` in the
+        query is replaced by the partition's predicate."""
+        for i, where in enumerate(self.where(con, key)):
+            verb = f"CREATE OR REPLACE TABLE {table} AS" if i == 0 else f"INSERT INTO {table}"
+            telemetry.execute(con, f"{verb} {query.replace('{where}', where)}", params)
+
+    def report(self):
+        print(f"🔹 {self.name}: {self.partitions} partition(s) for ~{resources.format_size(self.estimate)} "
+              f"working set ({self.rows} rows) under a {resources.format_size(self.limit)} memory_limit; "
+              f"spill peak {resources.format_size(self.spill_peak) if self.spill_peak else '0'}")
+        telemetry.event("partitioned", name=self.name, rows=self.rows, input_bytes=self.input_bytes,
+                        estimate_bytes=self.estimate, memory_limit_bytes=self.limit,
+                        partitions=self.partitions, spill_peak_bytes=self.spill_peak)
+
+
+def plan(con, name, files, columns, factor, partitions=None):
+    """Decide how many hash partitions an operator over `columns` of `files` needs to stay in memory."""
+    rows, nbytes = column_bytes(con, files, columns)
+    estimate = int(nbytes * factor)
+    limit = memory_limit(con)
+    if partitions is None:
+        ratio = estimate / (limit * FIT_FRACTION)
+        partitions = 1 if ratio <= 1 else min(MAX_PARTITIONS, 2 ** math.ceil(math.log2(ratio)))
+    return Plan(name, rows, nbytes, estimate, limit, partitions)
@@ -0,0 +1,62 @@
+"""
+Pipeline stages as importable functions.
+
+Every module here exposes `run(cfg, con)`: `cfg` is a `parcels.config.Config`
+and `con` a DuckDB connection owned by the caller (see `Config.connect`).
+Stages attach the region catalog themselves, write their outputs to Parquet
+and leave `con` open, so `parcels.run` can execute a whole region, or a
+single state, in one process with one connection. The `scripts/*.py` and
+`urban_rural/*.py` files are shims around `main`.
+"""
+
+import importlib
+import os
+
+from parcels.config import REGIONS, Config
+
+# Execution order of a full region (the DAG in parcels/dag.py encodes the same dependencies)
+PIPELINE = [
+    "importparquet",
+    "concatpstl",
+    "pstlclean2",
+    "dictionaries",
+    "dictencode",
+    "prop_match2",
+    "prop_groupmatch",
+    "prop_setnullgroupid",
+    "holds_match",
+    "jointables",
+    "getbatches",
+    "holds_union",
+    "dispersion",
+    "joinzipcode",
+    "localzip",
+    "searchindex",
+    "makecentroids",
+    "selecturban",
+    "joincolumn",
+    "props_urban",
+    "join_avgurban",
+    "addattributes",
+    "summarycube",
+    "topholders",
+    "exporttiles",
+    "countchecks",
+]
+
+
+def load(name):
+    """Import a stage module by name (stages import their heavy dependencies lazily this way)."""
+    return importlib.import_module(f"parcels.stages.{name}")
+
+
+def main(run):
+    """Run one stage configured from the environment; without REGION, for every region in turn."""
+    regions = [os.environ["REGION"]] if os.getenv("REGION") else REGIONS
+    for region in regions:
+        cfg = Config.from_env(region)
+        con = cfg.connect()
+        try:
+            run(cfg, con)
+        finally:
+            con.close()
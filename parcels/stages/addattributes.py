@@ -0,0 +1,37 @@
+"""Area-weighted zip-match and urban shares per property."""
+
+from parcels import catalog, checkpoint
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+    catalog.attach(con, data_dir, region)
+
+    shapes_path = cfg.path("{region}_prop_shapes", "prop_shapes_{region}_with_urban.parquet")
+    out_path = cfg.path("{region}_prop_shapes", "prop_shapes_{region}_aw.parquet")
+
+    # `in_urban` only exists in the `joincolumn` outputs (the `propsholds_final_urban` view)
+    con.execute(f"""
+    CREATE OR REPLACE TABLE prop_shapes_aw AS
+    SELECT
+      s.propid,
+      s.holdid,
+      s.area_acres,
+      s.num_parcels,
+      pl.mean_zip_match AS mean_zip_match_aw,
+      pl.mean_in_urban  AS mean_in_urban_aw
+    FROM
+      read_parquet('{shapes_path}') AS s
+      LEFT JOIN (
+        SELECT
+          propid,
+          SUM(zip_match * area) / SUM(area) AS mean_zip_match,
+          SUM(in_urban  * area) / SUM(area) AS mean_in_urban
+        FROM (
+          SELECT propid, zip_match, in_urban, ST_AREA(geom) AS area
+          FROM catalog.propsholds_final_urban
+        )
+        GROUP BY propid
+      ) AS pl USING (propid);
+    """)
+    checkpoint.copy(con, "prop_shapes_aw", out_path)
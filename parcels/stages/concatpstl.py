@@ -0,0 +1,96 @@
+"""Concatenate each state's mailing-address fields into `pstladress`."""
+
+import os
+import glob
+from parcels import catalog, checkpoint
+from parcels.overlap import run_states, table
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Define input/output paths
+    input_folder = f"{data_dir}/parquet/{region}/parquets_partitioned/"
+    output_folder = f"{data_dir}/parquet/{region}/parquets_concat/"
+
+    # Ensure output directory exists
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Get partitioned Parquet files
+    parquet_files = glob.glob(os.path.join(input_folder, "parquets_*.parquet"))
+    states = [os.path.basename(f).replace("parquets_", "").replace(".parquet", "") for f in parquet_files]
+    states = cfg.select(states)  # limited to `cfg.states` when set
+
+    if not states:
+        raise ValueError(f"No Parquet state files found in {input_folder}")
+
+    print(f"🔹 Found partitioned Parquet files for states: {states}")
+
+    states = cfg.pending(states, os.path.join(output_folder, "concatpstl_{state}.parquet"))
+
+    catalog.attach(con, data_dir, region)
+
+
+    # Process each state separately; the next state's input is read and the previous
+    # state's output written while this one computes (parcels/overlap.py)
+    def read(cur, state):
+        input_parquet = os.path.join(input_folder, f"parquets_{state}.parquet")
+        print(f"🔹 Reading state: {state}")
+        cur.execute(f"""
+            CREATE OR REPLACE TABLE {table("parquets", state)} AS 
+            SELECT * FROM read_parquet('{input_parquet}');
+        """)
+
+    def compute(cur, state):
+        print(f"🔹 Processing state: {state}")
+
+        # Generate `pstladress` (concatenated address)
+        cur.execute("DROP TABLE IF EXISTS state_pstl;")
+        cur.execute(f"""
+            CREATE TABLE state_pstl AS
+            SELECT 
+                fips_id,
+                mailadd, 
+                COALESCE(mailadd, '') || ' ' || COALESCE(mail_city, '') || ' ' || COALESCE(mail_state2, '') || ' ' || COALESCE(mail_zip, '') AS pstladress
+            FROM {table("parquets", state)};
+        """)
+
+        # Generate `tmp_orig_sn` (owner & location info)
+        cur.execute("DROP TABLE IF EXISTS tmp_orig_sn;")
+        cur.execute(f"""
+            CREATE TABLE tmp_orig_sn AS
+            SELECT
+                fips_id,
+                UPPER(owner) AS owner,
+                mailadd,
+                city,
+                county,
+                state2,
+                geom
+            FROM {table("parquets", state)};
+        """)
+
+        # Join `state_pstl` with `tmp_orig_sn`
+        cur.execute(f"""
+            CREATE OR REPLACE TABLE {table("test_concat", state)} AS
+            SELECT a.*, b.pstladress
+            FROM tmp_orig_sn a
+            LEFT JOIN state_pstl b
+            ON a.fips_id = b.fips_id;
+        """)
+        cur.execute(f"DROP TABLE {table('parquets', state)};")
+
+        # Verify row count
+        row_count = cur.execute(f"SELECT COUNT(*) FROM {table('test_concat', state)};").fetchone()[0]
+        print(f"Processed {row_count} rows for {state}")
+
+    def write(cur, state):
+        # Save processed data as Parquet
+        output_parquet = os.path.join(output_folder, f"concatpstl_{state}.parquet")
+        checkpoint.copy(cur, table("test_concat", state), output_parquet)
+        cur.execute(f"DROP TABLE {table('test_concat', state)};")
+        print(f"Saved processed data to {output_parquet}")
+
+    run_states(con, states, read, compute, write, cfg.overlap)
+
+    print("🎉 Processing complete! Address-concatenated Parquet files are ready.")
@@ -0,0 +1,141 @@
+"""Cross-stage row-count invariants and null rates for a region."""
+
+import os
+import glob
+import time
+from parcels import catalog
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Distinct-count mode for holdid/propid: "approx" uses HyperLogLog (approx_count_distinct), "exact" COUNT(DISTINCT ...)
+    count_mode = cfg.count_mode
+    if count_mode not in ("approx", "exact"):
+        raise ValueError(f" COUNT_MODE must be 'approx' or 'exact', got {count_mode!r}")
+
+    # Relative error allowed when an invariant compares against a HyperLogLog estimate
+    approx_tolerance = cfg.count_tolerance
+
+    # Define Parquet directories
+    parquets_dir = f"{data_dir}/parquet/{region}/parquets_partitioned/"  # Partitioned input data
+    propsholds_final_dir = f"{data_dir}/parquet/{region}/{region}_propsholds_final/"  # Final property holdings
+    prop_shapes_path = f"{data_dir}/parquet/{region}/{region}_prop_shapes/prop_shapes_{region}.parquet"  # Processed property geometries
+    holdings_info_path = f"{data_dir}/parquet/{region}/{region}_holdings/holdings_info.parquet"  # Final holdings info
+
+    start_time = time.perf_counter()
+
+    # Step 1: Locate stage outputs
+    parquet_files = glob.glob(os.path.join(parquets_dir, "parquets_*.parquet"))
+    if not parquet_files:
+        raise ValueError(f" No `parquets_{{state}}.parquet` files found in {parquets_dir}")
+
+    # `joincolumn.py` writes `propsholds_final_{state}_urban.parquet` next to the base files; count only the base files
+    propsholds_files = [
+        f for f in glob.glob(os.path.join(propsholds_final_dir, "propsholds_final_*.parquet"))
+        if not f.endswith("_urban.parquet")
+    ]
+    if not propsholds_files:
+        raise ValueError(f" No `propsholds_final_{{state}}.parquet` files found in {propsholds_final_dir}")
+
+    if not os.path.exists(prop_shapes_path):
+        raise ValueError(f" No `prop_shapes_{region}.parquet` found at {prop_shapes_path}")
+
+    if not os.path.exists(holdings_info_path):
+        raise ValueError(f" No `holdings_info.parquet` found at {holdings_info_path}")
+
+    # Connect to the region catalog; refreshing it reads only the footers of files that changed
+    catalog.attach(con, data_dir, region)
+    print(f"🔹 Connected to region catalog at: {catalog.catalog_path(data_dir, region)} (distinct counts: {count_mode})")
+
+    # Step 2: Row counts from the Parquet footer statistics stored in the catalog
+    print(" Reading row counts from catalog footer statistics...")
+    parquets_count = catalog.view_rows(con, "parquets_partitioned")
+    propsholds_count = catalog.view_rows(con, "propsholds_final")
+    prop_shapes_count = catalog.view_rows(con, "prop_shapes")
+    holdings_count = catalog.view_rows(con, "holdings_info")
+
+    print(f" Total records in `parquets_partitioned`: {parquets_count}")
+    print(f" Total records in `propsholds_final`: {propsholds_count}")
+    print(f" Total records in `prop_shapes`: {prop_shapes_count}")
+    print(f" Total records in `holdings_info`: {holdings_count}")
+
+    # Step 3: Distinct counts and null rates in a single projected pass over `propsholds_final`.
+    # The parcel key is always counted exactly: a 2% HyperLogLog tolerance would pass millions of duplicates.
+    print(" Computing distinct counts and null rates in one pass over `propsholds_final`...")
+    distinct_fn = "approx_count_distinct({})" if count_mode == "approx" else "COUNT(DISTINCT {})"
+
+    (
+        distinct_fips_count,
+        distinct_holdid_count,
+        distinct_propid_count,
+        owner_null_rate,
+        mailadd_null_rate,
+        pstlclean_null_rate,
+    ) = con.execute(f"""
+        SELECT
+            COUNT(DISTINCT fips_id),
+            {distinct_fn.format("holdid")},
+            {distinct_fn.format("propid")},
+            AVG(CASE WHEN owner IS NULL OR TRIM(owner) = '' THEN 1.0 ELSE 0.0 END),
+            AVG(CASE WHEN mailadd IS NULL OR TRIM(mailadd) = '' THEN 1.0 ELSE 0.0 END),
+            AVG(CASE WHEN pstlclean IS NULL OR TRIM(pstlclean) = '' THEN 1.0 ELSE 0.0 END)
+        FROM catalog.propsholds_final;
+    """).fetchone()
+
+    print(f" Unique `fips_id` count in `propsholds_final`: {distinct_fips_count}")
+    print(f" Unique `holdid` count in `propsholds_final`: {distinct_holdid_count}")
+    print(f" Unique `propid` count in `propsholds_final`: {distinct_propid_count}")
+    print(f" Null/empty rate for `owner`: {owner_null_rate:.4f}")
+    print(f" Null/empty rate for `mailadd`: {mailadd_null_rate:.4f}")
+    print(f" Null/empty rate for `pstlclean`: {pstlclean_null_rate:.4f}")
+
+    # Step 4: Cross-stage row-count invariants
+    print("\n Checking cross-stage invariants...")
+    failures = []
+
+    def check(name, actual, expected, estimated=False):
+        """Compare two counts; estimates from HyperLogLog are allowed `approx_tolerance` relative error."""
+        if estimated and count_mode == "approx":
+            ok = abs(actual - expected) <= approx_tolerance * max(expected, 1)
+        else:
+            ok = actual == expected
+        print(f" {'✔' if ok else '✘'} {name}: {actual} vs {expected}")
+        if not ok:
+            failures.append(name)
+
+    # Every partitioned parcel must survive to `propsholds_final` (all joins downstream are LEFT joins on fips_id)
+    check("parquets_partitioned rows == propsholds_final rows", propsholds_count, parquets_count)
+    # `fips_id` is the parcel key and must stay unique
+    check("distinct fips_id == propsholds_final rows", distinct_fips_count, propsholds_count)
+    # `getbatches.py` emits one shape per property
+    check("prop_shapes rows == distinct propid", prop_shapes_count, distinct_propid_count, estimated=True)
+    # `holds_union.py` groups `prop_shapes` by holdid, so this assumes every holding has at least one shape
+    check("holdings_info rows == distinct holdid", holdings_count, distinct_holdid_count, estimated=True)
+
+    # Only HyperLogLog estimates get the tolerance; exact counts must satisfy the invariant exactly
+    holdid_limit = distinct_propid_count * (1 + approx_tolerance) if count_mode == "approx" else distinct_propid_count
+    if distinct_holdid_count > holdid_limit:
+        print(f" ✘ distinct holdid <= distinct propid: {distinct_holdid_count} vs {distinct_propid_count}")
+        failures.append("distinct holdid <= distinct propid")
+    else:
+        print(f" ✔ distinct holdid <= distinct propid: {distinct_holdid_count} vs {distinct_propid_count}")
+
+    # Step 5: Sample Data Previews (LIMIT only decodes the first row group)
+    print("\n Sample records from `propsholds_final`:")
+    sample_propsholds = con.execute(f"SELECT * FROM read_parquet('{propsholds_files[0]}') LIMIT 5;").fetchdf()
+    print(sample_propsholds)
+
+    print("\n Sample records from `prop_shapes`:")
+    sample_prop_shapes = con.execute(f"SELECT * FROM read_parquet('{prop_shapes_path}') LIMIT 5;").fetchdf()
+    print(sample_prop_shapes)
+
+    print("\n Sample records from `holdings_info`:")
+    sample_holdings_info = con.execute(f"SELECT * FROM read_parquet('{holdings_info_path}') LIMIT 5;").fetchdf()
+    print(sample_holdings_info)
+
+    print(f"\n Data validation finished in {time.perf_counter() - start_time:.1f}s")
+
+    if failures:
+        raise SystemExit(f" {len(failures)} invariant(s) failed: {', '.join(failures)}")
+    print(" Data validation complete!")
@@ -0,0 +1,51 @@
+"""Encode each state's cleaned records with the region-wide dictionaries written by dictionaries.py."""
+
+import os
+import glob
+from parcels import checkpoint, telemetry
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Define input/output paths
+    cleaned_pstl_dir = f"{data_dir}/parquet/{region}/parquets_cleaned"
+    dictionary_dir = f"{data_dir}/parquet/{region}/{region}_dictionary"
+    encoded_dir = f"{data_dir}/parquet/{region}/parquets_encoded"
+
+    fips_dict_path = os.path.join(dictionary_dir, "fips_dict.parquet")
+    owner_dict_path = os.path.join(dictionary_dir, "owner_dict.parquet")
+    pstl_dict_path = os.path.join(dictionary_dir, "pstl_dict.parquet")
+
+    # Ensure output directories exist
+    os.makedirs(encoded_dir, exist_ok=True)
+
+    # Get list of cleaned Parquet files
+    parquet_files = glob.glob(os.path.join(cleaned_pstl_dir, "cleanedpstl_*.parquet"))
+    states = [os.path.basename(f).replace("cleanedpstl_", "").replace(".parquet", "") for f in parquet_files]
+
+    if not states:
+        raise ValueError(f" No Parquet state files found in {cleaned_pstl_dir}")
+    for path in (fips_dict_path, owner_dict_path, pstl_dict_path):
+        if not os.path.exists(path):
+            raise ValueError(f" No dictionary at {path}; run dictionaries first")
+
+    # A fips renumber in dictionaries.py removes every encoded file, so pending states include them all
+    states = cfg.pending(cfg.select(states), os.path.join(encoded_dir, "encodedpstl_{state}.parquet"))
+    print(f" Encoding states: {states}")
+    for state in states:
+        input_parquet = os.path.join(cleaned_pstl_dir, f"cleanedpstl_{state}.parquet")
+        output_parquet = os.path.join(encoded_dir, f"encodedpstl_{state}.parquet")
+
+        print(f" Encoding state: {state}")
+        with telemetry.profile(con, f"encode_{state}"):
+            checkpoint.copy(con, f"""(
+                    SELECT c.*, f.fips_code, o.owner_code, p.pstl_code
+                    FROM read_parquet('{input_parquet}') c
+                    LEFT JOIN read_parquet('{fips_dict_path}') f ON c.fips_id = f.fips_id
+                    LEFT JOIN read_parquet('{owner_dict_path}') o ON c.owner = o.owner
+                    LEFT JOIN read_parquet('{pstl_dict_path}') p ON c.pstlclean = p.pstlclean
+                )""", output_parquet)
+        print(f" Saved encoded data to {output_parquet}")
+
+    print(" Processing complete! Encoded Parquet files are ready.")
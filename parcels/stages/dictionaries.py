@@ -0,0 +1,96 @@
+"""Region-wide integer dictionaries for `fips_id`, `owner` and `pstlclean` (encoded per state by dictencode.py)."""
+
+import glob
+import os
+
+from parcels import catalog, checkpoint
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Define input/output paths
+    cleaned_pstl_dir = f"{data_dir}/parquet/{region}/parquets_cleaned"
+    dictionary_dir = f"{data_dir}/parquet/{region}/{region}_dictionary"
+    encoded_dir = f"{data_dir}/parquet/{region}/parquets_encoded"
+
+    fips_dict_path = os.path.join(dictionary_dir, "fips_dict.parquet")
+    owner_dict_path = os.path.join(dictionary_dir, "owner_dict.parquet")
+    pstl_dict_path = os.path.join(dictionary_dir, "pstl_dict.parquet")
+
+    os.makedirs(dictionary_dir, exist_ok=True)
+
+    if not glob.glob(os.path.join(cleaned_pstl_dir, "cleanedpstl_*.parquet")):
+        raise ValueError(f" No Parquet state files found in {cleaned_pstl_dir}")
+
+    catalog.attach(con, data_dir, region)
+
+    # `fips_code` follows the sort order of `fips_id`, so MIN() over codes picks the same parcel as MIN() over
+    # the strings. `propid` and `holdid` are always some parcel's `fips_id`, so they reuse these codes.
+    # Codes must stay stable between runs so that a rerun for some states leaves the other states' encoded
+    # files valid: the fips dictionary is only rebuilt when the set of `fips_id`s changes (i.e. after a new
+    # import), and owner/address codes are append-only until then.
+    print(" Building region-wide `fips_id` dictionary...")
+    con.execute("CREATE TABLE fips_ids AS SELECT DISTINCT fips_id FROM catalog.parquets_cleaned;")
+    rebuild_fips = True
+    if os.path.exists(fips_dict_path):
+        con.execute(f"CREATE TABLE fips_dict AS SELECT * FROM read_parquet('{fips_dict_path}');")
+        changed = con.execute("""
+            SELECT COUNT(*) FROM (
+                (SELECT fips_id FROM fips_ids EXCEPT SELECT fips_id FROM fips_dict)
+                UNION ALL
+                (SELECT fips_id FROM fips_dict EXCEPT SELECT fips_id FROM fips_ids)
+            );
+        """).fetchone()[0]
+        rebuild_fips = changed > 0
+    if rebuild_fips:
+        con.execute("""
+            CREATE OR REPLACE TABLE fips_dict AS
+            SELECT fips_id, CAST(ROW_NUMBER() OVER (ORDER BY fips_id) - 1 AS BIGINT) AS fips_code
+            FROM fips_ids;
+        """)
+    else:
+        print(" `fips_id` set unchanged, keeping existing codes")
+
+    # Empty cleaned addresses never match, so they get no code (NULL) just like NULL addresses
+    print(" Building `owner` and `pstlclean` dictionaries...")
+    added = {}
+    for name, path, column, code, values in [
+        ("owner_dict", owner_dict_path, "owner", "owner_code", "owner IS NOT NULL"),
+        ("pstl_dict", pstl_dict_path, "pstlclean", "pstl_code", "pstlclean IS NOT NULL AND pstlclean <> ''"),
+    ]:
+        if os.path.exists(path) and not rebuild_fips:
+            con.execute(f"CREATE TABLE {name} AS SELECT * FROM read_parquet('{path}');")
+        else:
+            con.execute(f"CREATE TABLE {name} ({column} VARCHAR, {code} INTEGER);")
+        # New values are numbered after the existing codes
+        added[name] = con.execute(f"""
+            INSERT INTO {name}
+            SELECT {column}, CAST((SELECT COALESCE(MAX({code}), -1) FROM {name}) + ROW_NUMBER() OVER (ORDER BY {column}) AS INTEGER)
+            FROM (
+                SELECT DISTINCT {column} FROM catalog.parquets_cleaned WHERE {values}
+                EXCEPT
+                SELECT {column} FROM {name}
+            );
+        """).fetchone()[0]
+    added["fips_dict"] = rebuild_fips
+
+    # Unchanged dictionaries are not rewritten, so the per-state dictencode tasks reading them stay current
+    for name, path in [("fips_dict", fips_dict_path), ("owner_dict", owner_dict_path), ("pstl_dict", pstl_dict_path)]:
+        size = con.execute(f"SELECT COUNT(*) FROM {name};").fetchone()[0]
+        if added[name] or not (os.path.exists(path) and checkpoint.intact(path)):
+            checkpoint.copy(con, name, path)
+            print(f" Saved {size} `{name}` entries to {path}")
+        else:
+            print(f" `{name}` unchanged ({size} entries)")
+
+    # Renumbered fips (and restarted owner/address) codes invalidate every encoded state file:
+    # drop them so dictencode re-encodes all states, also under RESUME or a STATES subset
+    if rebuild_fips:
+        stale = glob.glob(os.path.join(encoded_dir, "encodedpstl_*.parquet"))
+        for path in stale:
+            os.remove(path)
+            if os.path.exists(checkpoint.marker_path(path)):
+                os.remove(checkpoint.marker_path(path))
+        if stale:
+            print(f" `fips_code`s renumbered: removed {len(stale)} encoded state file(s) for re-encoding")
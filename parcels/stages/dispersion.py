@@ -0,0 +1,58 @@
+"""Bounding-box dispersion of each holding's properties."""
+
+import os
+from parcels import catalog, checkpoint, telemetry
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Input/Output file paths
+    prop_shapes_path = f"{data_dir}/parquet/{region}/{region}_prop_shapes/prop_shapes_{region}.parquet"
+    holds_dispersion_output_path = f"{data_dir}/parquet/{region}/{region}_holds_dispersion/holds_dispersion_bbox.parquet"
+
+    # Ensure the output directory exists
+    os.makedirs(os.path.dirname(holds_dispersion_output_path), exist_ok=True)
+
+    print(f"🔹 Processing bounding-box dispersion analysis for holdings in region: {region}")
+
+    catalog.attach(con, data_dir, region)
+
+    # Step 1: Compute the envelope of parcel geometries for each holding.
+    # Instead of ST_Union, we use ARRAY_AGG to aggregate all parcel geometries and then build a collection.
+    # ST_Envelope returns the bounding box of that collection.
+    print(f" Loading property shapes from: {prop_shapes_path} and computing envelope geometry for each holding...")
+    with telemetry.profile(con, "holds_envelope"):
+        telemetry.execute(con, """
+            CREATE OR REPLACE TABLE holds_union AS
+            SELECT holdid,
+                   ST_Envelope(ST_Collect(ARRAY_AGG(geom))) AS union_geom
+            FROM catalog.prop_shapes
+            GROUP BY holdid;
+        """)
+    union_count = con.execute("SELECT COUNT(*) FROM holds_union;").fetchone()[0]
+    print(f" Computed envelope geometries for {union_count} holdings.")
+
+    # Step 2: Calculate the bounding box diagonal (dispersion metric).
+    # This calculates the distance between the lower-left and upper-right corners of the envelope.
+    print(" Calculating bounding box diagonal (dispersion) for each holding...")
+    con.execute("DROP TABLE IF EXISTS holds_dispersion_bbox;")
+    con.execute("""
+        CREATE TABLE holds_dispersion_bbox AS
+        SELECT 
+             holdid,
+             ST_Distance(
+                 ST_Point(ST_XMin(union_geom), ST_YMin(union_geom)),
+                 ST_Point(ST_XMax(union_geom), ST_YMax(union_geom))
+             ) / 1000.0 AS bbox_diagonal_km
+        FROM holds_union;
+    """)
+    dispersion_count = con.execute("SELECT COUNT(*) FROM holds_dispersion_bbox;").fetchone()[0]
+    print(f" Computed dispersion for {dispersion_count} holdings.")
+
+    # Step 3: Save the dispersion results to a Parquet file.
+    print(f" Saving dispersion results to: {holds_dispersion_output_path}")
+    checkpoint.copy(con, "holds_dispersion_bbox", holds_dispersion_output_path)
+    print(f" Dispersion data saved successfully to {holds_dispersion_output_path}")
+
+    print(" Processing complete! Dispersion data (based on bounding box diagonal) is now stored in a single Parquet file.")
@@ -0,0 +1,287 @@
+"""
+Vector tiles of properties and parcels in one PMTiles archive, rendered in parallel.
+
+Step 1 projects `prop_shapes` (joined to `prop_shapes_aw`) and the parcels of
+`propsholds_final_*_urban` to EPSG:3857. It writes them as one Hilbert-sorted
+feature file with a `bbox` column, so a reader prunes row groups outside its
+window. Step 2 renders the zoom pyramid MIN_ZOOM..MAX_ZOOM. Each zoom is cut
+into BLOCK_ZOOM blocks (single tiles below it), and the blocks are spread over
+a process pool. A worker reads only the features of its block and, per zoom:
+  - drops features whose bbox spans fewer than MIN_FEATURE_PX pixels, and the
+    parcel layer below PARCEL_MIN_ZOOM;
+  - simplifies each geometry to one pixel;
+  - clips and quantizes it with ST_AsMVTGeom and encodes each layer with
+    ST_AsMVT. The layers of a tile are concatenated (MVT layers are
+    independent protobuf messages) and gzipped.
+Each block writes its tiles to a scratch file and their (tile_id, offset,
+length, digest) entries to a small Parquet index, so the parent never holds
+the tile list. Step 3 streams the indexes in tile-id order (DuckDB sorts and
+spills them) into `{region}_tiles/{region}.pmtiles` (parcels/pmtiles.py). A local viewer (e.g. pmtiles.io or QGIS) reads the tiles
+of its viewport straight from that single file.
+"""
+
+import glob
+import gzip
+import hashlib
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from parcels import catalog, checkpoint, pmtiles, telemetry
+from parcels.geoparquet import bbox_predicate, write_spatial_parquet
+
+MIN_ZOOM = 5
+MAX_ZOOM = 14          # viewers overzoom the last level
+BLOCK_ZOOM = 8         # zooms above this are rendered in blocks of one BLOCK_ZOOM tile each
+PARCEL_MIN_ZOOM = 13
+EXTENT = 4096          # MVT coordinate grid per tile
+BUFFER = 64            # clip buffer around each tile, in EXTENT units
+MIN_FEATURE_PX = 2
+
+WEB_MERCATOR_HALF = 20037508.342789244
+ACRE_M2 = 4046.8564224
+
+# Layer -> (first zoom, attributes); every attribute is a column of the feature file
+LAYERS = {
+    "properties": (MIN_ZOOM, ("propid", "holdid", "area_acres", "in_urban", "zip_match")),
+    "parcels": (PARCEL_MIN_ZOOM, ("fips_id", "propid", "holdid", "area_acres", "in_urban", "zip_match")),
+}
+NUMERIC = {"area_acres", "in_urban", "zip_match"}
+
+# Per-process connection of pool workers, reused across their blocks
+_WORKER = {}
+
+
+def tile_size(z):
+    return 2 * WEB_MERCATOR_HALF / (1 << z)
+
+
+def _tile_x(expr, z):
+    return f"floor(({expr} + {WEB_MERCATOR_HALF}) / {tile_size(z)})::BIGINT"
+
+
+def _tile_y(expr, z):
+    return f"floor(({WEB_MERCATOR_HALF} - {expr}) / {tile_size(z)})::BIGINT"
+
+
+def _to_web_mercator(geom):
+    return f"ST_Transform({geom}, 'EPSG:5070', 'EPSG:3857', always_xy := true)"
+
+
+def block_tasks(con, features_path):
+    """(z, block_z, bx, by) for every zoom and every block that holds features."""
+    blocks = con.execute(f"""
+        SELECT DISTINCT x.block_x, y.block_y
+        FROM read_parquet('{features_path}') f,
+             range({_tile_x("f.bbox.xmin", BLOCK_ZOOM)}, {_tile_x("f.bbox.xmax", BLOCK_ZOOM)} + 1) x(block_x),
+             range({_tile_y("f.bbox.ymax", BLOCK_ZOOM)}, {_tile_y("f.bbox.ymin", BLOCK_ZOOM)} + 1) y(block_y)
+        WHERE f.bbox.xmin IS NOT NULL;
+    """).fetchall()
+    tasks = []
+    for z in range(MIN_ZOOM, MAX_ZOOM + 1):
+        if z <= BLOCK_ZOOM:
+            shift = BLOCK_ZOOM - z
+            tasks += [(z, z, bx, by) for bx, by in sorted({(bx >> shift, by >> shift) for bx, by in blocks})]
+        else:
+            tasks += [(z, BLOCK_ZOOM, bx, by) for bx, by in sorted(blocks)]
+    return tasks
+
+
+def _layer_sql(features_path, layer, attributes, z, bz, bx, by):
+    """(tx, ty, data) of one layer's MVT for every tile at zoom z inside block (bz, bx, by)."""
+    size, pixel = tile_size(bz), tile_size(z) / EXTENT
+    grow = BUFFER * pixel
+    xmin = -WEB_MERCATOR_HALF + bx * size
+    ymax = WEB_MERCATOR_HALF - by * size
+    first_x, first_y = bx << (z - bz), by << (z - bz)
+    last_x, last_y = ((bx + 1) << (z - bz)) - 1, ((by + 1) << (z - bz)) - 1
+    columns = ", ".join(attributes)
+    feature = ", ".join(f"{c} := {c}" for c in attributes)
+    return f"""
+        SELECT tx, ty, ST_AsMVT(struct_pack({feature}, geom := mvt_geom), '{layer}', {EXTENT}, 'geom') AS data
+        FROM (
+            SELECT x.tx, y.ty, f.*,
+                   ST_AsMVTGeom(f.geom, ST_Extent(ST_TileEnvelope({z}, x.tx, y.ty)), {EXTENT}, {BUFFER}, true)
+                       AS mvt_geom
+            FROM (
+                SELECT {columns}, ST_SimplifyPreserveTopology(geom, {pixel}) AS geom, bbox
+                FROM read_parquet('{features_path}')
+                WHERE layer = '{layer}'
+                  AND {bbox_predicate(xmin - grow, ymax - size - grow, xmin + size + grow, ymax + grow)}
+                  AND greatest(bbox.xmax - bbox.xmin, bbox.ymax - bbox.ymin) >= {MIN_FEATURE_PX * pixel}
+            ) f,
+                 range(greatest({_tile_x(f"f.bbox.xmin - {grow}", z)}, {first_x}),
+                       least({_tile_x(f"f.bbox.xmax + {grow}", z)}, {last_x}) + 1) x(tx),
+                 range(greatest({_tile_y(f"f.bbox.ymax + {grow}", z)}, {first_y}),
+                       least({_tile_y(f"f.bbox.ymin - {grow}", z)}, {last_y}) + 1) y(ty)
+        )
+        WHERE mvt_geom IS NOT NULL AND NOT ST_IsEmpty(mvt_geom)
+        GROUP BY tx, ty
+    """
+
+
+def block_path(scratch_dir, number):
+    return os.path.join(scratch_dir, f"block_{number}.bin")
+
+
+def render_block(numbered_task, cfg, features_path, scratch_dir, settings, temp_root=None, con=None):
+    """
+    Render the tiles of one numbered (z, block_z, bx, by) task into `block_{number}.bin` in
+    `scratch_dir`, and their (tile_id, block, offset, length, digest) entries into
+    `index_{number}.parquet`; returns the number of tiles.
+    """
+    number, (z, bz, bx, by) = numbered_task
+    if con is None:
+        # Pool workers keep one single-threaded connection for all their blocks; the caller
+        # removes `temp_root` with every worker's spill directory once the pool is done
+        if "con" not in _WORKER:
+            temp_dir = os.path.join(temp_root, str(os.getpid()))
+            _WORKER["con"] = catalog.connect_memory(cfg.data_dir, temp_dir=temp_dir, **settings)
+        con = _WORKER["con"]
+
+    tiles = {}
+    for layer, (min_zoom, attributes) in LAYERS.items():
+        if z < min_zoom:
+            continue
+        for tx, ty, data in con.execute(_layer_sql(features_path, layer, attributes, z, bz, bx, by)).fetchall():
+            tiles.setdefault((tx, ty), []).append(bytes(data))
+
+    if not tiles:
+        return 0
+    tile_ids, offsets, lengths, digests = [], [], [], []
+    offset = 0
+    with open(block_path(scratch_dir, number), "wb") as f:
+        for (tx, ty), layers in tiles.items():
+            blob = gzip.compress(b"".join(layers), mtime=0)
+            f.write(blob)
+            tile_ids.append(pmtiles.tile_id(z, tx, ty))
+            offsets.append(offset)
+            lengths.append(len(blob))
+            digests.append(hashlib.blake2b(blob, digest_size=16).digest())
+            offset += len(blob)
+    con.execute(f"""
+        COPY (
+            SELECT UNNEST($1::UBIGINT[]) AS tile_id, {number} AS block, UNNEST($2::UBIGINT[]) AS "offset",
+                   UNNEST($3::UINTEGER[]) AS length, UNNEST($4::BLOB[]) AS digest
+        ) TO '{os.path.join(scratch_dir, f"index_{number}.parquet")}' (FORMAT parquet);
+    """, [tile_ids, offsets, lengths, digests])
+    return len(tile_ids)
+
+
+def tile_entries(con, scratch_dir, batch=100_000):
+    """(tile_id, (block, offset, length), digest) of every rendered tile in tile-id order, streamed."""
+    if not glob.glob(os.path.join(scratch_dir, "index_*.parquet")):
+        return
+    result = con.execute(f"""
+        SELECT tile_id, block, "offset", length, digest
+        FROM read_parquet('{os.path.join(scratch_dir, "index_*.parquet")}')
+        ORDER BY tile_id;
+    """)
+    while rows := result.fetchmany(batch):
+        for tid, block, offset, length, digest in rows:
+            yield tid, (block, offset, length), digest
+
+
+class _ScratchReader:
+    """Reads tiles back from the scratch files. Entries come in tile-id order, and the tiles
+    of one block are contiguous on the Hilbert curve, so one open file at a time suffices."""
+
+    def __init__(self, scratch_dir):
+        self.scratch_dir = scratch_dir
+        self.path, self.file = None, None
+
+    def __call__(self, key):
+        block, offset, length = key
+        path = block_path(self.scratch_dir, block)
+        if path != self.path:
+            self.close()
+            self.path, self.file = path, open(path, "rb")
+        self.file.seek(offset)
+        return self.file.read(length)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+        self.path, self.file = None, None
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+    catalog.attach(con, data_dir, region)
+
+    tiles_dir = cfg.path("{region}_tiles")
+    scratch_dir = os.path.join(tiles_dir, "scratch")
+    features_path = os.path.join(scratch_dir, "tile_features.parquet")
+    out_path = os.path.join(tiles_dir, f"{region}.pmtiles")
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    os.makedirs(scratch_dir)
+
+    # Step 1: every feature of both layers in EPSG:3857, Hilbert-sorted with a `bbox` column
+    print(f"🔹 Projecting properties and parcels of {region} to EPSG:3857...")
+    with telemetry.profile(con, "tile_features"):
+        telemetry.execute(con, f"""
+            CREATE OR REPLACE TABLE tile_features AS
+            SELECT 'properties' AS layer, NULL::VARCHAR AS fips_id, s.propid, s.holdid, s.area_acres,
+                   a.mean_in_urban_aw AS in_urban, a.mean_zip_match_aw AS zip_match,
+                   {_to_web_mercator("s.geom")} AS geom
+            FROM catalog.prop_shapes s
+            LEFT JOIN catalog.prop_shapes_aw a USING (propid)
+            UNION ALL
+            SELECT 'parcels', CAST(fips_id AS VARCHAR), propid, holdid, ST_Area(geom) / {ACRE_M2},
+                   in_urban, zip_match, {_to_web_mercator("geom")}
+            FROM catalog.propsholds_final_urban;
+        """)
+        write_spatial_parquet(con, "tile_features", features_path)
+    con.execute("DROP TABLE tile_features;")
+    min_lon, min_lat, max_lon, max_lat = con.execute(f"""
+        WITH extent AS (
+            SELECT MIN(bbox.xmin) AS xmin, MIN(bbox.ymin) AS ymin, MAX(bbox.xmax) AS xmax, MAX(bbox.ymax) AS ymax
+            FROM read_parquet('{features_path}')
+        )
+        SELECT ST_X(lo), ST_Y(lo), ST_X(hi), ST_Y(hi)
+        FROM (
+            SELECT ST_Transform(ST_Point(xmin, ymin), 'EPSG:3857', 'EPSG:4326', always_xy := true) AS lo,
+                   ST_Transform(ST_Point(xmax, ymax), 'EPSG:3857', 'EPSG:4326', always_xy := true) AS hi
+            FROM extent
+        );
+    """).fetchone()
+
+    # Step 2: render the blocks, lowest zooms (the largest tiles) first
+    tasks = list(enumerate(block_tasks(con, features_path)))
+    workers = cfg.pool_size(len(tasks))
+    print(f" Rendering zooms {MIN_ZOOM}-{MAX_ZOOM} in {len(tasks)} blocks on {workers} worker(s)...")
+    # Thousands of small block queries: timed by the runner rather than profiled one by one
+    if workers == 1:
+        rendered = sum(render_block(task, cfg, features_path, scratch_dir, None, con=con) for task in tasks)
+    else:
+        temp_root = os.path.join(cfg.temp_dir or cfg.data_dir, f"duckdb_temp_tiles_{os.getpid()}")
+        worker = partial(render_block, cfg=cfg, features_path=features_path, scratch_dir=scratch_dir,
+                         settings=catalog.worker_settings(workers, cfg.memory_limit, cfg.max_temp_size),
+                         temp_root=temp_root)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                rendered = sum(executor.map(worker, tasks))
+        finally:
+            shutil.rmtree(temp_root, ignore_errors=True)
+    print(f" Rendered {rendered} tiles")
+
+    # Step 3: one PMTiles archive
+    metadata = {
+        "name": f"{region} properties and parcels",
+        "format": "pbf",
+        "vector_layers": [
+            {"id": layer, "minzoom": min_zoom, "maxzoom": MAX_ZOOM,
+             "fields": {c: "Number" if c in NUMERIC else "String" for c in attributes}}
+            for layer, (min_zoom, attributes) in LAYERS.items()
+        ],
+    }
+    reader = _ScratchReader(scratch_dir)
+    with checkpoint.atomic(out_path) as tmp:
+        addressed, contents = pmtiles.write(
+            tmp, tile_entries(con, scratch_dir), reader, metadata,
+            MIN_ZOOM, MAX_ZOOM, (min_lon, min_lat, max_lon, max_lat))
+    reader.close()
+    checkpoint.mark(con, out_path, tiles=addressed)
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    print(f"✅ Wrote {addressed} tiles ({contents} distinct) to {out_path}")
@@ -0,0 +1,65 @@
+"""Collect parcel geometries into one shape per property (`prop_shapes`)."""
+
+import os
+import glob
+from parcels import catalog, spill, telemetry
+from parcels.geoparquet import write_spatial_parquet
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Define paths for input and output
+    propsholds_dir = f"{data_dir}/parquet/{region}/{region}_propsholds"
+    prop_shapes_output_dir = f"{data_dir}/parquet/{region}/{region}_prop_shapes"
+
+    # Ensure output directory exists
+    os.makedirs(prop_shapes_output_dir, exist_ok=True)
+
+    # Get list of all state-level `propsholds` Parquet files
+    propsholds_files = glob.glob(os.path.join(propsholds_dir, "propsholds_*.parquet"))
+    if not propsholds_files:
+        raise ValueError(f" No Parquet files found in {propsholds_dir}")
+    print(f" Found {len(propsholds_files)} state Parquet files. Processing entire region...")
+
+    catalog.attach(con, data_dir, region)
+
+
+    #  Step 1: Size the GROUP BY from the footers of the `propsholds` files
+    # The aggregation runs over hash partitions of `prop_code` when the region would not fit in memory
+    # (parcels/spill.py); every property lands in exactly one partition, so its shape is complete.
+    propsholds_count = catalog.view_rows(con, "propsholds")
+    print(f" Found {propsholds_count} property records.")
+    shapes_plan = spill.plan(con, "getbatches.prop_shapes", catalog.view_files(con, "propsholds"),
+                             ["propid", "holdid", "prop_code", "geom"], spill.AGGREGATE_FACTOR)
+
+    #  Step 2: Collect each property's parcels, one partition at a time
+    with telemetry.profile(con, "prop_shapes"):
+        shapes_plan.materialize(con, "prop_shapes", "prop_code", """
+            WITH collected AS (
+                SELECT 
+                    ANY_VALUE(propid) AS propid,
+                    MIN(holdid) AS holdid,
+                    ST_Collect(LIST(geom)) AS collected_geom,   -- Already GEOMETRY (GeoParquet)
+                    COUNT(geom) AS num_parcels
+                FROM catalog.propsholds
+                WHERE {where}
+                GROUP BY prop_code
+            )
+            SELECT 
+                propid,
+                holdid,
+                collected_geom AS geom,
+                CAST(ST_AREA(collected_geom) / 4046 AS NUMERIC) AS area_acres,
+                CAST(num_parcels AS INTEGER) AS num_parcels
+            FROM collected;
+        """)
+    shapes_plan.report()
+    print(f" Collected {con.execute('SELECT COUNT(*) FROM prop_shapes;').fetchone()[0]} properties into `prop_shapes`.")
+
+    #  Step 5: Save `prop_shapes` to Parquet
+    prop_shapes_parquet_path = os.path.join(prop_shapes_output_dir, f"prop_shapes_{region}.parquet")
+    write_spatial_parquet(con, "prop_shapes", prop_shapes_parquet_path)
+    print(f" `prop_shapes` saved to {prop_shapes_parquet_path}")
+
+    print(" Processing complete! `prop_shapes` data saved as a single regional Parquet file.")
@@ -0,0 +1,109 @@
+"""Group properties that share a cleaned mailing address into region-wide holdings."""
+
+import os
+import glob
+from parcels import catalog, checkpoint, spill, telemetry
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Define paths for input/output
+    props_with_groupids_dir = f"{data_dir}/parquet/{region}/{region}_props_with_groupids"
+    holdings_output_file = f"{data_dir}/parquet/{region}/{region}_holdings/holdings.parquet"
+
+    # Ensure output directory exists
+    os.makedirs(os.path.dirname(holdings_output_file), exist_ok=True)
+
+    # Get list of all Parquet files in the region
+    parquet_files = glob.glob(os.path.join(props_with_groupids_dir, "props_with_groupids_*.parquet"))
+
+    if not parquet_files:
+        raise ValueError(f" No Parquet files found in {props_with_groupids_dir}")
+
+    print(f" Found {len(parquet_files)} state Parquet files. Processing entire region...")
+
+    catalog.attach(con, data_dir, region)
+
+
+    #  Step 1: Load all state Parquet files into a single DuckDB table (only the columns matching needs)
+    print(" Loading all Parquet files into a single table...")
+
+    con.execute("""
+        CREATE OR REPLACE TABLE props_with_groupids AS 
+        SELECT fips_id, propid, fips_code, prop_code, pstl_code, mailadd
+        FROM catalog.props_with_groupids;
+    """)
+
+    con.execute("""
+        CREATE OR REPLACE TABLE fips_dict AS 
+        SELECT * FROM catalog.fips_dict;
+    """)
+
+    #  Step 5: Compute `holdid` at the **regional level** across all states
+    # Windows partition and aggregate on the integer codes; `fips_code` preserves `fips_id` order, so MIN()
+    # over codes selects the same `propid` as MIN() over the strings did. `pstl_code` is NULL for empty addresses.
+    # Each window runs over hash partitions of its PARTITION BY key when the region would not fit in memory
+    # (parcels/spill.py); rows with equal keys share a partition, so the result is the same.
+    print(" Computing holdings at the regional level...")
+    files = catalog.view_files(con, "props_with_groupids")
+
+    #  Step 5a: smallest `prop_code` sharing each mailing address
+    address_plan = spill.plan(con, "holds_match.address_window", files,
+                              ["fips_code", "prop_code", "pstl_code", "mailadd"], spill.WINDOW_FACTOR)
+    with telemetry.profile(con, "hold_codes"):
+        address_plan.materialize(con, "hold_codes", "pstl_code", """
+            SELECT 
+                fips_id, 
+                propid, 
+                fips_code,
+                prop_code,
+                CASE 
+                    WHEN pstl_code IS NOT NULL AND TRIM(mailadd) <> '' 
+                    THEN MIN(prop_code) OVER (PARTITION BY pstl_code)
+                    ELSE NULL
+                END AS hold_code        
+            FROM props_with_groupids
+            WHERE {where};
+        """)
+    address_plan.report()
+    con.execute("DROP TABLE props_with_groupids;")
+
+    #  Step 5b: smallest `hold_code` within each property, decoded back to the parcel's `fips_id`
+    property_plan = spill.plan(con, "holds_match.property_window", files,
+                               ["fips_id", "propid", "fips_code", "prop_code"], spill.WINDOW_FACTOR)
+    with telemetry.profile(con, "holdings"):
+        property_plan.materialize(con, "holdings_temp", "prop_code", """
+            WITH propid_grouping AS (
+                SELECT 
+                    fips_id,  
+                    propid, 
+                    fips_code,
+                    prop_code,
+                    MIN(hold_code) OVER (PARTITION BY prop_code) AS grouped_hold_code
+                FROM hold_codes
+                WHERE {where}
+            )
+            -- `fips_id` is unique, so no DISTINCT is needed
+            SELECT g.fips_id, g.propid, 
+                COALESCE(d.fips_id, g.propid) AS holdid,  -- Ensure no NULL holdids
+                g.fips_code,
+                g.prop_code,
+                COALESCE(g.grouped_hold_code, g.prop_code) AS hold_code
+            FROM propid_grouping g
+            LEFT JOIN fips_dict d
+            ON g.grouped_hold_code = d.fips_code;
+        """)
+    property_plan.report()
+    con.execute("DROP TABLE hold_codes;")
+
+    # Step 3: Verify holdings
+    grouped_count = con.execute("SELECT COUNT(*) FROM holdings_temp;").fetchone()[0]
+    print(f" Total records in `holdings_temp`: {grouped_count}")
+
+    # Step 4: Save Holdings Data to a single Parquet file
+    print(f" Saving regional holdings data to {holdings_output_file}...")
+    checkpoint.copy(con, "holdings_temp", holdings_output_file)
+    print(f" Regional holdings saved to {holdings_output_file}")
+
+    print(" Processing complete! Regional holdings data is now stored in a single Parquet file.")
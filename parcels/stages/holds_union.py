@@ -0,0 +1,55 @@
+"""Aggregate property shapes into per-holding area and counts (`holdings_info`)."""
+
+import os
+import glob
+from parcels import catalog, checkpoint, telemetry
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Define paths for input/output
+    prop_shapes_path = f"{data_dir}/parquet/{region}/{region}_prop_shapes/prop_shapes_{region}.parquet"
+    holdings_info_path = f"{data_dir}/parquet/{region}/{region}_holdings/holdings_info.parquet"
+
+    # Ensure output directory exists
+    os.makedirs(os.path.dirname(holdings_info_path), exist_ok=True)
+
+    catalog.attach(con, data_dir, region)
+
+    #  Step 1: Load `prop_shapes.parquet`
+    print(f" Loading property shapes from: {prop_shapes_path}")
+    con.execute("""
+        CREATE OR REPLACE TABLE prop_shapes AS 
+        SELECT * FROM catalog.prop_shapes;
+    """)
+
+    prop_shapes_count = con.execute("SELECT COUNT(*) FROM prop_shapes;").fetchone()[0]
+    print(f" Loaded {prop_shapes_count} property shape records.")
+
+    #  Step 2: Compute Holdings Information
+    print(" Aggregating holdings information...")
+
+    with telemetry.profile(con, "holdings_info"):
+        telemetry.execute(con, """
+            CREATE OR REPLACE TABLE holdings_info AS
+            SELECT
+                holdid,
+                SUM(area_acres) AS hold_area_acres,  -- Total area in acres
+                COUNT(holdid) AS numprops,          -- Number of properties per holding
+                SUM(num_parcels) AS holds_numparcels  -- Total count of parcels per holding
+            FROM prop_shapes
+            GROUP BY holdid;
+        """)
+
+    #  Step 3: Verify Holdings Data
+    holdings_count = con.execute("SELECT COUNT(*) FROM holdings_info;").fetchone()[0]
+    print(f" Total records in holdings_info: {holdings_count}")
+
+    #  Step 4: Save Holdings Info to Parquet
+    print(f" Saving holdings info to: {holdings_info_path}...")
+    checkpoint.copy(con, "holdings_info", holdings_info_path)
+
+    print(f" `holdings_info` saved successfully to {holdings_info_path}")
+
+    print(" Processing complete! `holdings_info` is now stored in a single Parquet file.")
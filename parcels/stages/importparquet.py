@@ -0,0 +1,102 @@
+"""Import the raw Regrid Parquet files of a region and partition them by state."""
+
+import os
+import glob
+from parcels import catalog
+from parcels.geoparquet import write_spatial_parquet
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    input_folder  = f"{data_dir}/parquet/{region}/parquets_projected"
+    output_folder = f"{data_dir}/parquet/{region}/parquets_partitioned"
+    os.makedirs(output_folder, exist_ok=True)
+
+    # ── Find Parquet files ─────────────────────────────────────────────────────────
+    parquet_files = glob.glob(os.path.join(input_folder, "*.parquet"))
+    if not parquet_files:
+        raise ValueError(f" No Parquet files found in {input_folder!r}")
+    print(f" Found {len(parquet_files)} Parquet files.")
+
+    # ── Connect to DuckDB ──────────────────────────────────────────────────────────
+    catalog.attach(con, data_dir, region)
+
+    # ── Load into staging, assign numeric fileid & build new fips_id ───────────────
+    print(" Loading Parquet into DuckDB, tagging files with numeric IDs…")
+    con.execute(f"""
+    CREATE OR REPLACE TABLE parquets AS
+    WITH base AS (
+      SELECT
+        *,
+        filename
+      FROM read_parquet(
+        '{input_folder}/*.parquet',
+        union_by_name := TRUE,
+        filename      := 'filename'        -- <-- use 'filename' here
+      )
+    ),
+    tagged AS (
+      SELECT
+        *,
+        -- assign a small integer ID to each distinct filename
+        DENSE_RANK() OVER (ORDER BY filename) AS fileid
+      FROM base
+    )
+    SELECT
+      ogc_fid,
+      geoid,
+      fileid,                                         -- new numeric fileid
+      -- build fips_id from your numeric fileid + ogc_fid
+      CAST(fileid AS VARCHAR) || '_' || CAST(ogc_fid AS VARCHAR) AS fips_id,
+      owntype,
+      owner,
+      mailadd,
+      mail_unit,
+      mail_city,
+      mail_state2,
+      mail_zip,
+      mail_country,
+      city,
+      county,
+      UPPER(TRIM(COALESCE(state2, '<MISSING>'))) AS state2,  -- cleaned state
+      census_zcta,
+      CAST(wkb_geometry AS GEOMETRY) AS geom
+    FROM tagged;
+    """)
+
+    # ── Diagnostics ────────────────────────────────────────────────────────────────
+    total    = con.execute("SELECT COUNT(*)            FROM parquets").fetchone()[0]
+    distinct = con.execute("SELECT COUNT(DISTINCT fips_id) FROM parquets").fetchone()[0]
+    print(f"Total rows:              {total}")
+    print(f"Distinct fips_id values: {distinct}")
+    assert total == distinct, " fips_id still not unique!"
+
+    print(" Distinct state codes and record counts:")
+    df_states = con.execute("""
+      SELECT state2, COUNT(*) AS count
+      FROM parquets
+      GROUP BY state2
+      ORDER BY state2
+    """).fetchdf()
+    print(df_states.to_string(index=False))
+
+    # ── Partitioning ───────────────────────────────────────────────────────────────
+    states = df_states["state2"].tolist()
+    # Partition names must not contain "_": the DAG reads the state off `parquets_{state}.parquet`
+    # with `dag.STATE_RE`, which stops at "_" so that `{state}` never swallows an `_urban` suffix
+    safe_states = {state.replace('<','').replace('>','').replace(' ','-'): state for state in states}
+    bad = sorted(safe for safe in safe_states if "_" in safe)
+    if bad:
+        raise ValueError(f" state2 values {bad} contain '_', which partition file names cannot hold")
+    # resuming, states whose partition was completed before the crash are not rewritten
+    todo = cfg.pending(safe_states, os.path.join(output_folder, "parquets_{state}.parquet"))
+    for safe_state in todo:
+        state = safe_states[safe_state]
+        out_path = os.path.join(output_folder, f"parquets_{safe_state}.parquet")
+        print(f"📁 Writing partition for state '{state}' → {out_path}")
+        # Hilbert-sorted with a `bbox` covering column for row-group pruning
+        write_spatial_parquet(con, f"(SELECT * FROM parquets WHERE state2 = '{state}')", out_path)
+
+    print(f" Finished writing {len(todo)} partitions under {output_folder}")
+    print(" All done!")
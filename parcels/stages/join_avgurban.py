@@ -0,0 +1,40 @@
+"""Join each property's urban share onto the region's property shapes."""
+
+from pathlib import Path
+
+from parcels import checkpoint
+
+
+def run(cfg, con):
+    region = cfg.region
+    shapes_dir = Path(cfg.path("{region}_prop_shapes"))
+    if not shapes_dir.exists():
+        print(f"[{region}] – missing folder, skipping")
+        return
+
+    urban_fp = shapes_dir / "props_urban.parquet"
+    if not urban_fp.exists():
+        print(f"[{region}] – no props_urban.parquet, skipping")
+        return
+
+    # only the region's shapes file; globbing "*.parquet" would also pick up earlier
+    # `*_with_urban` / `*_aw` outputs and join them again on every rerun
+    shapes_fp = shapes_dir / f"prop_shapes_{region}.parquet"
+    if not shapes_fp.exists():
+        print(f"[{region}] – no prop_shapes_{region}.parquet to join, skipping")
+        return
+
+    out_fp = shapes_dir / f"{shapes_fp.stem}_with_urban.parquet"
+    print(f"[{region}] joining → {shapes_fp.name}")
+
+    checkpoint.copy(con, f"""(
+          SELECT
+            s.*,
+            u.avg_inurban
+          FROM
+            parquet_scan('{shapes_fp.as_posix()}')    AS s
+          LEFT JOIN
+            parquet_scan('{urban_fp.as_posix()}')    AS u
+          USING (propid)
+        )""", out_fp.as_posix())
+    print(f"      wrote → {out_fp.name}")
@@ -0,0 +1,42 @@
+"""Join the urban flag onto every final parcel (`propsholds_final_{state}_urban.parquet`)."""
+
+from pathlib import Path
+
+from parcels import checkpoint
+
+
+def run(cfg, con):
+    region = cfg.region
+    props_dir  = Path(cfg.path("{region}_propsholds_final"))
+    census_dir = Path(cfg.path("{region}_census"))
+
+    if not props_dir.exists() or not census_dir.exists():
+        print(f"Skipping {region}: folder missing")
+        return
+
+    # skip this stage's own `_urban` outputs; `cfg.states` limits the run to stale states
+    props_fps = {fp.stem.split("_")[-1]: fp for fp in props_dir.glob("propsholds_final_*.parquet")
+                 if not fp.stem.endswith("_urban")}
+    states = cfg.pending(cfg.select(sorted(props_fps)),
+                         (props_dir / "propsholds_final_{state}_urban.parquet").as_posix())
+    for state in states:
+        props_fp = props_fps[state]
+        urban_fp = census_dir / f"{region}_{state}_urban_flag.parquet"
+
+        if not urban_fp.exists():
+            print(f"  [!] no urban flag for {region}/{state}")
+            continue
+
+        out_fp = props_fp.with_name(f"{props_fp.stem}_urban.parquet")
+        print(f"  • Processing {region}/{state}…")
+
+        # single COPY … SELECT does the join and write in one go
+        checkpoint.copy(con, f"""(
+                SELECT 
+                  p.*, 
+                  u.in_urban
+                FROM parquet_scan('{props_fp.as_posix()}') AS p
+                LEFT JOIN parquet_scan('{urban_fp.as_posix()}') AS u
+                  USING (fips_id)
+            )""", out_fp.as_posix())
+        print(f"    → wrote {out_fp.name}")
@@ -0,0 +1,83 @@
+"""Attach the regional `holdid` to each state's properties."""
+
+import os
+import glob
+from parcels import catalog, checkpoint, telemetry
+from parcels.overlap import run_states, table
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Define paths for input and output
+    props_with_groupids_dir = f"{data_dir}/parquet/{region}/{region}_props_with_groupids"
+    regional_holdings_path = f"{data_dir}/parquet/{region}/{region}_holdings/holdings.parquet"  # Single regional holdings file
+    propsholds_output_dir = f"{data_dir}/parquet/{region}/{region}_propsholds"
+
+    # Ensure output directory exists
+    os.makedirs(propsholds_output_dir, exist_ok=True)
+
+    # Get list of Parquet files to process
+    props_files = glob.glob(os.path.join(props_with_groupids_dir, "props_with_groupids_*.parquet"))
+    states = [os.path.basename(f).replace("props_with_groupids_", "").replace(".parquet", "") for f in props_files]
+    states = cfg.select(states)  # limited to `cfg.states` when set
+
+    if not states:
+        raise ValueError(f" No Parquet files found in {props_with_groupids_dir}")
+
+    print(f" Found state Parquet files: {states}")
+
+    states = cfg.pending(states, os.path.join(propsholds_output_dir, "propsholds_{state}.parquet"))
+
+    catalog.attach(con, data_dir, region)
+
+    #  Step 1: Load Regional Holdings File
+    print(f" Loading regional holdings from: {regional_holdings_path}")
+    con.execute(f"""
+        CREATE OR REPLACE TABLE holdings AS 
+        SELECT fips_code, holdid, hold_code FROM read_parquet('{regional_holdings_path}');
+    """)
+
+    holdings_count = con.execute("SELECT COUNT(*) FROM holdings;").fetchone()[0]
+    print(f" Loaded {holdings_count} regional holdings records.")
+
+    #  Step 2: Process Each State's Property Data, reading the next state and writing
+    #  the previous one while this one is joined (parcels/overlap.py)
+    def read(cur, state):
+        props_parquet_path = os.path.join(props_with_groupids_dir, f"props_with_groupids_{state}.parquet")
+        print(f" Processing {state} from: {props_parquet_path}")
+        cur.execute(f"""
+            CREATE OR REPLACE TABLE {table("props", state)} AS
+            SELECT * FROM read_parquet('{props_parquet_path}');
+        """)
+
+    def compute(cur, state):
+        # Perform Join Against Regional Holdings
+        with telemetry.profile(cur, f"propsholds_{state}"):
+            telemetry.execute(cur, f"""
+                CREATE OR REPLACE TABLE {table("propsholds", state)} AS
+                SELECT 
+                    t1.*, 
+                    COALESCE(t2.holdid, t1.propid) AS holdid,  -- Assign `propid` if `holdid` is NULL
+                    COALESCE(t2.hold_code, t1.prop_code) AS hold_code
+                FROM {table("props", state)} t1
+                LEFT JOIN holdings t2
+                ON t1.fips_code = t2.fips_code;  -- integer join key from dictencode.py
+            """)
+        cur.execute(f"DROP TABLE {table('props', state)};")
+
+        #  Step 3: Verify the Join
+        joined_count = cur.execute(f"SELECT COUNT(*) FROM {table('propsholds', state)};").fetchone()[0]
+        print(f" Total records in `propsholds` for {state}: {joined_count}")
+
+    def write(cur, state):
+        #  Step 4: Save `propsholds` to Parquet
+        propsholds_parquet_path = os.path.join(propsholds_output_dir, f"propsholds_{state}.parquet")
+        print(f" Saving joined `propsholds` data for {state} to Parquet...")
+        checkpoint.copy(cur, table("propsholds", state), propsholds_parquet_path)
+        cur.execute(f"DROP TABLE {table('propsholds', state)};")
+        print(f" `propsholds` saved to {propsholds_parquet_path}")
+
+    run_states(con, states, read, compute, write, cfg.overlap)
+
+    print(" Processing complete! `propsholds` data saved in Parquet files.")
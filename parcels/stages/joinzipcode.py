@@ -0,0 +1,76 @@
+"""Add `census_zcta` and the mailing ZIP (`pstlzip`) to each state's properties."""
+
+import os
+import glob
+from parcels import catalog, checkpoint, telemetry
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Define paths for input and output
+    propsholds_dir = f"{data_dir}/parquet/{region}/{region}_propsholds"
+    parquets_dir = f"{data_dir}/parquet/{region}/parquets_partitioned"
+    updated_propsholds_output_dir = f"{data_dir}/parquet/{region}/{region}_propsholds_updated"
+
+    # Ensure output directory exists
+    os.makedirs(updated_propsholds_output_dir, exist_ok=True)
+
+    # Get list of Parquet files to process
+    propsholds_files = glob.glob(os.path.join(propsholds_dir, "propsholds_*.parquet"))
+    states = [os.path.basename(f).replace("propsholds_", "").replace(".parquet", "") for f in propsholds_files]
+    states = cfg.select(states)  # limited to `cfg.states` when set
+
+    if not states:
+        raise ValueError(f" No Parquet files found in {propsholds_dir}")
+
+    print(f" Found state Parquet files: {states}")
+
+    states = cfg.pending(states, os.path.join(updated_propsholds_output_dir, "propsholds_{state}.parquet"))
+
+    catalog.attach(con, data_dir, region)
+
+    # Process each state's Parquet file
+    for state in states:
+        propsholds_parquet_path = os.path.join(propsholds_dir, f"propsholds_{state}.parquet")
+        parquets_parquet_path = os.path.join(parquets_dir, f"parquets_{state}.parquet")
+        updated_propsholds_parquet_path = os.path.join(updated_propsholds_output_dir, f"propsholds_{state}.parquet")
+
+        # Ensure partitioned parquet file exists
+        if not os.path.exists(parquets_parquet_path):
+            print(f"⚠ Missing Parquet file for {state}: {parquets_parquet_path}. Skipping...")
+            continue
+
+        print(f" Loading data for {state} from:")
+        print(f"    propsholds: {propsholds_parquet_path}")
+        print(f"    parquets: {parquets_parquet_path}")
+
+        #  Step 1: Perform the Join and Compute `pstlzip`
+        # Stays in DuckDB end to end so `geom` is written back as GEOMETRY rather than pandas bytes
+        print(f" Joining `propsholds` with `parquets` to add `census_zcta` and extract `pstlzip` for {state}...")
+        with telemetry.profile(con, f"propsholds_updated_{state}"):
+            telemetry.execute(con, f"""
+                CREATE OR REPLACE TABLE propsholds_updated AS
+                SELECT 
+                    a.*, 
+                    b.census_zcta,
+                    RIGHT(a.pstlclean, 5) AS pstlzip
+                FROM read_parquet('{propsholds_parquet_path}') a
+                LEFT JOIN (
+                    SELECT fips_id, census_zcta FROM read_parquet('{parquets_parquet_path}')
+                ) b
+                ON a.fips_id = b.fips_id;
+            """)
+
+        joined_count = con.execute("SELECT COUNT(*) FROM propsholds_updated;").fetchone()[0]
+        if joined_count == 0:
+            print(f" Skipping {state} due to missing data.")
+            continue
+
+        print(f" Joined {joined_count} records for {state}")
+
+        #  Step 2: Save `propsholds` to Parquet
+        checkpoint.copy(con, "propsholds_updated", updated_propsholds_parquet_path)
+        print(f" `propsholds` saved to {updated_propsholds_parquet_path}")
+
+    print(" Processing complete! Updated `propsholds` data saved as Parquet files.")
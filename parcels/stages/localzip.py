@@ -0,0 +1,91 @@
+"""Flag parcels whose mailing ZIP matches their ZCTA (`zip_match`)."""
+
+import os
+import glob
+from parcels import catalog, lookup, neighbors, telemetry
+from parcels.geoparquet import write_spatial_parquet
+from parcels.overlap import run_states, table
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Define paths
+    propsholds_updated_dir = f"{data_dir}/parquet/{region}/{region}_propsholds_updated"  #  From previous step
+    propsholds_final_dir = f"{data_dir}/parquet/{region}/{region}_propsholds_final"  #  Final output
+
+    # Ensure output directory exists
+    os.makedirs(propsholds_final_dir, exist_ok=True)
+
+    # Get list of `propsholds_updated_{state}.parquet` files
+    propsholds_files = glob.glob(os.path.join(propsholds_updated_dir, "propsholds_*.parquet"))
+    states = cfg.select(
+        os.path.basename(f).replace("propsholds_", "").replace(".parquet", "") for f in propsholds_files
+    )  # limited to `cfg.states` when set
+    propsholds_files = [os.path.join(propsholds_updated_dir, f"propsholds_{state}.parquet") for state in states]
+
+    # Debug: List all available files
+    print(f" Checking for state-based property holdings in: {propsholds_updated_dir}")
+    if propsholds_files:
+        print(f" Found {len(propsholds_files)} files.")
+        for file in propsholds_files:
+            print(f"   - {file}")  # Print each file found
+    else:
+        raise ValueError(f" No `propsholds_updated_*.parquet` files found in {propsholds_updated_dir}")
+
+    states = cfg.pending(states, os.path.join(propsholds_final_dir, "propsholds_final_{state}.parquet"),
+                         os.path.join(lookup.index_dir(propsholds_final_dir), "propsholds_index_{state}.parquet"),
+                         os.path.join(neighbors.grid_dir(propsholds_final_dir), "propsholds_grid_{state}.parquet"))
+
+    catalog.attach(con, data_dir, region)
+
+    #  Step 1: Process Each State-Based `propsholds_updated_{state}.parquet`, reading the next
+    #  state and writing the previous one while this one computes (parcels/overlap.py)
+    def read(cur, state):
+        propsholds_path = os.path.join(propsholds_updated_dir, f"propsholds_{state}.parquet")
+        print(f" Loading properties from: {propsholds_path}")
+        cur.execute(f"""
+            CREATE OR REPLACE TABLE {table("propsholds", state)} AS 
+            SELECT * FROM read_parquet('{propsholds_path}');
+        """)
+
+    def compute(cur, state):
+        #  Step 2: Compute `zip_match` Field
+        print(f" Identifying local zips for state: {state}")
+        with telemetry.profile(cur, f"propsholds_final_{state}"):
+            telemetry.execute(cur, f"""
+                CREATE OR REPLACE TABLE {table("propsholds_final", state)} AS
+                SELECT 
+                    *,
+                    CASE 
+                        WHEN pstlzip IS NULL OR census_zcta IS NULL THEN NULL
+                        WHEN pstlzip = census_zcta THEN 1
+                        ELSE 0
+                    END AS zip_match
+                FROM {table("propsholds", state)};
+            """)
+        cur.execute(f"DROP TABLE {table('propsholds', state)};")
+
+        #  Step 3: Verify ZIP Match Count
+        local_zips_count = cur.execute(
+            f"SELECT COUNT(*) FROM {table('propsholds_final', state)} WHERE zip_match = 1;"
+        ).fetchone()[0]
+        print(f" Number of local rows for {state}: {local_zips_count}")
+
+    def write(cur, state):
+        #  Step 4: Save the updated data to Parquet
+        propsholds_final_path = os.path.join(propsholds_final_dir, f"propsholds_final_{state}.parquet")
+        print(f" Saving final `propsholds_final_{state}.parquet` to: {propsholds_final_path}")
+        write_spatial_parquet(cur, table("propsholds_final", state), propsholds_final_path)
+        cur.execute(f"DROP TABLE {table('propsholds_final', state)};")
+        print(f" `propsholds_final_{state}.parquet` saved successfully.")
+
+        #  Step 5: holdid/propid -> row group index for point lookups (parcels/lookup.py)
+        #  and the grid index of parcel bounds for radius queries (parcels/neighbors.py)
+        lookup.build(cur, propsholds_final_path)
+        neighbors.build(cur, propsholds_final_path)
+        print(f" Indexed `holdid`/`propid` and parcel bounds of {state}")
+
+    run_states(con, states, read, compute, write, cfg.overlap)
+
+    print("Processing complete! Updated `propsholds` files are now stored as state-based Parquet files.")
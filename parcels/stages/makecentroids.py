@@ -0,0 +1,34 @@
+"""Centroid of every final parcel, one Parquet per state."""
+
+from pathlib import Path
+
+from parcels import checkpoint
+
+
+def run(cfg, con):
+    region = cfg.region
+    final_dir = Path(cfg.path("{region}_propsholds_final"))
+    # Output directory for centroids
+    out_dir = Path(cfg.path("{region}_centroids"))
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # The region's states come from the files present (skipping joincolumn's `_urban` outputs);
+    # `cfg.states` keeps only the stale ones under the runner
+    states = sorted(fp.stem.split("_")[-1] for fp in final_dir.glob("propsholds_final_*.parquet")
+                    if not fp.stem.endswith("_urban"))
+
+    # Loop over each state, compute and save centroids
+    for st in cfg.pending(cfg.select(states), (out_dir / f"{region}_{{state}}_centroids.parquet").as_posix()):
+        # Input Parquet
+        in_pq = final_dir / f"propsholds_final_{st}.parquet"
+        out_pq = out_dir / f"{region}_{st}_centroids.parquet"
+
+        checkpoint.copy(con, f"""(
+              SELECT
+                fips_id,
+                propid,
+                holdid,
+                ST_Centroid(geom) AS centroid
+              FROM read_parquet('{in_pq}')
+            )""", out_pq.as_posix())
+        print(f"Wrote centroids: {out_pq}")
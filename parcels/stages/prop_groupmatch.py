@@ -0,0 +1,116 @@
+"""Group matched parcels into properties (single linkage of the match pairs up to MATCH_THRESHOLD)."""
+
+import polars as pl
+import os
+import glob
+from parcels import catalog, checkpoint, linkage, telemetry
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Define input/output paths
+    match_pairs_dir = f"{data_dir}/parquet/{region}/{region}_match_pairs/"
+    encoded_dir = f"{data_dir}/parquet/{region}/parquets_encoded/"
+    output_dir = f"{data_dir}/parquet/{region}/{region}_props_with_groupids"
+    linkage_dir = f"{data_dir}/parquet/{region}/{region}_linkage"
+
+    # Ensure output directories exist
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(linkage_dir, exist_ok=True)
+
+    if cfg.match_threshold > cfg.match_radius:
+        raise ValueError(f" MATCH_THRESHOLD {cfg.match_threshold} exceeds MATCH_RADIUS {cfg.match_radius}; "
+                         "prop_match2 kept no pairs beyond the radius")
+
+    # Get list of Parquet files
+    match_pairs_files = glob.glob(os.path.join(match_pairs_dir, "match_pairs_*.parquet"))
+    states = [os.path.basename(f).replace("match_pairs_", "").replace(".parquet", "") for f in match_pairs_files]
+    states = cfg.select(states)  # limited to `cfg.states` when set
+
+    if not states:
+        raise ValueError(f" No match pair files found in {match_pairs_dir}")
+
+    print(f" Found match pairs for states: {states}")
+
+    states = cfg.pending(states, os.path.join(output_dir, "props_with_groupids_{state}.parquet"),
+                         os.path.join(linkage_dir, "linkage_{state}.parquet"))
+
+    catalog.attach(con, data_dir, region)
+
+
+    @telemetry.timed
+    def group_components(match_pairs):
+        """Single-linkage forest of the (id1, id2, distance) pairs and, from it, every `fips_code` joined
+        within the threshold mapped to the smallest code of its property."""
+        forest = linkage.spanning_forest(match_pairs)
+        return forest, linkage.components(forest, cfg.match_threshold)
+
+
+    # Process each state separately
+    for state in states:
+        match_pairs_parquet = os.path.join(match_pairs_dir, f"match_pairs_{state}.parquet")
+        encoded_parquet = os.path.join(encoded_dir, f"encodedpstl_{state}.parquet")
+        output_parquet = os.path.join(output_dir, f"props_with_groupids_{state}.parquet")
+        linkage_parquet = os.path.join(linkage_dir, f"linkage_{state}.parquet")
+
+        print(f" Processing state: {state}")
+
+        # Load match pairs sorted by distance (ties broken by code, so the forest is reproducible)
+        match_pairs = con.execute(f"""
+            SELECT id1, id2, distance FROM read_parquet('{match_pairs_parquet}')
+            ORDER BY distance, id1, id2;
+        """).fetchall()
+
+        if not match_pairs:
+            print(f"⚠ No match pairs found for {state}. Skipping...")
+            continue
+
+        # Create property groups from the pairs within `match_threshold` (nodes are integer `fips_code`s)
+        forest, groups = group_components(match_pairs)
+
+        # Keep the whole forest, so other thresholds up to the radius need no rematching (parcels/linkage.py)
+        forest_df = pl.DataFrame(forest, schema=["id1", "id2", "distance"], orient="row")
+        con.register("forest_df", forest_df.to_pandas())
+        checkpoint.copy(con, "(SELECT * FROM forest_df ORDER BY distance, id1, id2)", linkage_parquet)
+        con.unregister("forest_df")
+
+        # Convert groups dictionary to a Polars DataFrame
+        groups_df = pl.DataFrame({"id": list(groups.keys()), "groupid": list(groups.values())})
+
+        print(f" Generated {len(groups_df)} property groups for {state} at {cfg.match_threshold:g} m "
+              f"({len(forest)} linkage edges up to {cfg.match_radius:g} m).")
+
+        # Register Polars DataFrame into DuckDB
+        con.register("groups_df", groups_df.to_pandas())  # Convert Polars DataFrame to Pandas for DuckDB
+
+        # Load encoded data into DuckDB
+        con.execute(f"""
+            CREATE OR REPLACE TABLE cleaned_pstl AS 
+            SELECT * FROM read_parquet('{encoded_parquet}');
+        """)
+
+        # **Join and Save Results**
+        # `groupid` is the smallest `fips_code` in the component; decode it back to that parcel's `fips_id`
+        con.execute("DROP TABLE IF EXISTS props_with_groupids;")
+        with telemetry.profile(con, f"groupids_{state}"):
+            telemetry.execute(con, """
+                CREATE TABLE props_with_groupids AS
+                SELECT a.*, CAST(d.fips_id AS TEXT) AS propid, b.groupid AS prop_code
+                FROM cleaned_pstl a
+                LEFT JOIN groups_df b
+                ON a.fips_code = b.id
+                LEFT JOIN (SELECT fips_code, fips_id FROM cleaned_pstl) d
+                ON b.groupid = d.fips_code
+                WHERE a.state2 = ?;
+            """, [state])
+
+        # Verify DuckDB table
+        grouped_count = con.execute("SELECT COUNT(*) FROM props_with_groupids;").fetchone()[0]
+
+        # **Save results to Parquet using DuckDB**
+        checkpoint.copy(con, "props_with_groupids", output_parquet)
+
+        print(f"📁 Saved grouped data to {output_parquet}")
+
+    print(" Processing complete! Grouped data is now stored in Parquet files.")
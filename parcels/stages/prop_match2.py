@@ -0,0 +1,148 @@
+"""
+Candidate match pairs (same owner or mailing address within MATCH_RADIUS) with distances, one state per worker.
+
+With OWNER_SIMILARITY set, owners whose normalized token sets are at least that similar also pair
+(parcels/minhash.py); every pair carries its owner `similarity` (1.0 for exact pairs).
+"""
+
+import os
+import glob
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from parcels import catalog, checkpoint, minhash, spill, telemetry
+
+def process_match_pairs(state, encoded_dir, output_dir, owner_dict_path, cfg, current_owner_code, settings,
+                        con=None):
+    # 1) New connection per process, one thread per worker and its share of memory/spill
+    #    (inline, with a single worker, the caller's connection is reused)
+    # 2) state‑specific temp dir
+    own_con = con is None
+    if own_con:
+        temp_dir = os.path.join(cfg.temp_dir or cfg.data_dir, f"duckdb_temp_match_{state}")
+        con = catalog.connect_memory(cfg.data_dir, temp_dir=temp_dir, **settings)
+
+    # 3) Paths
+    input_parquet  = os.path.join(encoded_dir,     f"encodedpstl_{state}.parquet")
+    output_parquet = os.path.join(output_dir,      f"match_pairs_{state}.parquet")
+
+    # 4) Run your SQL — joins run on the integer codes from dictencode.py
+    con.execute(f"""
+        CREATE OR REPLACE TABLE cleaned_pstl AS 
+        SELECT fips_code, owner_code, pstl_code, mailadd, state2,
+               geom
+          FROM read_parquet('{input_parquet}');
+    """)
+    # Both self-joins are split into hash partitions of their join key when the state would not fit in
+    # memory (parcels/spill.py); both sides of a partition hold the same keys, so no pair is lost.
+    join_plan = spill.plan(con, f"prop_match2.self_join_{state}", [input_parquet],
+                           ["fips_code", "owner_code", "pstl_code", "mailadd", "state2", "geom"],
+                           spill.HASH_JOIN_FACTOR)
+    # Pairs up to the radius carry their distance; prop_groupmatch picks the threshold (parcels/linkage.py)
+    # owner matches (NULL owners have no code; 'CURRENT OWNER' is excluded by its code)
+    start = time.perf_counter()
+    with telemetry.profile(con, f"match_owner_{state}"):
+        join_plan.materialize(con, "match_pairs_owner", "owner_code", """
+            SELECT a.fips_code AS id1, b.fips_code AS id2, ST_Distance(a.geom, b.geom) AS distance
+              FROM (SELECT * FROM cleaned_pstl WHERE {where}) a
+              JOIN (SELECT * FROM cleaned_pstl WHERE {where}) b
+                ON a.owner_code = b.owner_code
+               AND a.owner_code IS DISTINCT FROM ?
+               AND a.fips_code < b.fips_code
+             WHERE a.state2 = ? AND b.state2 = ?
+               AND ST_DWithin(a.geom, b.geom, ?);
+        """, [current_owner_code, state, state, cfg.match_radius])
+    exact_seconds = time.perf_counter() - start
+    # fuzzy owner matches: extra pairs between different owner codes, timed against the exact join above
+    if cfg.owner_similarity is not None:
+        start = time.perf_counter()
+        with telemetry.profile(con, f"match_owner_fuzzy_{state}"):
+            stats = minhash.fuzzy_owner_pairs(con, "cleaned_pstl", state, owner_dict_path, cfg.match_radius,
+                                              cfg.owner_similarity, current_owner_code)
+        fuzzy_seconds = time.perf_counter() - start
+        print(f" {state}: {stats['pairs']} fuzzy owner pairs from {stats['owner_pairs']} of "
+              f"{stats['candidates']} candidate owner pairs ({stats['owners']} owners, "
+              f"{stats['oversized_blocks']} oversized blocks skipped) in {fuzzy_seconds:.1f}s "
+              f"(exact owner join {exact_seconds:.1f}s)")
+        telemetry.event("fuzzy_owner_match", state=state, threshold=cfg.owner_similarity,
+                        seconds=fuzzy_seconds, exact_seconds=exact_seconds, **stats)
+    # address matches (empty `pstlclean` has no code, so NULL codes never join)
+    with telemetry.profile(con, f"match_address_{state}"):
+        join_plan.materialize(con, "match_pairs_address", "pstl_code", """
+            SELECT a.fips_code AS id1, b.fips_code AS id2, ST_Distance(a.geom, b.geom) AS distance
+              FROM (SELECT * FROM cleaned_pstl WHERE {where}) a
+              JOIN (SELECT * FROM cleaned_pstl WHERE {where}) b
+                ON a.pstl_code = b.pstl_code
+               AND a.mailadd  <> ''
+               AND b.mailadd  <> ''
+               AND a.fips_code < b.fips_code
+             WHERE a.state2 = ? AND b.state2 = ?
+               AND ST_DWithin(a.geom, b.geom, ?);
+        """, [state, state, cfg.match_radius])
+    join_plan.report()
+    # union & write
+    con.execute("DROP TABLE IF EXISTS match_pairs_p;")
+    con.execute("CREATE TABLE match_pairs_p AS SELECT *, 1.0::DOUBLE AS similarity FROM match_pairs_owner;")
+    con.execute("INSERT INTO match_pairs_p SELECT *, 1.0 FROM match_pairs_address;")
+    if cfg.owner_similarity is not None:
+        con.execute("INSERT INTO match_pairs_p SELECT * FROM match_pairs_owner_fuzzy;")
+    checkpoint.copy(con, "match_pairs_p", output_parquet)
+
+    count = con.execute("SELECT COUNT(*) FROM match_pairs_p").fetchone()[0]
+    print(f" {state}: wrote {count} pairs → {output_parquet}")
+    if own_con:
+        con.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        telemetry.flush()  # pool workers exit without running atexit handlers
+    return state
+
+def run(cfg, con):
+    encoded_dir      = cfg.path("parquets_encoded")
+    owner_dict_path  = cfg.path("{region}_dictionary", "owner_dict.parquet")
+    output_dir       = cfg.path("{region}_match_pairs")
+    os.makedirs(output_dir, exist_ok=True)
+
+    # all states
+    parquet_files = glob.glob(os.path.join(encoded_dir, "encodedpstl_*.parquet"))
+    all_states = [os.path.basename(f).split("_")[1].split(".")[0] for f in parquet_files]
+
+    if cfg.states is not None:
+        # the DAG runner names the stale states explicitly; rerun them even if output exists
+        to_run = cfg.select(all_states)
+    else:
+        # skip already done (outputs cut short or changed since their completion marker are redone)
+        done = {os.path.basename(f).split("_")[2].split(".")[0]
+                for f in glob.glob(os.path.join(output_dir, "match_pairs_*.parquet")) if checkpoint.intact(f)}
+        to_run = [s for s in all_states if s not in done]
+
+    if not to_run:
+        print(" All states processed!")
+        return
+
+    # code of the placeholder owner that must never match (None if absent)
+    current_owner_code = con.execute(f"""
+        SELECT MIN(owner_code) FROM read_parquet('{owner_dict_path}') WHERE owner = 'CURRENT OWNER'
+    """).fetchone()[0]
+
+    print(f" Parallelizing match_pairs for: {to_run}")
+    # pool size and per-worker limits follow the share assigned by the DAG runner, if any
+    workers = cfg.pool_size(len(to_run))
+
+    # bind the extra args
+    worker = partial(process_match_pairs,
+                     encoded_dir=encoded_dir,
+                     output_dir=output_dir,
+                     owner_dict_path=owner_dict_path,
+                     cfg=cfg,
+                     current_owner_code=current_owner_code,
+                     settings=catalog.worker_settings(workers, cfg.memory_limit, cfg.max_temp_size))
+
+    if workers == 1:
+        results = [worker(state, con=con) for state in to_run]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as exe:
+            results = list(exe.map(worker, to_run))
+
+    print(" Done:", results)
@@ -0,0 +1,67 @@
+"""Give parcels without a property group their own `fips_id` as `propid`."""
+
+import os
+import glob
+from parcels import catalog, checkpoint
+from parcels.overlap import run_states, table
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+
+    # Define paths for input/output
+    props_with_groupids_dir = f"{data_dir}/parquet/{region}/{region}_props_with_groupids"
+
+    # Ensure the directory exists
+    os.makedirs(props_with_groupids_dir, exist_ok=True)
+
+    # Get list of Parquet files
+    parquet_files = glob.glob(os.path.join(props_with_groupids_dir, "props_with_groupids_*.parquet"))
+    states = [os.path.basename(f).replace("props_with_groupids_", "").replace(".parquet", "") for f in parquet_files]
+    states = cfg.select(states)  # limited to `cfg.states` when set
+
+    if not states:
+        raise ValueError(f" No Parquet files found in {props_with_groupids_dir}")
+
+    print(f" Found state Parquet files: {states}")
+
+    catalog.attach(con, data_dir, region)
+
+    # Process each state's Parquet file, reading the next state and writing the previous
+    # one while this one is updated (parcels/overlap.py)
+    def parquet_path(state):
+        return os.path.join(props_with_groupids_dir, f"props_with_groupids_{state}.parquet")
+
+    def read(cur, state):
+        print(f" Processing {state} from {parquet_path(state)}")
+
+        # Load Parquet into DuckDB
+        cur.execute(f"""
+            CREATE OR REPLACE TABLE {table("props_with_groupids", state)} AS 
+            SELECT * FROM read_parquet('{parquet_path(state)}');
+        """)
+
+    def compute(cur, state):
+        #  Directly update `propid`, do NOT create `propid_fixed`
+        cur.execute(f"""
+            UPDATE {table("props_with_groupids", state)}
+            SET propid = fips_id, prop_code = fips_code
+            WHERE propid IS NULL OR TRIM(propid) = '';
+        """)
+
+        # Verify updates
+        updated_count = cur.execute(
+            f"SELECT COUNT(*) FROM {table('props_with_groupids', state)} WHERE propid = fips_id;"
+        ).fetchone()[0]
+        print(f" Updated {updated_count} rows where `propid` was NULL for {state}.")
+
+    def write(cur, state):
+        #  Replace the input file; the rename only happens once the new file is complete
+        checkpoint.copy(cur, table("props_with_groupids", state), parquet_path(state))
+        cur.execute(f"DROP TABLE {table('props_with_groupids', state)};")
+
+        print(f" Overwritten updated Parquet file: {parquet_path(state)}")
+
+    run_states(con, states, read, compute, write, cfg.overlap)
+
+    print(" Processing complete! Updated Parquet files now include corrected `propid` values.")
@@ -0,0 +1,24 @@
+"""Share of urban parcels per property."""
+
+from pathlib import Path
+
+from parcels import checkpoint
+
+
+def run(cfg, con):
+    region = cfg.region
+    # `in_urban` only exists in the `joincolumn` outputs
+    in_glob = Path(cfg.path("{region}_propsholds_final", "propsholds_final_*_urban.parquet"))
+    out_dir = Path(cfg.path("{region}_prop_shapes"))
+    out_dir.mkdir(exist_ok=True)  # create if missing
+    out_fp  = out_dir / "props_urban.parquet"
+
+    print(f"[{region}] scanning → {in_glob}")
+    checkpoint.copy(con, f"""(
+          SELECT
+            propid,
+            AVG(in_urban) AS avg_inurban
+          FROM parquet_scan('{in_glob.as_posix()}')
+          GROUP BY propid
+        )""", out_fp.as_posix())
+    print(f"[{region}] wrote → {out_fp.relative_to(cfg.region_dir)}")
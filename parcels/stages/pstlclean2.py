@@ -0,0 +1,161 @@
+"""Clean and normalise the postal address of every parcel, one state per worker."""
+
+import os
+import re
+import glob
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from parcels import catalog, checkpoint, telemetry
+
+# Define cleaning functions (same as before); @telemetry.timed is a no-op outside runner-instrumented runs
+@telemetry.timed
+def remove_commas(address):
+    return re.sub(r'[,]+', ' ', address)
+
+@telemetry.timed
+def expand_abbreviations(address):
+    replacements = {
+        r'\bST\b': 'STREET',
+        r'\bRD\b': 'ROAD',
+        r'\bAVE\b': 'AVENUE',
+        r'\bAV\b': 'AVENUE',
+        r'\bDR\b': 'DRIVE',
+        r'\bN\b': 'NORTH',
+        r'\bS\b': 'SOUTH',
+        r'\bE\b': 'EAST',
+        r'\bW\b': 'WEST',
+        r'\bHWY\b': 'HIGHWAY',
+        r'\bLN\b': 'LANE',
+        r'\bCT\b': 'COURT',
+        r'\bCIR\b': 'CIRCLE',
+        r'\bSTE\b': 'SUITE',
+        r'\bPL\b': 'PLACE',
+        r'\bBLVD\b': 'BOULEVARD',
+        r'\bTR\b': 'TRAIL'
+    }
+    for pattern, replacement in replacements.items():
+        address = re.sub(pattern, replacement, address, flags=re.IGNORECASE)
+    return address
+
+
+@telemetry.timed
+def standardize_whitespace(address):
+    return re.sub(r'\s+', ' ', address).strip()
+
+
+@telemetry.timed
+def extract_zip(address):
+    parts = address.split()
+    if parts and re.match(r'\d{5}(-\d{4})?', parts[-1]):
+        parts[-1] = parts[-1][:5]  # Keep only the first 5 digits
+    return ' '.join(parts)
+
+
+@telemetry.timed
+def remove_special_characters(address):
+    return re.sub(r'[^a-zA-Z0-9\s]', '', address)
+
+
+@telemetry.timed
+def remove_all_spaces(address):
+    return re.sub(r'\s+', '', address)
+
+
+@telemetry.timed
+def to_uppercase(address):
+    return address.upper()
+
+
+# Worker function to process a single state
+def process_state(state, cfg, settings, con=None):
+    input_folder = cfg.path("parquets_concat")
+    output_folder = cfg.path("parquets_cleaned")
+    own_con = con is None
+    try:
+        # Each process creates its own DuckDB connection and initializes spatial extension.
+        # Limit threads per process to 1 to avoid nested parallelism, split the memory/spill
+        # limits across the pool, and use a state-specific temp directory to avoid clashes.
+        # Run inline (one worker), the caller's connection is reused instead.
+        if own_con:
+            temp_dir = os.path.join(cfg.temp_dir or cfg.data_dir, f"duckdb_temp_{state}")
+            con = catalog.connect_memory(cfg.data_dir, temp_dir=temp_dir, **settings)
+
+        input_parquet = os.path.join(input_folder, f"concatpstl_{state}.parquet")
+        output_parquet = os.path.join(output_folder, f"cleanedpstl_{state}.parquet")
+
+        print(f"🔹 Processing state: {state}")
+
+        # Only the distinct addresses go through Python; geometry stays inside DuckDB
+        addresses = con.execute(f"""
+            SELECT DISTINCT pstladress FROM read_parquet('{input_parquet}')
+        """).fetchdf()
+
+        # Apply cleaning functions to 'pstladress'
+        # Note: Using chained .apply calls as in the original code.
+        addresses['pstlclean'] = (
+            addresses['pstladress']
+            .fillna('')
+            .apply(remove_commas)
+            .apply(expand_abbreviations)
+            .apply(standardize_whitespace)
+            .apply(extract_zip)
+            .apply(remove_special_characters)
+            .apply(remove_all_spaces)
+            .apply(to_uppercase)
+        )
+        con.register("addresses", addresses)
+
+        # Join the cleaned addresses back, preserving all original columns and the GEOMETRY type of `geom`
+        with telemetry.profile(con, f"cleaned_{state}"):
+            checkpoint.copy(con, f"""(
+                    SELECT c.*, a.pstlclean
+                    FROM read_parquet('{input_parquet}') c
+                    LEFT JOIN addresses a
+                    ON c.pstladress IS NOT DISTINCT FROM a.pstladress
+                )""", output_parquet)
+        if own_con:
+            con.close()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            telemetry.flush()  # pool workers exit without running atexit handlers
+        else:
+            con.unregister("addresses")
+        print(f" Saved cleaned data to {output_parquet} for state {state}")
+        return state
+    except Exception as e:
+        print(f"Error processing state {state}: {e}")
+        raise
+
+
+def run(cfg, con):
+    input_folder = cfg.path("parquets_concat")
+    output_folder = cfg.path("parquets_cleaned")
+
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Create your list of states from parquet_files as before.
+    parquet_files = glob.glob(os.path.join(input_folder, "concatpstl_*.parquet"))
+    states = [os.path.basename(f).replace("concatpstl_", "").replace(".parquet", "") for f in parquet_files]
+    states = cfg.select(states)  # `cfg.states` limits the run to stale states (see parcels/dag.py)
+
+    if not states:
+        raise ValueError(f" No Parquet state files found in {input_folder}")
+
+    print(f" Found Parquet files for states: {states}")
+
+    states = cfg.pending(states, os.path.join(output_folder, "cleanedpstl_{state}.parquet"))
+    if not states:
+        return
+
+    # Pool size and per-worker limits follow the share assigned by the DAG runner, if any
+    workers = cfg.pool_size(len(states))
+    if workers == 1:
+        results = [process_state(state, cfg, None, con) for state in states]
+    else:
+        worker = partial(process_state, cfg=cfg,
+                         settings=catalog.worker_settings(workers, cfg.memory_limit, cfg.max_temp_size))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(worker, states))
+
+    print(" Processing complete! Processed states:", results)
@@ -0,0 +1,22 @@
+"""
+Trigram search index over the `owner` and `pstlclean` vocabularies of the region.
+
+The index is built from the dictencode dictionaries, one row per distinct value,
+and holds only values still present in `propsholds_final` (see parcels/search.py
+for the layout). `python -m parcels.search` queries it. Outputs go to
+`{region}_search/`.
+"""
+
+from parcels import catalog, search, telemetry
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+    catalog.attach(con, data_dir, region)
+
+    print(f"🔹 Building the trigram search index of {region}")
+    with telemetry.profile(con, "search_index"):
+        terms = search.build(con, data_dir, region)
+    for field, n in terms:
+        print(f" {field}: {n} distinct values indexed")
+    print(f"✅ Search index saved to {search.search_dir(data_dir, region)}")
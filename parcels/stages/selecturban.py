@@ -0,0 +1,57 @@
+"""Flag parcel centroids that fall inside a census urban area."""
+
+import os
+import glob
+
+from parcels import checkpoint
+
+
+def run(cfg, con):
+    region = cfg.region
+
+    # === urban load (GeoParquet, read as GEOMETRY) ===
+    con.execute(f"""
+    CREATE OR REPLACE TABLE urban AS
+    SELECT
+      ST_Multi(geom) AS geom
+    FROM parquet_scan('{cfg.urban_parquet}');
+    """)
+
+    print(f"Processing region: {region}")
+    out_dir = cfg.path("{region}_census")
+    os.makedirs(out_dir, exist_ok=True)
+
+    cent_pattern = cfg.path(
+        "{region}_centroids",             # e.g. midwest_centroids
+        "{region}_*_centroids.parquet"    # e.g. midwest_IA_centroids.parquet
+    )
+    files = glob.glob(cent_pattern)
+    states = cfg.select(sorted(os.path.basename(f).split('_')[1] for f in files))
+    states = cfg.pending(states, os.path.join(out_dir, f"{region}_{{state}}_urban_flag.parquet"))
+    files = [f for f in files if os.path.basename(f).split('_')[1] in states]
+    print(f"  → Found {len(files)} centroid files")
+
+    for cent_path in files:
+        state = os.path.basename(cent_path).split('_')[1]
+        print(f"    • Flagging {region}/{state}")
+
+        out_path = os.path.join(out_dir, f"{region}_{state}_urban_flag.parquet")
+
+        con.execute(f"""
+        CREATE OR REPLACE TABLE tmp_flags AS
+        SELECT
+          c.fips_id,
+          MAX(CASE WHEN ST_Intersects(c.geom, u.geom) THEN 1 ELSE 0 END) AS in_urban
+        FROM (
+          SELECT
+            fips_id,
+            centroid AS geom           -- use the GEOMETRY column directly
+          FROM parquet_scan('{cent_path}')
+        ) AS c
+        LEFT JOIN urban AS u
+          ON ST_Intersects(c.geom, u.geom)
+        GROUP BY c.fips_id;
+        """)
+
+        checkpoint.copy(con, "tmp_flags", out_path)
+        print(f"      ✔ Wrote {out_path}")
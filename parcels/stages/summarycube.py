@@ -0,0 +1,229 @@
+"""
+County/state/region summary CSVs of properties and holdings from one summary cube.
+
+Step 1 reduces the parcels of each state to one row per property
+(`{region}_summary/summary_props_{state}.parquet`). Each row holds the
+property's holdid, main county, state, area-weighted `zip_match` and
+`in_urban` shares (from `prop_shapes_aw`), parcel count and area. Step 2
+rolls those rows up into one row per holding (`summary_holdings.parquet`).
+The holding is placed in the county and state of its largest property, and
+its bbox dispersion is attached. Step 3 is a single GROUPING SETS scan over
+both views. It writes the additive partial aggregates (SUM and COUNT of every
+measure) of each (view, state, county) and (view, state) to
+`summary_cube.parquet`. Region rows are sums of the state rows, and every
+average in the CSVs is a ratio of those sums.
+
+Every cube row belongs to one state. With STATES set, only those states'
+parcels are rescanned. In the holdid view, the states of the holdings that
+touch them are also regrouped. Their cube rows are replaced and the rest of
+the cube is kept, so recomputing one state does not reread the region.
+
+The unit of each CSV row is the view's: in the holdid CSVs `prop_count` is the
+number of holdings placed in the county or state (kept under its historical
+name) and the averages are over holdings, e.g. `avg_area_acres` is the mean
+total area of those holdings. The holdid CSVs published before the cube
+counted another unit, with more rows than the county has properties (capitol,
+CT: 2,458,990 against 341,649 properties), so they do not compare with these.
+"""
+
+import os
+
+from parcels import catalog, checkpoint, telemetry
+
+# Additive measures of the cube: `{m}_sum` and `{m}_n` are stored for each
+MEASURES = ("zip_match", "in_urban", "parcels", "area_acres", "dispersion_km")
+
+
+def _avg(measure):
+    """Average of a measure over a group of cube rows, rounded as in the published CSVs."""
+    return f"ROUND(SUM({measure}_sum) / NULLIF(SUM({measure}_n), 0), 3)"
+
+
+LEVEL_COLUMNS = f"""
+    {_avg("zip_match")} AS avg_zip_match_by_county,
+    {_avg("in_urban")} AS avg_in_urban_by_county,
+    {_avg("parcels")} AS avg_parcels_prop_by_county,
+    SUM(units) AS prop_count,
+    {_avg("area_acres")} AS avg_area_acres
+"""
+
+CSV_OPTIONS = "FORMAT csv, HEADER, DELIMITER ','"
+
+# County and state CSVs: level -> (keys, file name per view); the state CSV of the
+# property view keeps its historical `_properties` suffix
+LEVEL_CSVS = {
+    "county": ("county, state2", {"propid": "{region}_county_summary_propid.csv",
+                                  "holdid": "{region}_county_summary_holdid.csv"}),
+    "state": ("state2", {"propid": "{region}_state_summary_properties.csv",
+                         "holdid": "{region}_state_summary_holdid.csv"}),
+}
+
+REGION_COLUMNS = {
+    "propid": f"""
+        {_avg("area_acres")} AS avg_area_acres,
+        {_avg("zip_match")} AS avg_zip_match,
+        {_avg("in_urban")} AS avg_in_urban,
+        {_avg("parcels")} AS avg_parcels_per_propid
+    """,
+    "holdid": f"""
+        {_avg("dispersion_km")} AS avg_dispersion_km,
+        {_avg("zip_match")} AS avg_zip_match,
+        {_avg("in_urban")} AS avg_in_urban,
+        {_avg("area_acres")} AS avg_area_acres,
+        {_avg("parcels")} AS avg_parcels_per_holdid
+    """,
+}
+
+
+def _state_of(path):
+    return os.path.basename(path).replace("propsholds_final_", "").replace(".parquet", "")
+
+
+def _states_sql(states):
+    return "(" + (", ".join(f"'{s}'" for s in sorted(states)) or "NULL") + ")"
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+    catalog.attach(con, data_dir, region)
+
+    summary_dir = cfg.path("{region}_summary")
+    props_path = os.path.join(summary_dir, "summary_props_{state}.parquet")
+    holdings_path = os.path.join(summary_dir, "summary_holdings.parquet")
+    cube_path = os.path.join(summary_dir, "summary_cube.parquet")
+    csv_dir = os.path.join(data_dir, "csvs")
+    os.makedirs(summary_dir, exist_ok=True)
+
+    # `in_urban` only exists in the `joincolumn` outputs; fall back to the base files without it
+    files = catalog.stage_files(data_dir, region, "propsholds_final_urban")
+    by_state = {_state_of(f).replace("_urban", ""): f for f in files}
+    if not by_state:
+        by_state = {_state_of(f): f for f in catalog.stage_files(data_dir, region, "propsholds_final")}
+    if not by_state:
+        raise ValueError(f" No propsholds_final files found for {region}")
+
+    all_states = sorted(by_state)
+    incremental = cfg.states is not None and os.path.exists(cube_path)
+    states = cfg.select(all_states) if incremental else all_states
+    if not states:
+        raise ValueError(f" None of STATES={cfg.states} has propsholds_final files in {region}")
+    print(f"🔹 Summary cube for {region}: {'updating ' + ', '.join(states) if incremental else 'all states'}")
+
+    # Cube rows are keyed by the `state2` values, files by their partition name (see importparquet.py)
+    prop_states = set()
+    if incremental:
+        old_files = [props_path.format(state=s) for s in states if os.path.exists(props_path.format(state=s))]
+        if old_files:
+            prop_states |= {row[0] for row in con.execute(
+                f"SELECT DISTINCT state2 FROM read_parquet({catalog.file_list(old_files)});").fetchall()}
+
+    # Step 1: one row per property of the rescanned states, in one pass over their parcels
+    with telemetry.profile(con, "summary_props"):
+        telemetry.execute(con, f"""
+            CREATE OR REPLACE TABLE summary_props AS
+            SELECT p.propid, p.holdid, p.county, p.state2, p.part,
+                   s.mean_zip_match_aw AS zip_match, s.mean_in_urban_aw AS in_urban,
+                   s.num_parcels AS parcels, s.area_acres
+            FROM (
+                SELECT propid, ANY_VALUE(holdid) AS holdid, mode(county) AS county, mode(state2) AS state2,
+                       regexp_extract(ANY_VALUE(filename), 'propsholds_final_([^_/.]+)[^/]*$', 1) AS part
+                FROM read_parquet({catalog.file_list([by_state[s] for s in states])}, filename = true)
+                WHERE propid IS NOT NULL
+                GROUP BY propid
+            ) p
+            LEFT JOIN catalog.prop_shapes_aw s USING (propid);
+        """)
+    for state in states:
+        checkpoint.copy(con, f"(SELECT * EXCLUDE (part) FROM summary_props WHERE part = '{state}')",
+                        props_path.format(state=state))
+    prop_states |= {row[0] for row in con.execute("SELECT DISTINCT state2 FROM summary_props;").fetchall()}
+    prop_states.discard(None)
+
+    # Step 2: holdings from the property rows of every state (the props files, not the parcels)
+    prop_files = [props_path.format(state=s) for s in all_states if os.path.exists(props_path.format(state=s))]
+    old_states = []
+    if incremental and os.path.exists(holdings_path):
+        # states the holdings touching the rescanned states were placed in before this update
+        old_states = [row[0] for row in con.execute(f"""
+            SELECT DISTINCT h.state2 FROM read_parquet('{holdings_path}') h
+            SEMI JOIN summary_props p ON h.holdid = p.holdid;
+        """).fetchall()]
+    with telemetry.profile(con, "summary_holdings"):
+        telemetry.execute(con, f"""
+            CREATE OR REPLACE TABLE summary_holdings AS
+            SELECT h.holdid, h.home.county AS county, h.home.state2 AS state2,
+                   h.zip_match, h.in_urban, h.parcels, h.area_acres, d.bbox_diagonal_km AS dispersion_km
+            FROM (
+                SELECT holdid,
+                       arg_max(struct_pack(county, state2), struct_pack(area_acres, propid)) AS home,
+                       SUM(zip_match * area_acres) / NULLIF(SUM(area_acres) FILTER (zip_match IS NOT NULL), 0)
+                           AS zip_match,
+                       SUM(in_urban * area_acres) / NULLIF(SUM(area_acres) FILTER (in_urban IS NOT NULL), 0)
+                           AS in_urban,
+                       SUM(parcels) AS parcels,
+                       SUM(area_acres) AS area_acres
+                FROM read_parquet({catalog.file_list(prop_files)})
+                WHERE holdid IS NOT NULL
+                GROUP BY holdid
+            ) h
+            LEFT JOIN catalog.holds_dispersion d USING (holdid);
+        """)
+    new_states = [row[0] for row in con.execute("""
+        SELECT DISTINCT h.state2 FROM summary_holdings h SEMI JOIN summary_props p ON h.holdid = p.holdid;
+    """).fetchall()]
+    hold_states = sorted((prop_states | set(old_states) | set(new_states)) - {None})
+    checkpoint.copy(con, "summary_holdings", holdings_path)
+
+    # Step 3: county and state partial aggregates of both views in one GROUPING SETS scan
+    measures = ",\n".join(f"SUM({m}) AS {m}_sum, COUNT({m}) AS {m}_n" for m in MEASURES)
+    print(f" Aggregating {len(states)} state(s) of properties and {len(hold_states)} state(s) of holdings...")
+    with telemetry.profile(con, "summary_cube"):
+        telemetry.execute(con, f"""
+            CREATE OR REPLACE TABLE summary_cube_update AS
+            WITH facts AS (
+                SELECT 'propid' AS view, state2, county, zip_match, in_urban, parcels, area_acres,
+                       NULL::DOUBLE AS dispersion_km
+                FROM summary_props
+                WHERE state2 IS NOT NULL
+                UNION ALL
+                SELECT 'holdid' AS view, state2, county, zip_match, in_urban, parcels, area_acres, dispersion_km
+                FROM summary_holdings
+                WHERE state2 IN {_states_sql(hold_states)}
+            )
+            SELECT view, CASE GROUPING(county) WHEN 1 THEN 'state' ELSE 'county' END AS level,
+                   state2, county, COUNT(*) AS units,
+                   {measures}
+            FROM facts
+            GROUP BY GROUPING SETS ((view, state2, county), (view, state2));
+        """)
+    if incremental:
+        con.execute(f"""
+            CREATE OR REPLACE TABLE summary_cube AS
+            SELECT * FROM read_parquet('{cube_path}')
+            WHERE NOT ((view = 'propid' AND state2 IN {_states_sql(prop_states)})
+                    OR (view = 'holdid' AND state2 IN {_states_sql(hold_states)}))
+            UNION ALL BY NAME
+            SELECT * FROM summary_cube_update;
+        """)
+    else:
+        con.execute("CREATE OR REPLACE TABLE summary_cube AS SELECT * FROM summary_cube_update;")
+    checkpoint.copy(con, "(SELECT * FROM summary_cube ORDER BY view, level, state2, county)", cube_path)
+
+    # Step 4: the CSVs, from the cube alone
+    for level, (keys, names) in LEVEL_CSVS.items():
+        for view, name in names.items():
+            out = os.path.join(csv_dir, level, name.format(region=region))
+            checkpoint.copy(con, f"""(
+                SELECT {keys}, {LEVEL_COLUMNS} FROM summary_cube
+                WHERE view = '{view}' AND level = '{level}'
+                GROUP BY {keys} ORDER BY state2{", county" if level == "county" else ""}
+            )""", out, CSV_OPTIONS)
+    for view, columns in REGION_COLUMNS.items():
+        out = os.path.join(csv_dir, "region", f"{region}_combined_regional_summary_{view}.csv")
+        checkpoint.copy(con, f"""(
+            SELECT '{region}' AS region, {columns}
+            FROM summary_cube WHERE view = '{view}' AND level = 'state'
+        )""", out, CSV_OPTIONS)
+
+    rows = con.execute("SELECT COUNT(*) FROM summary_cube;").fetchone()[0]
+    print(f"✅ Summary cube: {rows} rows; CSVs written to {csv_dir}")
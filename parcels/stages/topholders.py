@@ -0,0 +1,92 @@
+"""
+Top-k holdings by area and by parcel count for every county, state and the region.
+
+The property rows come from `{region}_summary/summary_props_{state}.parquet`,
+written by summarycube. A holding is ranked in a county (or state) by the
+parcels and area of its properties in that county (or state), not by its
+total, so a holding spread over several counties competes in each of them
+with the share it has there. One GROUPING SETS pass sums the property rows
+per (holdid, state2, county), (holdid, state2) and holdid, and feeds the sums
+to `max_by(..., k)`. That aggregate keeps a bounded heap of k entries per
+group, so the pass holds k x groups rows, with no sort of the holdings. The
+representative owner and mailing address (the most common `owner`/`pstlclean`
+of the holding's parcels) are then read only for the selected holdings,
+through the holdid index (parcels/lookup.py).
+
+Output: `{region}_summary/top_holders.parquet` with one row per
+(level, state2, county, metric, rank); `parcels` and `area_acres` are the
+holding's within that county, state or the region.
+"""
+
+import glob
+
+from parcels import catalog, checkpoint, lookup, telemetry
+
+# Ranking metric -> column of the per-group holding sums
+METRICS = {"area": "area_acres", "parcels": "parcels"}
+
+
+def run(cfg, con):
+    region, data_dir = cfg.region, cfg.data_dir
+    catalog.attach(con, data_dir, region)
+
+    props_files = sorted(glob.glob(cfg.path("{region}_summary", "summary_props_*.parquet")))
+    out_path = cfg.path("{region}_summary", "top_holders.parquet")
+    final_dir = cfg.path("{region}_propsholds_final")
+    if not props_files:
+        raise ValueError(f" No summary_props files under {cfg.path('{region}_summary')}; run summarycube first")
+    k = cfg.top_k
+
+    # Step 1: bounded top-k heaps of every county, state and the region in one pass
+    print(f"🔹 Top {k} holdings by {' and '.join(METRICS)} per county, state and region of {region}")
+    heaps = ",\n".join(
+        f"max_by(struct_pack(holdid, parcels, area_acres), struct_pack({column}, holdid), {k}) AS top_{metric}"
+        for metric, column in METRICS.items()
+    )
+    with telemetry.profile(con, "top_holders"):
+        telemetry.execute(con, f"""
+            CREATE OR REPLACE TABLE top_heaps AS
+            WITH holding_groups AS (
+                SELECT CASE GROUPING(state2, county) WHEN 0 THEN 'county' WHEN 1 THEN 'state' ELSE 'region' END
+                           AS level,
+                       holdid, state2, county,
+                       SUM(parcels) AS parcels, SUM(area_acres) AS area_acres
+                FROM read_parquet({catalog.file_list(props_files)})
+                WHERE holdid IS NOT NULL AND state2 IS NOT NULL
+                GROUP BY GROUPING SETS ((holdid, state2, county), (holdid, state2), (holdid))
+            )
+            SELECT level, state2, county,
+                   {heaps}
+            FROM holding_groups
+            GROUP BY level, state2, county;
+        """)
+    # `max_by(..., k)` returns each heap sorted from the largest key down
+    con.execute("CREATE OR REPLACE TABLE top_holders AS " + " UNION ALL ".join(f"""
+        SELECT level, state2, county, '{metric}' AS metric, rank,
+               holding.holdid, holding.parcels, holding.area_acres
+        FROM (
+            SELECT level, state2, county,
+                   UNNEST(top_{metric}) AS holding, generate_subscripts(top_{metric}, 1) AS rank
+            FROM top_heaps
+        ) h
+    """ for metric in METRICS) + ";")
+
+    # Step 2: owner and mailing address of the selected holdings only
+    holdids = [row[0] for row in con.execute("SELECT DISTINCT holdid FROM top_holders;").fetchall()]
+    print(f" {len(holdids)} distinct holdings selected; reading their owners via the holdid index...")
+    con.execute(f"""
+        CREATE OR REPLACE TABLE top_owners AS
+        SELECT holdid, mode(owner) AS owner, mode(pstlclean) AS pstlclean
+        FROM ({lookup.query(con, final_dir, "holdid", holdids, "holdid, owner, pstlclean")})
+        GROUP BY holdid;
+    """)
+
+    checkpoint.copy(con, """(
+        SELECT t.level, t.state2, t.county, t.metric, t.rank, t.holdid, o.owner, o.pstlclean,
+               t.parcels, t.area_acres
+        FROM top_holders t
+        LEFT JOIN top_owners o USING (holdid)
+        ORDER BY t.level, t.state2, t.county, t.metric, t.rank
+    )""", out_path)
+    rows = con.execute("SELECT COUNT(*) FROM top_holders;").fetchone()[0]
+    print(f"✅ Top holders saved to {out_path} ({rows} rows)")
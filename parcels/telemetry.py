@@ -0,0 +1,310 @@
+"""
+Per-task performance telemetry and the run report.
+
+Inside a stage script (enabled when the DAG runner sets TELEMETRY_DIR):
+    @telemetry.timed                    per-function call counts and seconds
+    with telemetry.profile(con, name):  JSON profile (the EXPLAIN ANALYZE tree) of each statement run
+        telemetry.execute(con, sql)     through `execute` in the block: `{name}.json`, then `{name}_2.json`, ...
+    telemetry.event(kind, **fields)     a decision worth reporting (e.g. parcels/spill.py partitioning)
+    telemetry.flush()                   write this process's timings and events (pool workers skip atexit)
+
+In the runner: `run_measured` gives wall/CPU time and peak RSS of a script,
+`SpillMonitor` samples the peak size of the task's DuckDB temp directory,
+`file_stats` counts rows (Parquet footers) and bytes in and out, and
+`write_report` stores every task record as `report.json` + `tasks.parquet`
+under `{data_dir}/telemetry/{run_id}/` together with a diff against the
+previous run (regressions and stragglers).
+"""
+
+import atexit
+import functools
+import glob
+import json
+import os
+import statistics
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+import duckdb
+
+TELEMETRY_DIR = os.getenv("TELEMETRY_DIR")
+
+# A task regressed when it is this much slower than in the previous run (and by at least MIN_DELTA_S)
+REGRESSION_RATIO = 1.25
+# A state task straggles when it is this much slower than the median state of the same stage
+STRAGGLER_RATIO = 3.0
+MIN_DELTA_S = 5.0
+SPILL_SAMPLE_S = 1.0
+
+TIMINGS = {}
+EVENTS = []
+# id(connection) -> [profile path without ".json", statements profiled so far] while a `profile` block is open
+PROFILING = {}
+
+
+def timed(fn):
+    """Accumulate calls and seconds of `fn`; a no-op outside instrumented runs."""
+    if not TELEMETRY_DIR:
+        return fn
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            entry = TIMINGS.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+
+    return wrapper
+
+
+def event(kind, **fields):
+    """Record a named event for the run report; a no-op outside instrumented runs."""
+    if TELEMETRY_DIR:
+        EVENTS.append({"kind": kind, **fields})
+
+
+def flush():
+    """Write this process's function timings and events into the task's telemetry directory."""
+    if not TELEMETRY_DIR or not (TIMINGS or EVENTS):
+        return
+    os.makedirs(TELEMETRY_DIR, exist_ok=True)
+    with open(os.path.join(TELEMETRY_DIR, f"timings_{os.getpid()}.json"), "w") as f:
+        json.dump(TIMINGS, f)
+    if EVENTS:
+        with open(os.path.join(TELEMETRY_DIR, f"events_{os.getpid()}.json"), "w") as f:
+            json.dump(EVENTS, f)
+
+
+atexit.register(flush)
+
+
+@contextmanager
+def profile(con, name):
+    """
+    Within the block, save DuckDB's JSON profile of every statement run through `execute` on `con`:
+    the first as `{name}.json`, the next ones (e.g. the partitions of parcels/spill.py) as
+    `{name}_2.json`, `{name}_3.json`, ... Other queries, such as completion markers or spill
+    sampling, run with profiling off and overwrite nothing.
+    """
+    if not TELEMETRY_DIR:
+        yield
+        return
+    profiles_dir = os.path.join(TELEMETRY_DIR, "profiles")
+    os.makedirs(profiles_dir, exist_ok=True)
+    PROFILING[id(con)] = [os.path.join(profiles_dir, name), 0]
+    try:
+        yield
+    finally:
+        PROFILING.pop(id(con), None)
+
+
+def execute(con, query, params=None):
+    """`con.execute(query, params)`, profiled on its own when a `profile` block is open on `con`.
+    Meant for the heavy statements of a stage (CREATE ... AS, INSERT, COPY), whose result is not read."""
+    active = PROFILING.get(id(con))
+    if active is None:
+        return con.execute(query, params)
+    active[1] += 1
+    path = active[0] if active[1] == 1 else f"{active[0]}_{active[1]}"
+    con.execute("PRAGMA enable_profiling = 'json';")
+    con.execute(f"PRAGMA profiling_output = '{path}.json';")
+    try:
+        return con.execute(query, params)
+    finally:
+        con.execute("PRAGMA disable_profiling;")
+
+
+def run_measured(cmd, **popen_kwargs):
+    """Run a command; returns its exit code, wall and CPU seconds and peak RSS (bytes, incl. reaped children)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, **popen_kwargs)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        "returncode": proc.returncode,
+        "wall_s": time.perf_counter() - start,
+        "cpu_s": usage.ru_utime + usage.ru_stime,
+        "peak_rss_bytes": usage.ru_maxrss * 1024,
+    }
+
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass  # spill files come and go while we walk
+    return total
+
+
+class SpillMonitor:
+    """Samples the peak size of a DuckDB temp directory while a task runs."""
+
+    def __init__(self, path, interval=SPILL_SAMPLE_S):
+        self.path = path
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, dir_size(self.path))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, dir_size(self.path))
+
+
+def file_stats(paths, suffix):
+    """Bytes of all files and rows of the Parquet ones (footer metadata only)."""
+    paths = [p for p in paths if os.path.exists(p)]
+    parquet = [p for p in paths if p.endswith(".parquet")]
+    rows = 0
+    if parquet:
+        file_list = "[" + ", ".join(f"'{p}'" for p in parquet) + "]"
+        rows = duckdb.execute(f"SELECT SUM(num_rows) FROM parquet_file_metadata({file_list})").fetchone()[0]
+    return {f"rows_{suffix}": int(rows or 0), f"bytes_{suffix}": sum(os.path.getsize(p) for p in paths)}
+
+
+def collect(task_dir):
+    """Function timings summed over the task's processes, their events and the latency of each captured profile."""
+    timings = {}
+    for path in glob.glob(os.path.join(task_dir, "timings_*.json")):
+        with open(path) as f:
+            for name, (calls, seconds) in json.load(f).items():
+                entry = timings.setdefault(name, {"calls": 0, "seconds": 0.0})
+                entry["calls"] += calls
+                entry["seconds"] += seconds
+    events = []
+    for path in sorted(glob.glob(os.path.join(task_dir, "events_*.json"))):
+        with open(path) as f:
+            events.extend(json.load(f))
+    profiles = {}
+    for path in sorted(glob.glob(os.path.join(task_dir, "profiles", "*.json"))):
+        with open(path) as f:
+            data = json.load(f)
+        profiles[os.path.basename(path)[:-5]] = data.get("latency", data.get("timing"))
+    return {"timings": timings, "profiles": profiles, "events": events}
+
+
+def previous_report(telemetry_root, run_id):
+    """The most recent report written before `run_id`, if any."""
+    runs = sorted(
+        d for d in os.listdir(telemetry_root)
+        if d < run_id and os.path.exists(os.path.join(telemetry_root, d, "report.json"))
+    ) if os.path.isdir(telemetry_root) else []
+    if not runs:
+        return None
+    with open(os.path.join(telemetry_root, runs[-1], "report.json")) as f:
+        return json.load(f)
+
+
+def diff(tasks, previous):
+    """Regressions against the previous run's matching tasks and stragglers within this run."""
+    key = lambda t: (t["region"], t["stage"], t["partition"])
+    before = {key(t): t for t in (previous or {}).get("tasks", []) if t["status"] == "ok"}
+    ok = [t for t in tasks if t["status"] == "ok"]
+
+    regressions = []
+    for t in ok:
+        prev = before.get(key(t))
+        if prev and t["wall_s"] > prev["wall_s"] * REGRESSION_RATIO and t["wall_s"] - prev["wall_s"] > MIN_DELTA_S:
+            regressions.append({
+                "region": t["region"], "stage": t["stage"], "partition": t["partition"],
+                "wall_s": t["wall_s"], "previous_wall_s": prev["wall_s"],
+                "peak_rss_bytes": t["peak_rss_bytes"], "previous_peak_rss_bytes": prev["peak_rss_bytes"],
+                "rows_out": t["rows_out"], "previous_rows_out": prev["rows_out"],
+            })
+
+    stragglers = []
+    by_stage = {}
+    for t in ok:
+        by_stage.setdefault((t["region"], t["stage"]), []).append(t)
+    for group in by_stage.values():
+        if len(group) < 3:
+            continue
+        median = statistics.median(t["wall_s"] for t in group)
+        for t in group:
+            if t["wall_s"] > median * STRAGGLER_RATIO and t["wall_s"] - median > MIN_DELTA_S:
+                stragglers.append({
+                    "region": t["region"], "stage": t["stage"], "partition": t["partition"],
+                    "wall_s": t["wall_s"], "stage_median_wall_s": median,
+                })
+
+    return {
+        "previous_run": (previous or {}).get("run_id"),
+        "regressions": sorted(regressions, key=lambda r: r["previous_wall_s"] - r["wall_s"]),
+        "stragglers": sorted(stragglers, key=lambda r: -r["wall_s"]),
+    }
+
+
+def write_report(run_dir, run_id, tasks, started):
+    """Write `report.json` and `tasks.parquet` for this run and return the report."""
+    os.makedirs(run_dir, exist_ok=True)
+    report = {
+        "run_id": run_id,
+        "started": started,
+        "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "tasks": tasks,
+        "diff": diff(tasks, previous_report(os.path.dirname(run_dir), run_id)),
+    }
+    with open(os.path.join(run_dir, "report.json"), "w") as f:
+        json.dump(report, f, indent=1)
+
+    if tasks:
+        con = duckdb.connect()
+        con.execute("""
+            CREATE TABLE tasks (
+                run_id VARCHAR, region VARCHAR, stage VARCHAR, partition VARCHAR, status VARCHAR,
+                started VARCHAR, threads INTEGER, memory_limit_bytes BIGINT,
+                wall_s DOUBLE, cpu_s DOUBLE, peak_rss_bytes BIGINT, spill_peak_bytes BIGINT,
+                rows_in BIGINT, bytes_in BIGINT, rows_out BIGINT, bytes_out BIGINT,
+                timings JSON, profiles JSON
+            );
+        """)
+        con.executemany(
+            "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);",
+            [[run_id, t["region"], t["stage"], t["partition"], t["status"], t["started"],
+              t["threads"], t["memory_limit_bytes"], t["wall_s"], t["cpu_s"], t["peak_rss_bytes"],
+              t["spill_peak_bytes"], t["rows_in"], t["bytes_in"], t["rows_out"], t["bytes_out"],
+              json.dumps(t["timings"]), json.dumps(t["profiles"])] for t in tasks],
+        )
+        con.execute(f"COPY tasks TO '{os.path.join(run_dir, 'tasks.parquet')}' (FORMAT 'parquet');")
+        con.close()
+    return report
+
+
+def print_summary(report):
+    tasks = report["tasks"]
+    print(f"\n Run report {report['run_id']}: {len(tasks)} task(s)")
+    for t in sorted(tasks, key=lambda t: -t["wall_s"])[:10]:
+        print(f"   {t['region']}/{t['partition']} {t['stage']}: {t['wall_s']:.1f}s wall, {t['cpu_s']:.1f}s CPU, "
+              f"{t['peak_rss_bytes'] >> 20} MiB RSS, {t['spill_peak_bytes'] >> 20} MiB spill, "
+              f"{t['rows_in']} → {t['rows_out']} rows [{t['status']}]")
+    for t in tasks:
+        for e in t.get("events", []):
+            if e["kind"] == "partitioned" and e["partitions"] > 1:
+                print(f" ⚠ {t['region']}/{t['partition']} {t['stage']}: {e['name']} split into {e['partitions']} "
+                      f"hash partitions (~{e['estimate_bytes'] >> 20} MiB estimate, "
+                      f"{e['memory_limit_bytes'] >> 20} MiB limit, {e['spill_peak_bytes'] >> 20} MiB spill peak)")
+    d = report["diff"]
+    for r in d["regressions"]:
+        print(f" ⚠ regression vs {d['previous_run']}: {r['region']}/{r['partition']} {r['stage']} "
+              f"{r['previous_wall_s']:.1f}s → {r['wall_s']:.1f}s")
+    for s in d["stragglers"]:
+        print(f" ⚠ straggler: {s['region']}/{s['partition']} {s['stage']} "
+              f"{s['wall_s']:.1f}s (stage median {s['stage_median_wall_s']:.1f}s)")
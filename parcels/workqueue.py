@@ -0,0 +1,298 @@
+"""
+Work queue that spreads DAG tasks over several machines sharing the data directory.
+
+The coordinator (`python -m parcels.dag --distributed ...`) decides what is
+stale exactly as in a local run, but instead of starting tasks itself it
+puts every ready task into a SQLite ledger at `{data_dir}/workqueue.sqlite`
+and waits for its record. Workers on any host that mounts the data directory
+(`python -m parcels.workqueue --data-dir ...`) claim the largest tasks that
+fit their own CPU/RAM/spill budget, run them with `dag.run_task`, and store
+the telemetry record back. A claim is a lease that the worker renews while
+the task runs; when a worker dies its lease expires and the next worker to
+poll takes the task over (up to MAX_ATTEMPTS times). Only the coordinator
+writes the per-region ledgers, so workers never race on them.
+
+Start a coordinator and a few workers against one directory to try it on a
+single machine:
+    python -m parcels.dag --data-dir /tmp/regrid --regions northeast --distributed &
+    for i in 1 2 3; do python -m parcels.workqueue --data-dir /tmp/regrid --cpus 2 --idle-exit 60 & done
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+from parcels import resources
+
+LEASE_S = 120.0       # a running task whose lease is older than this is taken over
+HEARTBEAT_S = 30.0
+POLL_S = 2.0
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    key TEXT PRIMARY KEY,         -- region.stage.state|region, as Task.key
+    region TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    partition TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    input_bytes INTEGER NOT NULL,
+    run_dir TEXT NOT NULL,
+    status TEXT NOT NULL,         -- queued | running | done | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    queued_at REAL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT,
+    record TEXT                   -- telemetry record (JSON) of the finished task
+);
+"""
+
+
+def queue_path(data_dir):
+    return os.path.join(data_dir, "workqueue.sqlite")
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """The shared task table. Each method opens its own short transaction, so the
+    file is never locked for longer than one statement batch."""
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.path = queue_path(data_dir)
+        with self._transaction() as db:
+            db.execute(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        # Rollback journal (not WAL): WAL needs shared memory, which network filesystems lack
+        db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            db.execute("BEGIN IMMEDIATE;")
+            yield db
+            db.execute("COMMIT;")
+        except BaseException:
+            db.execute("ROLLBACK;")
+            raise
+        finally:
+            db.close()
+
+    # ── coordinator side ──────────────────────────────────────────────────────
+
+    def put(self, task, input_bytes, run_dir):
+        """(Re)queue a task; a stale row from an earlier coordinator is replaced."""
+        with self._transaction() as db:
+            db.execute("""
+                INSERT OR REPLACE INTO tasks
+                    (key, region, stage, partition, fingerprint, input_bytes, run_dir, status, queued_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 'queued', ?);
+            """, [task.key, task.region, task.stage.name, task.partition, task.fingerprint,
+                  input_bytes, run_dir, time.time()])
+
+    def finished(self, keys):
+        """Rows of the given tasks that are done or failed."""
+        if not keys:
+            return []
+        with self._transaction() as db:
+            return db.execute(f"""
+                SELECT key, status, error, record FROM tasks
+                WHERE status IN ('done', 'failed') AND key IN ({", ".join("?" * len(keys))});
+            """, list(keys)).fetchall()
+
+    # ── worker side ───────────────────────────────────────────────────────────
+
+    def claim(self, worker, budget, pool):
+        """
+        Lease the largest queued (or abandoned) task whose estimated footprint fits
+        `pool`, or any task when nothing runs on this worker yet. Returns the row and
+        its resource request, or None. Tasks abandoned MAX_ATTEMPTS times fail.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("""
+                UPDATE tasks SET status = 'failed', finished_at = ?,
+                       error = 'lease expired ' || attempts || ' times (worker lost)'
+                WHERE status = 'running' AND lease_until < ? AND attempts >= ?;
+            """, [now, now, MAX_ATTEMPTS])
+            candidates = db.execute("""
+                SELECT * FROM tasks
+                WHERE status = 'queued' OR (status = 'running' AND lease_until < ?)
+                ORDER BY input_bytes DESC;
+            """, [now]).fetchall()
+            for row in candidates:
+                request = budget.estimate(row["input_bytes"])
+                if pool.fits(request) or not pool.running:
+                    if row["status"] == "running":
+                        print(f"🔁 {row['key']}: lease of {row['worker']} expired, taking over")
+                    db.execute("""
+                        UPDATE tasks SET status = 'running', worker = ?, attempts = attempts + 1,
+                               lease_until = ?, started_at = ?
+                        WHERE key = ?;
+                    """, [worker, now + LEASE_S, now, row["key"]])
+                    return row, request
+        return None
+
+    def renew(self, worker, keys):
+        if not keys:
+            return
+        with self._transaction() as db:
+            db.execute(f"""
+                UPDATE tasks SET lease_until = ?
+                WHERE worker = ? AND status = 'running' AND key IN ({", ".join("?" * len(keys))});
+            """, [time.time() + LEASE_S, worker, *keys])
+
+    def complete(self, worker, key, record=None, error=None):
+        """Store the outcome, unless the lease was lost (and the task re-claimed) meanwhile."""
+        status = "done" if record is not None and record["status"] == "ok" else "failed"
+        if status == "failed" and error is None:
+            error = record["status"]
+        with self._transaction() as db:
+            db.execute("""
+                UPDATE tasks SET status = ?, finished_at = ?, record = ?, error = ?
+                WHERE key = ? AND worker = ? AND status = 'running';
+            """, [status, time.time(), json.dumps(record) if record is not None else None, error, key, worker])
+
+    def summary(self):
+        with self._transaction() as db:
+            return db.execute("""
+                SELECT status, COUNT(*) AS tasks, COUNT(DISTINCT worker) AS workers
+                FROM tasks GROUP BY status ORDER BY status;
+            """).fetchall()
+
+
+class RemoteExecutor:
+    """
+    Stand-in for the coordinator's thread pool: `submit` queues a task and returns a
+    Future that resolves to the task's telemetry record once a worker finishes it.
+    """
+
+    def __init__(self, data_dir, poll=POLL_S):
+        self.queue = WorkQueue(data_dir)
+        self.poll = poll
+        self.futures = {}
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._collect, daemon=True)
+
+    def submit(self, task, input_bytes, run_dir):
+        future = Future()
+        with self.lock:
+            self.futures[task.key] = future
+        self.queue.put(task, input_bytes, run_dir)
+        return future
+
+    def _collect(self):
+        while not self._stop.wait(self.poll):
+            with self.lock:
+                keys = list(self.futures)
+            for row in self.queue.finished(keys):
+                with self.lock:
+                    future = self.futures.pop(row["key"])
+                if row["record"]:
+                    future.set_result(json.loads(row["record"]))
+                else:
+                    future.set_exception(RuntimeError(row["error"]))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def work(data_dir, budget, temp_root=None, idle_exit=None):
+    """Claim and run tasks within `budget` until the queue stays empty for `idle_exit` seconds
+    (forever when None)."""
+    from parcels import dag
+
+    queue = WorkQueue(data_dir)
+    worker = worker_id()
+    pool = resources.Pool(budget)
+    running = {}  # future -> (key, request)
+    print(f"🔹 Worker {worker}: {budget}")
+
+    idle_since = renewed = time.time()
+    with ThreadPoolExecutor(max_workers=budget.cpus) as executor:
+        while True:
+            while True:
+                claimed = queue.claim(worker, budget, pool)
+                if claimed is None:
+                    break
+                row, request = claimed
+                task = dag.Task(row["region"], dag.STAGES_BY_NAME[row["stage"]], row["partition"],
+                                row["fingerprint"], request)
+                pool.acquire(request)
+                print(f"🔹 {task}: starting ({request})")
+                running[executor.submit(dag.run_task, task, data_dir, None, row["run_dir"], temp_root)] = \
+                    (row["key"], request)
+
+            # Heartbeat: renew the leases of the running tasks
+            if running and time.time() - renewed > HEARTBEAT_S:
+                queue.renew(worker, [key for key, _ in running.values()])
+                renewed = time.time()
+
+            if not running:
+                if idle_exit is not None and time.time() - idle_since > idle_exit:
+                    print(f"🔹 Worker {worker}: queue idle for {idle_exit:.0f}s, exiting")
+                    return
+                time.sleep(POLL_S)
+                continue
+
+            finished, _ = wait(running, timeout=POLL_S, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key, request = running.pop(future)
+                pool.release(request)
+                try:
+                    record = dict(future.result(), worker=worker)
+                    queue.complete(worker, key, record)
+                    print(f"{'✔' if record['status'] == 'ok' else '❌'} {key}: {record['status']}, "
+                          f"{record['wall_s']:.1f}s")
+                except Exception as e:
+                    queue.complete(worker, key, error=str(e))
+                    print(f"❌ {key} failed: {e}")
+            idle_since = time.time()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run pipeline tasks from the shared work queue.")
+    parser.add_argument("--data-dir", default=os.getenv("DATA_DIR"))
+    parser.add_argument("--temp-dir", help="node-local DuckDB spill root (default: {data_dir}/duckdb_temp)")
+    parser.add_argument("--cpus", type=int, help="CPU budget of this worker (default: PIPELINE_CPUS or all cores)")
+    parser.add_argument("--memory", help="RAM budget, e.g. 200GB (default: PIPELINE_MEMORY or 75%% of RAM)")
+    parser.add_argument("--spill", help="spill-disk budget, e.g. 1TB (default: PIPELINE_SPILL or 80%% of free space)")
+    parser.add_argument("--idle-exit", type=float, help="exit after the queue was empty this many seconds")
+    parser.add_argument("--status", action="store_true", help="print the queue's task counts and exit")
+    args = parser.parse_args()
+
+    if not args.data_dir:
+        raise ValueError(" DATA_DIR is not set")
+    if args.status:
+        for row in WorkQueue(args.data_dir).summary():
+            print(f" {row['status']:<8} {row['tasks']:>6} task(s) {row['workers']:>4} worker(s)")
+        return
+
+    temp_root = args.temp_dir or f"{args.data_dir}/duckdb_temp"
+    budget = resources.Budget.detect(temp_root)
+    budget.cpus = args.cpus or budget.cpus
+    budget.memory = resources.parse_size(args.memory) if args.memory else budget.memory
+    budget.spill = resources.parse_size(args.spill) if args.spill else budget.spill
+    work(args.data_dir, budget, temp_root, args.idle_exit)
+
+
+if __name__ == "__main__":
+    main()
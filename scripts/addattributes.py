@@ -1,32 +1,11 @@
-import duckdb
+#!/usr/bin/env python3
+"""Run `parcels.stages.addattributes` for REGION (every region when unset); see parcels/stages/__init__.py."""
 import os
-import glob
-import pandas as pd
+import sys
 
-# Get environment variables
-region = os.getenv("REGION")
-data_dir = os.getenv("DATA_DIR")
+# Make the shared `parcels` helpers importable when run as `python3 scripts/<name>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parcels.stages import addattributes, main
 
-duckdb.sql(f"""
-INSTALL spatial; LOAD spatial;
-
-CREATE TABLE prop_shapes_aw AS
-SELECT
-  s.propid,
-  s.holdid,
-  s.area_acres,
-  s.num_parcels,
-  pl.mean_zip_match AS mean_zip_match_aw,
-  pl.mean_in_urban  AS mean_in_urban_aw
-FROM
-  read_parquet('{data_dir}/parquet/{region}/{region}_prop_shapes/prop_shapes_{region}_with_urban.parquet') AS s
-  LEFT JOIN (
-    SELECT
-      propid,
-      SUM(zip_match * ST_AREA(ST_GeomFromWKB(geom)))   / SUM(ST_AREA(ST_GeomFromWKB(geom)))   AS mean_zip_match,
-      SUM(in_urban  * ST_AREA(ST_GeomFromWKB(geom)))   / SUM(ST_AREA(ST_GeomFromWKB(geom)))   AS mean_in_urban
-    FROM read_parquet('{data_dir}/parquet/{region}/{region}_propsholds_final/*.parquet')
-    GROUP BY propid
-  ) AS pl USING (propid);
-COPY (SELECT * FROM prop_shapes_aw) TO '{data_dir}/parquet/{region}/{region}_prop_shapes/prop_shapes_{region}_aw.parquet' (FORMAT PARQUET);
-""")
+if __name__ == "__main__":
+    main(addattributes.run)
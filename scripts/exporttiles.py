@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""Run `parcels.stages.exporttiles` for REGION (every region when unset); see parcels/stages/__init__.py."""
+import os
+import sys
+
+# Make the shared `parcels` helpers importable when run as `python3 scripts/<name>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parcels.stages import exporttiles, main
+
+if __name__ == "__main__":
+    main(exporttiles.run)
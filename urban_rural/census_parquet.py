@@ -10,13 +10,11 @@ out_fp   = Path("/home/christina/Desktop/data/Census_UrbanAreas/urban_5070.parqu
 urban = gpd.read_file(shp_fp)
 urban = urban.to_crs(epsg=5070)
 
-# 3. Serialize geometry as WKB
-urban["geom"] = urban.geometry.apply(lambda g: g.wkb)
+# 3. Keep the geometry as the GeoParquet geometry column (named `geom` like the parcel outputs);
+#    DuckDB reads it back as native GEOMETRY, so no per-row WKB serialization here
+urban = urban[["geometry"]].rename_geometry("geom")
 
-# 4. Drop everything but the WKB column (and whatever ID you might want)
-urban = urban[["geom"]]
-
-# 5. Write to Parquet
+# 4. Write to GeoParquet
 urban.to_parquet(out_fp, engine="pyarrow", index=False)
 
 print(f"✅ Wrote {out_fp}")
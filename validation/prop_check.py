@@ -1,36 +1,26 @@
-import pandas as pd
-import numpy as np
+import os
+import sys
 
-region = "south"
-# 1. load
-df = pd.read_csv(f"/home/christina/Desktop/property-matching/regrid_2025/validation/{region}_neighbors.csv")
+import duckdb
 
-# 2. extract the focal‐parcel attributes
-#    (those rows where fips_id == focal_id)
-focals = (
-    df.loc[df.fips_id == df.focal_id,
-           ["fips_id","propid","owner","pstlclean"]]
-      .rename(columns={
-         "fips_id":"focal_id",
-         "propid":"focal_propid",
-         "owner":"focal_owner",
-         "pstlclean":"focal_pstlclean"
-      })
-)
+# Make the shared `parcels` helpers importable when run as `python3 validation/<name>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parcels import agreement
 
-# 3. merge them back onto the main table by focal_id
-df = df.merge(focals, on="focal_id", how="left")
+regions = ["midwest", "northeast", "south", "west"]
+validation_dir = "/home/christina/Desktop/property-matching/regrid_2025/validation"
+out_dir = f"{validation_dir}/property"
 
-# 4. compute your new flags
-df["self"] = np.where(df.fips_id == df.focal_id, "yes", "no")
-df["propmatch"]    = np.where(df.propid == df.focal_propid,    "yes", "no")
-df["namematch"]    = np.where(df.owner  == df.focal_owner,     "yes", "no")
-df["pstlclean_match"] = np.where(
-    df.pstlclean == df.focal_pstlclean, "yes", "no"
-)
+con = duckdb.connect()
+for i, region in enumerate(regions):
+    # 1. neighbour pairs written by select_props.py → BOOLEAN flags, per-focal rates and
+    #    precision/recall of the grouping (parcels/agreement.py)
+    pairs = agreement.run(con, [f"{validation_dir}/{region}_neighbors.parquet"], out_dir, region)
+    print(f"✅ {region}: flagged {pairs} neighbour pairs")
 
-# 5. (optional) drop the helper focal_… columns
-df = df.drop(columns=["focal_propid","focal_owner","focal_pstlclean"])
+    # 2. keep the region's summary row for the combined table
+    verb = "INSERT INTO all_summaries" if i else "CREATE OR REPLACE TABLE all_summaries AS"
+    con.execute(f"{verb} SELECT * FROM agreement_summary;")
 
-# 6. write it back out
-df.to_csv(f"/home/christina/Desktop/property-matching/regrid_2025/validation/property/{region}_neighbors.csv", index=False)
+con.execute(f"COPY all_summaries TO '{out_dir}/agreement_summary.csv' (HEADER);")
+print(f"✅ Done. Region summaries in {out_dir}/agreement_summary.csv")
@@ -1,6 +1,13 @@
 #!/usr/bin/env python3
+import os
+import sys
+
 import duckdb
 
+# Make the shared `parcels` helpers importable when run as `python3 validation/<name>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parcels import catalog, neighbors
+
 # ────────────────────────────────────────────────────────────────────────
 # CONFIGURATION
 # ────────────────────────────────────────────────────────────────────────
@@ -11,79 +18,32 @@ validation_dir = "/home/christina/Desktop/property-matching/regrid_2025/validati
 
 N_SAMPLES   = 25
 BUFFER_DIST = 100  # meters
+SEED        = 42   # same seed, same focal parcels
 # ────────────────────────────────────────────────────────────────────────
 
 con = duckdb.connect()
-con.execute("INSTALL spatial;")
-con.execute("LOAD spatial;")
+catalog.load_spatial(con)
 
 for region in regions:
     print(f"\n>> Processing {region}")
 
-    glob_path  = f"{base_dir}/{region}/{region}_propsholds_final/*.parquet"
-    out_csv    = f"{validation_dir}/{region}_neighbors.csv"
-
-    # drop old views
-    con.execute("DROP VIEW IF EXISTS all_parcels;")
-    con.execute("DROP VIEW IF EXISTS sampled;")
-    con.execute("DROP VIEW IF EXISTS buffers;")
-    con.execute("DROP VIEW IF EXISTS neighbors;")
-
-    # 1) read only the columns we need via parquet_scan
-    con.execute(f"""
-    CREATE VIEW all_parcels AS
-    SELECT
-      fips_id,
-      owner,
-      pstlclean,
-      propid,
-      ST_GeomFromWKB(geom) AS geom
-    FROM parquet_scan('{glob_path}');
-    """)
-
-    # 2) sample N random parcels
-    con.execute(f"""
-    CREATE VIEW sampled AS
-    SELECT
-      fips_id,
-      owner,
-      pstlclean,
-      propid,
-      geom
-    FROM all_parcels
-    ORDER BY RANDOM()
-    LIMIT {N_SAMPLES};
-    """)
+    final_dir = f"{base_dir}/{region}/{region}_propsholds_final"
+    out_csv   = f"{validation_dir}/{region}_neighbors.csv"
+    out_pq    = f"{validation_dir}/{region}_neighbors.parquet"  # input of prop_check.py
 
-    # 3) buffer by 100 m
-    con.execute(f"""
-    CREATE VIEW buffers AS
-    SELECT
-      fips_id    AS focal_id,
-      ST_Buffer(geom, {BUFFER_DIST}) AS buffer_geom
-    FROM sampled;
-    """)
+    # 1) deterministic block sample of focal parcels (reads only the sampled row groups)
+    focal = neighbors.sample_focal(con, final_dir, N_SAMPLES, seed=SEED)
 
-    # 4) find neighbors with owner & pstlclean
-    con.execute("""
-    CREATE VIEW neighbors AS
-    SELECT
-      p.fips_id,
-      p.propid,
-      p.owner,
-      p.pstlclean,
-      b.focal_id
-    FROM all_parcels AS p
-    JOIN buffers AS b
-      ON ST_Intersects(p.geom, b.buffer_geom);
-    """)
+    # 2) parcels within 100 m of each focal parcel, through the grid index of parcel bounds
+    pairs = neighbors.within(con, final_dir, BUFFER_DIST, "fips_id, propid, owner, pstlclean")
 
-    # 5) export to CSV
-    con.execute(f"""
-    COPY neighbors
-    TO '{out_csv}'
-    (HEADER, DELIMITER ',');
-    """)
-    print(f"✅ {region}: wrote {out_csv}")
+    # 3) export to CSV and Parquet
+    for path, options in [(out_csv, "HEADER, DELIMITER ','"), (out_pq, "FORMAT 'parquet'")]:
+        con.execute(f"""
+        COPY (SELECT fips_id, propid, owner, pstlclean, focal_id, distance FROM neighbors)
+        TO '{path}'
+        ({options});
+        """)
+    print(f"✅ {region}: {focal} focal parcels, {pairs} neighbours → {out_csv}")
 
 print("\nAll done!")